@@ -0,0 +1,16 @@
+"""
+__init__.py
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+import os
+import pathlib
+
+RESOURCE_FILES = sorted((pathlib.Path(__file__).resolve().parent.parent / "resource").glob("*.ttl"))
+
+# the sizes, in triples, of the synthetic graphs; e.g. RDF2G_BENCHMARK_SIZES=10000,100000,1000000
+SYNTHETIC_SIZES = [int(size) for size in os.environ.get("RDF2G_BENCHMARK_SIZES", "10000,100000").split(",")]
+
+# the per-triple loader is benchmarked only on the graphs up to this size
+PER_TRIPLE_MAX_SIZE = 10000
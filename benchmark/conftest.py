@@ -0,0 +1,93 @@
+"""
+conftest
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+from collections import Counter
+
+import pytest
+import rdflib
+from rdflib.namespace import RDF, SKOS
+
+import rdf2g
+from benchmark import RESOURCE_FILES, SYNTHETIC_SIZES
+
+EX = rdflib.Namespace("http://example.org/concept/")
+
+DATASETS = [path.name for path in RESOURCE_FILES] + ["synthetic-%s" % size for size in SYNTHETIC_SIZES]
+
+_rdf_graphs = {}
+
+
+def synthetic_graph(size):
+    """
+        generate a SKOS concept scheme of about size triples; each concept has a type, a preferred label, the
+        scheme and up to 4 narrower concepts, so the traversal trees fan out
+    """
+    rdf_graph = rdflib.Graph()
+    rdf_graph.bind("skos", SKOS)
+    rdf_graph.bind("ex", EX)
+    scheme = EX["scheme"]
+    rdf_graph.add((scheme, RDF.type, SKOS.ConceptScheme))
+    for i in range(size // 4):
+        concept = EX["c%s" % i]
+        rdf_graph.add((concept, RDF.type, SKOS.Concept))
+        rdf_graph.add((concept, SKOS.prefLabel, rdflib.Literal("Concept %s" % i, lang="en")))
+        rdf_graph.add((concept, SKOS.inScheme, scheme))
+        if i:
+            rdf_graph.add((EX["c%s" % ((i - 1) // 4)], SKOS.narrower, concept))
+    return rdf_graph
+
+
+def rdf_graph_of(dataset):
+    """
+        parse or generate the rdf graph of a dataset once per session
+    """
+    if dataset not in _rdf_graphs:
+        if dataset.startswith("synthetic-"):
+            _rdf_graphs[dataset] = synthetic_graph(int(dataset.split("-")[1]))
+        else:
+            rdf_graph = rdflib.Graph()
+            rdf_graph.parse(str(RESOURCE_FILES[[path.name for path in RESOURCE_FILES].index(dataset)]), format="ttl")
+            _rdf_graphs[dataset] = rdf_graph
+    return _rdf_graphs[dataset]
+
+
+@pytest.fixture(params=DATASETS)
+def dataset(request):
+    return request.param
+
+
+@pytest.fixture
+def rdf_graph(dataset):
+    return rdf_graph_of(dataset)
+
+
+@pytest.fixture
+def loaded_graph(rdf_graph):
+    """
+        an embedded graph holding the rdf graph
+    """
+    g = rdf2g.embedded_graph()
+    rdf2g.load_rdf2g_bulk(g, rdf_graph, on_missing_index=None)
+    return g
+
+
+@pytest.fixture
+def root(rdf_graph):
+    """
+        the node with the most outgoing links, the root of the traversal trees
+    """
+    links = Counter(s for s, p, o in rdf_graph if not isinstance(o, rdflib.Literal))
+    return max(sorted(links, key=str), key=links.get)
+
+
+def round_trips_of(g, function, *args, **kwargs):
+    """
+        count the round-trips of one more call of the benchmarked function
+    """
+    g.remote_connection.round_trips = 0
+    function(*args, **kwargs)
+    return g.remote_connection.round_trips
@@ -0,0 +1,38 @@
+"""
+test_load
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import pytest
+
+import rdf2g
+from benchmark import PER_TRIPLE_MAX_SIZE
+
+
+def benchmark_load(benchmark, rdf_graph, load):
+    """
+        time the load of the rdf graph into a new embedded graph at every round and record the round-trips and
+        the triples per second
+    """
+    graphs = []
+
+    def setup():
+        graphs[:] = [rdf2g.embedded_graph()]
+        return (graphs[0],), {}
+
+    benchmark.pedantic(load, setup=setup, rounds=3 if len(rdf_graph) <= 100000 else 1)
+    benchmark.extra_info["triples"] = len(rdf_graph)
+    benchmark.extra_info["round_trips"] = graphs[0].remote_connection.round_trips
+    benchmark.extra_info["triples_per_second"] = round(len(rdf_graph) / benchmark.stats.stats.mean)
+
+
+def test_load_rdf2g(benchmark, rdf_graph):
+    if len(rdf_graph) > PER_TRIPLE_MAX_SIZE:
+        pytest.skip("The per-triple loader is only benchmarked up to %s triples." % PER_TRIPLE_MAX_SIZE)
+    benchmark_load(benchmark, rdf_graph, lambda g: rdf2g.load_rdf2g(g, rdf_graph, on_missing_index=None))
+
+
+def test_load_rdf2g_bulk(benchmark, rdf_graph):
+    benchmark_load(benchmark, rdf_graph, lambda g: rdf2g.load_rdf2g_bulk(g, rdf_graph, on_missing_index=None))
@@ -0,0 +1,59 @@
+"""
+test_retrieve
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import rdflib
+
+import rdf2g
+from benchmark.conftest import round_trips_of
+
+
+def test_get_node_by_iri(benchmark, loaded_graph, root):
+    node = benchmark(rdf2g.get_node, loaded_graph, root)
+    assert node, "The root node is not found"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.get_node, loaded_graph, root)
+
+
+def test_get_node_by_label(benchmark, loaded_graph, rdf_graph, root):
+    label = rdf2g.node_label(root, rdf_graph)
+    node = benchmark(rdf2g.get_node, loaded_graph, label)
+    assert node, "The root node is not found"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.get_node, loaded_graph, label)
+
+
+def test_get_edges(benchmark, loaded_graph, rdf_graph, root):
+    target = next(o for o in rdf_graph.objects(root) if not isinstance(o, rdflib.Literal))
+    edges = benchmark(rdf2g.get_edges, loaded_graph, root, target)
+    assert edges, "The edges are not found"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.get_edges, loaded_graph, root, target)
+
+
+def test_generate_traversal_tree(benchmark, loaded_graph, root):
+    tree = benchmark(rdf2g.generate_traversal_tree, loaded_graph, root)
+    assert tree["@value"], "The tree is empty"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.generate_traversal_tree,
+                                                         loaded_graph, root)
+
+
+def test_expand_tree(benchmark, loaded_graph, root):
+    tree = rdf2g.generate_traversal_tree(loaded_graph, root)
+    nodes = benchmark(rdf2g.expand_tree, loaded_graph, tree)
+    assert nodes, "The expanded tree is empty"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.expand_tree, loaded_graph, tree)
+
+
+def test_expand_traversal_tree(benchmark, loaded_graph, root):
+    nodes = benchmark(rdf2g.expand_traversal_tree, loaded_graph, root)
+    assert nodes, "The expanded tree is empty"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, rdf2g.expand_traversal_tree,
+                                                         loaded_graph, root)
+
+
+def test_get_node_cached(benchmark, loaded_graph, root):
+    cache = rdf2g.VertexCache()
+    node = benchmark(cache.get_node, loaded_graph, root)
+    assert node, "The root node is not found"
+    benchmark.extra_info["round_trips"] = round_trips_of(loaded_graph, cache.get_node, loaded_graph, root)
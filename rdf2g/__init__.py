@@ -9,6 +9,20 @@ from rdf2g.update import *
 from rdf2g.access import *
 from rdf2g.retrieve import *
 from rdf2g.transform import *
+from rdf2g.bulk import *
+from rdf2g.cache import *
+from rdf2g.stream import *
+from rdf2g.labels import *
+from rdf2g.index import *
+from rdf2g.literals import *
+from rdf2g.bnodes import *
+from rdf2g.sync import *
+from rdf2g.dataset import *
+from rdf2g.instrument import *
+from rdf2g.export import *
+from rdf2g.serialize import *
+from rdf2g.embedded import *
+from rdf2g import aio
 
 import logging
 import rdflib
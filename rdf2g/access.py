@@ -5,28 +5,32 @@ Author: Eugeniu Costetchi
 Email: costezki.eugen@gmail.com
 """
 import logging
+import time
+
 from gremlin_python.structure.graph import Graph
 from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
 from gremlin_python.process.anonymous_traversal import traversal
 
 DEFAULT_LOCAL_CONNECTION_STRING = "ws://localhost:8182/gremlin"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY = 0.5
 
 
-def setup_graph(conn_string=DEFAULT_LOCAL_CONNECTION_STRING):
+def setup_graph(conn_string=DEFAULT_LOCAL_CONNECTION_STRING, pool_size=None):
     """
         Establish the connection to a property graph service using the connection string and return the gremlin graph.
+        The connection is available as g.remote_connection and shall be closed with close_graph(g) on shut down.
     :param conn_string: connection parameter
+    :param pool_size: the number of websocket connections kept open to the server; the driver default if None
     :return: gremlin graph
     """
     try:
         graph = Graph()
         logging.debug('Trying To Connect')
         # new style
-        connection = DriverRemoteConnection(conn_string, 'g')
-        connection.close()
-        connection = DriverRemoteConnection(conn_string, 'g')
+        connection = DriverRemoteConnection(conn_string, 'g', pool_size=pool_size)
         logging.debug('Connected')
-        # The connection should be closed on shut down to close open connections with connection.close()
 
         # g = graph.traversal().withRemote(connection) # Deprecated instantiation of traversal
         g = traversal().withRemote(connection)
@@ -38,3 +42,126 @@ def setup_graph(conn_string=DEFAULT_LOCAL_CONNECTION_STRING):
                       "\n'docker run --name gremlin-server -p 8182:8182 tinkerpop/gremlin-server'")
         raise ConnectionError("Could not connect to the Gremlin server.")
     return g
+
+
+def close_graph(g):
+    """
+        Close the connection of a gremlin graph created by setup_graph
+    :param g: gremlin graph
+    :return: None
+    """
+    if g.remote_connection is not None and not g.remote_connection.is_closed():
+        g.remote_connection.close()
+
+
+class ConnectionManager(object):
+    """
+        Owns the connection pool to a property graph service and the gremlin graph using it.
+
+        The manager can be passed to any rdf2g function instead of the gremlin graph; the traversal steps are
+        delegated to the managed graph. Used as a context manager, the connection is opened on entry and closed
+        on exit.
+
+            with ConnectionManager(conn_string, pool_size=8) as g:
+                load_rdf2g_bulk(g, rdf_graph)
+    """
+
+    def __init__(self, conn_string=DEFAULT_LOCAL_CONNECTION_STRING, pool_size=DEFAULT_POOL_SIZE,
+                 max_retries=DEFAULT_MAX_RETRIES, retry_delay=DEFAULT_RETRY_DELAY):
+        """
+        :param conn_string: connection parameter
+        :param pool_size: the number of websocket connections kept open to the server
+        :param max_retries: the number of times a failed connection attempt is retried
+        :param retry_delay: the delay in seconds before the first retry, doubled at every retry
+        """
+        self.conn_string = conn_string
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._connection = None
+        self._g = None
+
+    def __enter__(self):
+        if self._g is None:
+            self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getattr__(self, name):
+        # delegate the traversal steps (V, E, addV, inject, ...) to the managed gremlin graph
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.g, name)
+
+    @property
+    def g(self):
+        """
+            the gremlin graph, connecting first if needed
+        """
+        if self._g is None:
+            self.connect()
+        return self._g
+
+    def connect(self, check=True):
+        """
+            open the connection pool, retrying with exponential backoff while the server is not reachable
+        :param check: verify that the server answers before returning
+        :return: the gremlin graph
+        """
+        for attempt in range(self.max_retries + 1):
+            connection = DriverRemoteConnection(self.conn_string, 'g', pool_size=self.pool_size)
+            g = traversal().withRemote(connection)
+            if not check or self._ping(g):
+                self._connection, self._g = connection, g
+                logging.info('Successfully connected to the graph server %s' % self.conn_string)
+                return g
+            connection.close()
+            if attempt < self.max_retries:
+                delay = self.retry_delay * 2 ** attempt
+                logging.warning('The graph server %s is not reachable, retrying in %s seconds.' %
+                                (self.conn_string, delay))
+                time.sleep(delay)
+        raise ConnectionError("Could not connect to the Gremlin server %s." % self.conn_string)
+
+    def is_healthy(self):
+        """
+            check that the connection is open and the server answers a trivial traversal
+        :return: True if the server answers
+        """
+        return self._g is not None and not self._connection.is_closed() and self._ping(self._g)
+
+    def ensure_healthy(self):
+        """
+            reconnect if the connection is broken
+        :return: the gremlin graph
+        """
+        if not self.is_healthy():
+            self.reconnect()
+        return self._g
+
+    def reconnect(self):
+        """
+            close the current connection pool and open a new one
+        :return: the gremlin graph
+        """
+        self.close()
+        return self.connect()
+
+    def close(self):
+        """
+            close the connection pool; the manager reconnects if used again
+        :return: None
+        """
+        if self._connection is not None and not self._connection.is_closed():
+            self._connection.close()
+        self._connection, self._g = None, None
+
+    @staticmethod
+    def _ping(g):
+        try:
+            return g.inject(1).next() == 1
+        except Exception as e:  # any failure means the server is not usable
+            logging.debug('Health check failed: %s' % str(e))
+            return False
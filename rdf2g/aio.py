@@ -0,0 +1,206 @@
+"""
+aio
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+
+Asyncio counterparts of the retrieval and loading functions. The traversals are submitted asynchronously through
+the gremlinpython remote connection, so the coroutines never block the event loop waiting for the server.
+"""
+
+import asyncio
+import logging
+
+from gremlin_python.process.traversal import T
+from gremlin_python.structure.graph import Vertex
+
+from rdf2g.bulk import DEFAULT_BATCH_SIZE, COALESCE, batches, distinct_nodes, new_report, \
+    resolve_nodes_round_trips, write_statements_round_trips
+from rdf2g.bnodes import apply_bnode_strategy
+from rdf2g.cache import NodeCache
+from rdf2g.index import check_iri_index, WARN
+from rdf2g.labels import LabelResolver
+from rdf2g.retrieve import get_node_traversal, get_edges_traversal, single_node, traversal_hops, paths_tree
+
+# the number of traversals kept in flight by an asynchronous load
+DEFAULT_CONCURRENCY = 16
+
+
+async def submit(traversal):
+    """
+        Submit a traversal without blocking the event loop
+    :param traversal: a traversal spawned from a gremlin graph connected to a server
+    :return: the list of results
+    """
+    return await asyncio.wrap_future(traversal.promise(lambda t: t.toList()))
+
+
+async def get_node(g, id_):
+    """
+        return the node that is identified by id_, as get_node does
+    :param g: gremlin graph
+    :param id_: the node id or URI
+    :return: the node, or [] if it is not found
+    """
+    if isinstance(id_, Vertex):
+        return id_
+    return single_node(await submit(get_node_traversal(g, id_) if isinstance(id_, str) else g.V(id_)), id_)
+
+
+async def get_edges(g, source_iri, target_iri):
+    """
+        retrieve the edges between source and target nodes identified by their URIs, as get_edges does
+    :param g: gremlin graph
+    :param source_iri: source node URI
+    :param target_iri: target node URI
+    :return: the edge list
+    """
+    return await submit(get_edges_traversal(g, source_iri, target_iri))
+
+
+async def generate_traversal_tree(g, root_, max_depth=4, simple_path=False, dedup=False, fan_out=None,
+                                  edge_labels=None, limit=None):
+    """
+        generate the traversal tree starting from the selected root node, as generate_traversal_tree does
+    :param g: gremlin graph
+    :param root_: the graph node selected as starting point of the traversal
+    :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths in the tree
+    :return: the traversal tree
+    """
+    node = await get_node(g, root_)
+    paths = await submit(traversal_hops(g, node, max_depth, simple_path, dedup, fan_out, edge_labels, limit).path())
+    return paths_tree(paths)
+
+
+async def get_traversal_paths(g, root_, max_depth=4, simple_path=False, dedup=False, fan_out=None, edge_labels=None,
+                              limit=None):
+    """
+        return the paths of the traversal tree, as iter_traversal_paths generates them
+    :param g: gremlin graph
+    :param root_: the graph node selected as starting point of the traversal
+    :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths
+    :return: list of paths, lists alternating the node IRIs and the edge labels
+    """
+    node = await get_node(g, root_)
+    paths = await submit(traversal_hops(g, node, max_depth, simple_path, dedup, fan_out, edge_labels, limit).
+                         path().by("iri").by(T.label))
+    return [list(path.objects) for path in paths]
+
+
+async def load_rdf2g(g, rdf_graph, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                     node_cache=None, triples=None, label_resolver=None, on_missing_index=WARN, literal_mapper=None,
+                     bnode_strategy=None, upsert=COALESCE):
+    """
+        Load an RDF graph into a property graph g, as load_rdf2g_bulk does, keeping up to concurrency batches in
+        flight at the same time. The two passes are kept: all the vertices are created before the first
+        property or link is written.
+    :param g: gremlin graph
+    :param rdf_graph: the rdf graph providing the namespace prefixes and, unless triples is given, the triples
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param concurrency: the maximum number of batches, hence of traversals, awaiting their results
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used for this load if not provided
+    :param triples: re-iterable source of the (subject, predicate, object) triples to be loaded, if not rdf_graph
+    :param label_resolver: the LabelResolver computing the labels; a new one is used if not provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param bnode_strategy: "fixed", "skolem" or "inline" to map the blank nodes with map_bnodes; the blank nodes
+        are labelled and identified by their rdflib ids if None. Not supported together with triples
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: the load report
+    """
+    await asyncio.get_running_loop().run_in_executor(None, check_iri_index, g, on_missing_index)
+    node_cache = NodeCache() if node_cache is None else node_cache
+    rdf_graph = apply_bnode_strategy(rdf_graph, bnode_strategy, triples)
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
+    triples = rdf_graph if triples is None else triples
+    report = new_report()
+
+    await _pipeline((resolve_nodes(g, nodes, labels, report, node_cache, upsert)
+                     for nodes in batches(distinct_nodes(triples), batch_size)), concurrency)
+    await _pipeline((write_statements(g, batch, labels, report, node_cache, literal_mapper, upsert)
+                     for batch in batches(triples, batch_size)), concurrency)
+
+    logging.info('Loaded %(triples)s triples: %(vertices)s vertices, %(properties)s properties and %(edges)s edges '
+                 'in %(round_trips)s round-trips.' % report)
+    return report
+
+
+async def resolve_nodes(g, rdf_terms, rdf_graph, report=None, node_cache=None, upsert=COALESCE):
+    """
+        Find the vertex ids of the given RDF terms, creating the vertices that do not exist yet, as resolve_nodes
+        does
+    :param g: gremlin graph
+    :param rdf_terms: the rdf terms identifying the nodes
+    :param rdf_graph: the graph to which the rdf terms belong, or the LabelResolver computing its labels
+    :param report: the load report to be updated, if any
+    :param node_cache: the NodeCache consulted first and updated with the resolved ids, if any
+    :param upsert: "coalesce" or "merge" to create the vertices only if they do not exist yet, None to add them
+    :return: dict mapping the iri of each term to its vertex id
+    """
+    return await _run_round_trips(resolve_nodes_round_trips(g, rdf_terms, rdf_graph, report, node_cache, upsert))
+
+
+async def write_statements(g, triples, rdf_graph, report=None, node_cache=None, literal_mapper=None,
+                           upsert=COALESCE):
+    """
+        Write the literal properties and the links of a batch of triples whose nodes exist already, as
+        write_statements does
+    :param g: gremlin graph
+    :param triples: the list of (subject, predicate, object) triples
+    :param rdf_graph: the graph to which the triples belong, or the LabelResolver computing its labels
+    :param report: the load report to be updated, if any
+    :param node_cache: the NodeCache holding the vertex ids of the nodes
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: None
+    """
+    await _run_round_trips(write_statements_round_trips(g, triples, rdf_graph, report, node_cache, literal_mapper,
+                                                        upsert))
+
+
+async def _run_round_trips(round_trips):
+    """
+        submit the traversals generated by one of the *_round_trips generators of rdf2g.bulk, as run_round_trips
+        does, without blocking the event loop
+    """
+    try:
+        traversal = next(round_trips)
+        while True:
+            traversal = round_trips.send(await submit(traversal))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _pipeline(coroutines, concurrency):
+    """
+        run the coroutines, starting the next one as soon as one of the concurrency running ones completes; the
+        coroutines are consumed lazily, so a generator of batches is never materialised. When one fails, the
+        running ones are cancelled before the error is raised.
+    """
+    running = set()
+    try:
+        for coroutine in coroutines:
+            if len(running) >= concurrency:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            running.add(asyncio.ensure_future(coroutine))
+        if running:
+            await asyncio.gather(*running)
+    except BaseException:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
@@ -0,0 +1,185 @@
+"""
+bnodes
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import hashlib
+
+import rdflib
+from rdflib.namespace import RDF
+
+from rdf2g.labels import BNODE_IRI_PREFIX, InlinedPredicate
+
+# the blank node strategies; by default a blank node is a vertex labelled and identified by its rdflib id
+FIXED = "fixed"
+SKOLEM = "skolem"
+INLINE = "inline"
+BNODE_STRATEGIES = (FIXED, SKOLEM, INLINE)
+
+
+def map_bnodes(rdf_graph, strategy=SKOLEM):
+    """
+        Return a copy of the RDF graph whose blank nodes are replaced according to the strategy. The copy is
+        loaded, synchronised or exported as any other graph.
+
+        - fixed: every blank node becomes an IRI derived from its rdflib id, labelled "_:bnode", so that the
+          number of vertex labels no longer grows with the number of blank nodes.
+        - skolem: as fixed, but the IRI is derived from the content of the blank node, i.e. its outgoing
+          statements, the nested blank nodes included; so a reload finds the vertices created before, and blank
+          nodes with the same content share a vertex. The blank nodes without statements are identified by
+          their incoming statements instead.
+        - inline: the property bags, i.e. the blank nodes with statements, referenced only once and having no
+          outgoing link but rdf:type and to other property bags, become properties of the node referencing them,
+          keyed by the path of predicates (e.g. "schema:geo/schema:latitude"); their types are string values.
+          The other blank nodes are skolemized.
+
+    :param rdf_graph: the rdf graph
+    :param strategy: "fixed", "skolem" or "inline"
+    :return: the new rdf graph, sharing the namespace prefixes of rdf_graph
+    """
+    if strategy not in BNODE_STRATEGIES:
+        raise ValueError("Unknown blank node strategy %s, expecting one of %s." %
+                         (strategy, ", ".join(BNODE_STRATEGIES)))
+    result = rdflib.Graph()
+    # the prefixes generated while computing the labels of the copy are added to rdf_graph
+    result.namespace_manager = rdf_graph.namespace_manager
+    bags = _property_bags(rdf_graph) if strategy == INLINE else set()
+    iris = {}
+    digests = {}
+
+    def iri(bnode):
+        if bnode not in iris:
+            suffix = str(bnode) if strategy == FIXED else bnode_digest(rdf_graph, bnode, digests)
+            iris[bnode] = rdflib.URIRef(BNODE_IRI_PREFIX + suffix)
+        return iris[bnode]
+
+    for s, p, o in rdf_graph:
+        if s in bags:
+            continue
+        if o in bags:
+            for path, value in _inlined_statements(rdf_graph, o, p):
+                result.add((iri(s) if isinstance(s, rdflib.BNode) else s, path, value))
+            continue
+        result.add((iri(s) if isinstance(s, rdflib.BNode) else s, p, iri(o) if isinstance(o, rdflib.BNode) else o))
+    return result
+
+
+def apply_bnode_strategy(rdf_graph, bnode_strategy=None, triples=None):
+    """
+        return the rdf graph mapped by map_bnodes, or the rdf graph itself if no strategy is provided
+    :param rdf_graph: the rdf graph
+    :param bnode_strategy: "fixed", "skolem", "inline" or None
+    :param triples: the source of triples loaded instead of the triples of rdf_graph, if any; the strategies
+        need the whole graph, so they cannot be applied to it
+    :return: the rdf graph
+    """
+    if bnode_strategy is None:
+        return rdf_graph
+    if triples is not None:
+        raise ValueError("The blank node strategies apply to an rdf graph, not to a source of triples.")
+    return map_bnodes(rdf_graph, bnode_strategy)
+
+
+def bnode_digest(rdf_graph, bnode, digests=None):
+    """
+        compute the content hash of a blank node from its outgoing statements, recursively through the nested
+        blank nodes, or from its incoming statements if it has none. The blank nodes of a cycle are hashed by
+        iterative refinement, as in RDFC-1.0: starting from the same placeholder, every round hashes their
+        statements again with the hashes of the previous round, for as many rounds as there are blank nodes in
+        the cycle, so the digests do not depend on the blank node the cycle is entered from.
+    :param rdf_graph: the rdf graph
+    :param bnode: the blank node
+    :param digests: dict memoizing the digests of the blank nodes, shared between the calls
+    :return: the hexadecimal sha1 digest
+    """
+    digests = {} if digests is None else digests
+    if bnode not in digests:
+        for component in _bnode_components(rdf_graph, bnode, digests):
+            hashes = dict.fromkeys(component, "_")
+            for _ in range(len(component)):
+                hashes = {node: _statements_digest(rdf_graph, node, digests, hashes) for node in component}
+            digests.update(hashes)
+    return digests[bnode]
+
+
+def _statements_digest(rdf_graph, bnode, digests, hashes):
+    """
+        hash the statements of a blank node, the nested blank nodes given by their hash, taken from hashes for
+        the ones of the same cycle
+    """
+    statements = sorted("%s %s" % (p.n3(), hashes[o] if o in hashes else digests[o])
+                        if isinstance(o, rdflib.BNode) else "%s %s" % (p.n3(), o.n3())
+                        for p, o in rdf_graph.predicate_objects(bnode))
+    if not statements:
+        statements = sorted("^%s %s" % (p.n3(), "_" if isinstance(s, rdflib.BNode) else s.n3())
+                            for s, p in rdf_graph.subject_predicates(bnode))
+    return hashlib.sha1("\n".join(statements).encode("utf-8")).hexdigest()
+
+
+def _bnode_components(rdf_graph, bnode, digests):
+    """
+        find the strongly connected components (Tarjan) of the blank nodes reachable from bnode through the
+        outgoing statements, leaving out the ones already in digests; a component comes after the components
+        it references
+    """
+    def successors(node):
+        return iter([o for o in rdf_graph.objects(node) if isinstance(o, rdflib.BNode) and o not in digests])
+
+    index, lowlink, stack, on_stack, components = {bnode: 0}, {bnode: 0}, [bnode], {bnode}, []
+    work = [(bnode, successors(bnode))]
+    while work:
+        node, children = work[-1]
+        for child in children:
+            if child not in index:
+                index[child] = lowlink[child] = len(index)
+                stack.append(child)
+                on_stack.add(child)
+                work.append((child, successors(child)))
+                break
+            if child in on_stack:
+                lowlink[node] = min(lowlink[node], index[child])
+        else:
+            work.pop()
+            if work:
+                lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while not component or component[-1] != node:
+                    component.append(stack.pop())
+                    on_stack.discard(component[-1])
+                components.append(component)
+    return components
+
+
+def _property_bags(rdf_graph):
+    """
+        find the blank nodes that can be inlined into the node referencing them
+    """
+    candidates = set()
+    for bnode in set(rdf_graph.subjects()):
+        if isinstance(bnode, rdflib.BNode) and len(list(rdf_graph.subject_predicates(bnode))) == 1:
+            candidates.add(bnode)
+    # the bags are grown from the innermost ones, so the blank nodes in a cycle are never bags
+    bags = set()
+    changed = True
+    while changed:
+        changed = False
+        for bnode in candidates - bags:
+            if all(isinstance(o, rdflib.Literal) or p == RDF.type and isinstance(o, rdflib.URIRef) or o in bags
+                   for p, o in rdf_graph.predicate_objects(bnode)):
+                bags.add(bnode)
+                changed = True
+    return bags
+
+
+def _inlined_statements(rdf_graph, bag, path):
+    """
+        generate the (predicate path, literal) pairs of a property bag and of the bags nested in it
+    """
+    for p, o in rdf_graph.predicate_objects(bag):
+        if isinstance(o, rdflib.BNode):
+            yield from _inlined_statements(rdf_graph, o, InlinedPredicate(path, p))
+        else:
+            yield InlinedPredicate(path, p), o if isinstance(o, rdflib.Literal) else rdflib.Literal(str(o))
@@ -0,0 +1,597 @@
+"""
+bulk
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+import rdflib
+from gremlin_python.driver.protocol import GremlinServerError
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import Direction, Merge, T, P
+
+from rdf2g.access import close_graph
+from rdf2g.bnodes import apply_bnode_strategy
+from rdf2g.cache import NodeCache
+from rdf2g.index import check_iri_index, IRI_KEY, WARN
+from rdf2g.labels import LabelResolver, node_label, predicate_label
+from rdf2g.literals import literal_property, property_cardinality
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_DELAY = 0.1
+
+# fragments of the server error messages signalling a conflict between concurrent writers
+CONCURRENT_MODIFICATION_ERRORS = ("ConcurrentModification", "LockingException", "Lock expired")
+
+# the idempotent writes of the vertices and edges: the fold().coalesce(unfold(), addV()) pattern, understood by
+# every server, or the mergeV and mergeE steps of TinkerPop 3.6 and later
+COALESCE = "coalesce"
+MERGE = "merge"
+
+# the step label of the elements matching an upsert before the write; nothing matched if the element is created
+EXISTING = "existing"
+
+
+def load_rdf2g_bulk(g, rdf_graph, batch_size=DEFAULT_BATCH_SIZE, node_cache=None, triples=None,
+                    label_resolver=None, on_missing_index=WARN, literal_mapper=None, bnode_strategy=None,
+                    upsert=COALESCE):
+    """
+        Load an RDF graph into a property graph g sending many triples per server round-trip.
+
+        The load runs in two passes over the triples. The first pass streams the distinct subjects and objects and
+        creates the missing vertices in batches: a single lookup and a single addV traversal per batch.
+        The second pass streams the triples again and, using the vertex ids known from the first pass, writes the
+        literal properties and the links with one traversal each per batch. The memory needed is
+        proportional to the node cache, not to the number of triples, and the resulting graph follows the same
+        conventions as load_rdf2g.
+
+    :param g: gremlin graph
+    :param rdf_graph: rdf graph
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used for this load if not provided
+    :param triples: re-iterable source of the triples to load; the triples of rdf_graph if not provided, in which
+        case rdf_graph only supplies the namespace prefixes
+    :param label_resolver: the LabelResolver computing the labels; a new one is used for this load if not provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param bnode_strategy: "fixed", "skolem" or "inline" to map the blank nodes with map_bnodes; the blank nodes
+        are labelled and identified by their rdflib ids if None. Not supported together with triples
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, so that
+        concurrent and repeated loads create neither duplicate nodes nor duplicate links; None to add them without
+        checking, e.g. for the first load into an empty graph
+    :return: the load report, a dict with the number of triples loaded, vertices created, properties written,
+        edges created and round-trips
+    """
+    check_iri_index(g, on_missing_index)
+    report = new_report()
+    node_cache = NodeCache() if node_cache is None else node_cache
+    rdf_graph = apply_bnode_strategy(rdf_graph, bnode_strategy, triples)
+    triples = rdf_graph if triples is None else triples
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
+    for nodes in batches(distinct_nodes(triples), batch_size):
+        resolve_nodes(g, nodes, labels, report, node_cache, upsert)
+    for batch in batches(triples, batch_size):
+        write_statements(g, batch, labels, report, node_cache, literal_mapper, upsert)
+    logging.info('Bulk loaded %(triples)s triples: %(vertices)s new vertices, %(properties)s properties and '
+                 '%(edges)s edges in %(round_trips)s round-trips.' % report)
+    return report
+
+
+def load_rdf2g_parallel(g, rdf_graph, workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE, node_cache=None,
+                        triples=None, graph_factory=None, max_retries=DEFAULT_MAX_RETRIES,
+                        retry_delay=DEFAULT_RETRY_DELAY, label_resolver=None, on_missing_index=WARN,
+                        literal_mapper=None, bnode_strategy=None, upsert=COALESCE):
+    """
+        Load an RDF graph into a property graph g with several workers writing batches at the same time.
+
+        The load follows the two passes of load_rdf2g_bulk. In each pass the batches are distributed over a pool of
+        worker threads, and the edge/property pass starts only after all the vertices are created. The workers
+        share the connection pool of g, or, if a graph_factory is provided, each worker opens its own connection,
+        which is closed at the end of the load (see WorkerGraphs).
+        A traversal rejected because of a concurrent modification is retried alone, with exponential backoff
+        (see submit_on_conflict): a batch is written over several round-trips, and the traversals that succeeded
+        are committed already, so retrying the whole batch would write their properties twice. Every traversal
+        runs in its own transaction on the servers, so a rejected one leaves nothing behind.
+
+    :param g: gremlin graph
+    :param rdf_graph: rdf graph
+    :param workers: the number of batches written at the same time
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used for this load if not provided
+    :param triples: re-iterable source of the triples to load; the triples of rdf_graph if not provided
+    :param graph_factory: function without arguments returning the gremlin graph of a worker
+    :param max_retries: the number of times a conflicting traversal is retried
+    :param retry_delay: the delay in seconds before the first retry, doubled at every retry
+    :param label_resolver: the LabelResolver computing the labels; a new one is used for this load if not provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param bnode_strategy: "fixed", "skolem" or "inline" to map the blank nodes with map_bnodes; the blank nodes
+        are labelled and identified by their rdflib ids if None. Not supported together with triples
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: the load report
+    """
+    check_iri_index(g, on_missing_index)
+    report = new_report()
+    node_cache = NodeCache() if node_cache is None else node_cache
+    rdf_graph = apply_bnode_strategy(rdf_graph, bnode_strategy, triples)
+    triples = rdf_graph if triples is None else triples
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
+
+    submit = functools.partial(submit_on_conflict, max_retries=max_retries, retry_delay=retry_delay)
+
+    def load_batch(round_trips, batch):
+        batch_report = new_report()
+        run_round_trips(round_trips(worker_graphs.get(), batch, labels, batch_report, node_cache), submit)
+        return batch_report
+
+    with WorkerGraphs(g, graph_factory) as worker_graphs, ThreadPoolExecutor(max_workers=workers) as executor:
+        resolve = functools.partial(resolve_nodes_round_trips, upsert=upsert)
+        write = functools.partial(write_statements_round_trips, literal_mapper=literal_mapper, upsert=upsert)
+        for round_trips, items in ((resolve, distinct_nodes(triples)), (write, triples)):
+            pending = set()
+            for batch in batches(items, batch_size):
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    merge_reports(report, *[future.result() for future in done])
+                pending.add(executor.submit(load_batch, round_trips, batch))
+            merge_reports(report, *[future.result() for future in wait(pending).done])
+    logging.info('Loaded %(triples)s triples with %(workers)s workers: %(vertices)s new vertices, %(properties)s '
+                 'properties and %(edges)s edges in %(round_trips)s round-trips.' % dict(report, workers=workers))
+    return report
+
+
+class WorkerGraphs(object):
+    """
+        The gremlin graphs of the worker threads of a parallel load. With a graph factory, every worker opens its
+        own graph on first use; otherwise the workers share g. Used as a context manager, the graphs opened by
+        the factory are closed on exit, once the workers are done.
+
+            with WorkerGraphs(g, graph_factory) as worker_graphs, ThreadPoolExecutor(workers) as executor:
+                executor.map(lambda batch: write(worker_graphs.get(), batch), batches)
+    """
+
+    def __init__(self, g, graph_factory=None):
+        """
+        :param g: the gremlin graph shared by the workers without a factory
+        :param graph_factory: function without arguments returning the gremlin graph of a worker, if any
+        """
+        self.g = g
+        self.graph_factory = graph_factory
+        self._graphs = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self):
+        """
+            return the gremlin graph of the calling worker thread, opening it with the factory the first time
+        :return: gremlin graph
+        """
+        if self.graph_factory is None:
+            return self.g
+        worker_g = getattr(self._local, "g", None)
+        if worker_g is None:
+            worker_g = self._local.g = self.graph_factory()
+            with self._lock:
+                self._graphs.append(worker_g)
+        return worker_g
+
+    def close(self):
+        """
+            close the graphs opened by the factory
+        :return: None
+        """
+        with self._lock:
+            graphs, self._graphs = self._graphs, []
+        for worker_g in graphs:
+            close_graph(worker_g)
+        logging.debug('Closed the graphs of %s workers.' % len(graphs))
+
+
+def retry_on_conflict(task, max_retries=DEFAULT_MAX_RETRIES, retry_delay=DEFAULT_RETRY_DELAY):
+    """
+        run the task, retrying it with exponential backoff when the server reports a concurrent modification.
+        The task must leave nothing behind when it fails, e.g. write in a single traversal; see submit_on_conflict
+    :param task: function taking the report of the attempt
+    :param max_retries: the number of retries before giving up
+    :param retry_delay: the delay in seconds before the first retry, doubled at every retry
+    :return: the report of the successful attempt
+    """
+    def attempt():
+        report = new_report()
+        task(report)
+        return report
+
+    return _retrying(attempt, max_retries, retry_delay)
+
+
+def submit_on_conflict(traversal, max_retries=DEFAULT_MAX_RETRIES, retry_delay=DEFAULT_RETRY_DELAY):
+    """
+        submit a traversal, submitting it again with exponential backoff when the server reports a concurrent
+        modification; a traversal runs in its own transaction, so a rejected one has written nothing
+    :param traversal: the traversal
+    :param max_retries: the number of retries before giving up
+    :param retry_delay: the delay in seconds before the first retry, doubled at every retry
+    :return: the list of results
+    """
+    return _retrying(lambda: traversal.clone().toList(), max_retries, retry_delay)
+
+
+def _retrying(function, max_retries, retry_delay):
+    """
+        call the function, calling it again with exponential backoff after a concurrent modification
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return function()
+        except GremlinServerError as e:
+            if attempt == max_retries or not any(error in str(e) for error in CONCURRENT_MODIFICATION_ERRORS):
+                raise
+            logging.debug('Concurrent modification, retrying: %s' % str(e))
+            time.sleep(retry_delay * 2 ** attempt)
+
+
+def new_report():
+    """
+        return an empty load report
+    """
+    return {"triples": 0, "vertices": 0, "properties": 0, "edges": 0, "round_trips": 0}
+
+
+def merge_reports(report, *reports):
+    """
+        add the counts of the reports to the first one
+    :param report: the load report to be updated
+    :param reports: the load reports to be added
+    :return: the updated report
+    """
+    for other in reports:
+        for key, value in other.items():
+            report[key] = report.get(key, 0) + value
+    return report
+
+
+def batches(iterable, batch_size):
+    """
+        split an iterable into lists of at most batch_size items, without consuming more than one batch at a time
+    :param iterable: the items
+    :param batch_size: the maximum size of a batch
+    :return: generator of lists
+    """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+
+def distinct_nodes(triples):
+    """
+        generate the distinct subjects and objects that become graph nodes, i.e. the URIs and the blank nodes
+    :param triples: the iterable of (subject, predicate, object) triples
+    :return: generator of rdf terms
+    """
+    seen = set()
+    for s, p, o in triples:
+        for term in (s, o):
+            if isinstance(term, (rdflib.URIRef, rdflib.BNode)) and term not in seen:
+                seen.add(term)
+                yield term
+
+
+def write_statements(g, triples, rdf_graph, report=None, node_cache=None, literal_mapper=None, upsert=COALESCE):
+    """
+        Write a batch of triples as literal properties and links between nodes. The nodes are resolved through the
+        node cache, so the vertices are expected to be created beforehand; otherwise they are created on the fly.
+    :param g: gremlin graph
+    :param triples: the list of (subject, predicate, object) triples
+    :param rdf_graph: the graph to which the triples belong, or the LabelResolver computing its labels
+    :param report: the load report to be updated, if any
+    :param node_cache: the NodeCache holding the vertex ids of the nodes
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: None
+    """
+    run_round_trips(write_statements_round_trips(g, triples, rdf_graph, report, node_cache, literal_mapper, upsert))
+
+
+def write_statements_round_trips(g, triples, rdf_graph, report=None, node_cache=None, literal_mapper=None,
+                                 upsert=COALESCE):
+    """
+        generate the traversals of write_statements, see run_round_trips
+    """
+    terms = [term for s, p, o in triples for term in (s, o) if isinstance(term, (rdflib.URIRef, rdflib.BNode))]
+    node_ids = yield from resolve_nodes_round_trips(g, terms, rdf_graph, report, node_cache, upsert)
+    properties, links = split_statements(triples, node_ids, rdf_graph, literal_mapper)
+    yield from add_properties_round_trips(g, properties, report, property_cardinality(literal_mapper))
+    yield from add_links_round_trips(g, links, report, upsert)
+    if report is not None:
+        report["triples"] += len(triples)
+
+
+def resolve_nodes(g, rdf_terms, rdf_graph, report=None, node_cache=None, upsert=COALESCE):
+    """
+        Find the vertex ids of the given RDF terms, creating the vertices that do not exist yet.
+        Costs one round-trip for the lookup of the terms missing from the node cache and, if anything is missing
+        from the graph as well, one more for the creation. With upsert, a vertex created by another loader
+        between the two round-trips is not created again, nor counted in the report.
+    :param g: gremlin graph
+    :param rdf_terms: the rdf terms identifying the nodes
+    :param rdf_graph: the graph to which the rdf terms belong, or the LabelResolver computing its labels
+    :param report: the load report to be updated, if any, with the number of vertices actually created
+    :param node_cache: the NodeCache consulted first and updated with the resolved ids, if any
+    :param upsert: "coalesce" or "merge" to create the vertices only if they do not exist yet, None to add them
+    :return: dict mapping the iri of each term to its vertex id
+    """
+    return run_round_trips(resolve_nodes_round_trips(g, rdf_terms, rdf_graph, report, node_cache, upsert))
+
+
+def resolve_nodes_round_trips(g, rdf_terms, rdf_graph, report=None, node_cache=None, upsert=COALESCE):
+    """
+        generate the traversals of resolve_nodes, see run_round_trips
+    """
+    terms = {str(term): term for term in rdf_terms}
+    node_ids = cached_node_ids(terms, node_cache)
+    unknown = [iri for iri in terms if iri not in node_ids]
+    if not unknown:
+        return node_ids
+    found = yield lookup_nodes_traversal(g, unknown)
+    node_ids.update({item["iri"]: item["id"] for item in found})
+    missing = [iri for iri in unknown if iri not in node_ids]
+    if report is not None:
+        report["round_trips"] += 1
+    if missing:
+        created = yield create_nodes_traversal(g, [terms[iri] for iri in missing], rdf_graph, upsert)
+        node_ids.update({item["iri"]: item["id"] for item in created})
+        if report is not None:
+            report["vertices"] += sum(1 for item in created if item["created"])
+            report["round_trips"] += 1
+    if node_cache is not None:
+        for iri in unknown:
+            node_cache.put(iri, node_ids[iri])
+    return node_ids
+
+
+def add_properties(g, properties, report=None, cardinality=None):
+    """
+        Add the properties to their vertices in a single traversal; a property whose vertex is not found, e.g.
+        removed meanwhile, is skipped without affecting the others
+    :param g: gremlin graph
+    :param properties: list of (vertex id, property key, property value) tuples
+    :param report: the load report to be updated, if any, with the number of properties actually written
+    :param cardinality: the cardinality of the properties, None for the default cardinality of the server
+    :return: the number of properties written
+    """
+    return run_round_trips(add_properties_round_trips(g, properties, report, cardinality))
+
+
+def add_properties_round_trips(g, properties, report=None, cardinality=None):
+    """
+        generate the traversal of add_properties, see run_round_trips
+    """
+    if not properties:
+        return 0
+    written = (yield add_properties_traversal(g, properties, cardinality))[0]
+    if written < len(properties):
+        logging.warning('%s properties are skipped, their vertices are not found.' % (len(properties) - written))
+    if report is not None:
+        report["properties"] += written
+        report["round_trips"] += 1
+    return written
+
+
+def add_links(g, links, report=None, upsert=COALESCE):
+    """
+        Create the edges between existent vertices in a single traversal; a link whose source or target vertex is
+        not found, e.g. removed meanwhile, is skipped without affecting the others
+    :param g: gremlin graph
+    :param links: list of (source vertex id, edge label, target vertex id) tuples
+    :param report: the load report to be updated, if any, with the number of edges actually created; with
+        upsert, the links whose edge exists already are not counted
+    :param upsert: "coalesce" or "merge" to create the edges only if they do not exist yet, None to add them
+    :return: the number of edges created
+    """
+    return run_round_trips(add_links_round_trips(g, links, report, upsert))
+
+
+def add_links_round_trips(g, links, report=None, upsert=COALESCE):
+    """
+        generate the traversal of add_links, see run_round_trips
+    """
+    if not links:
+        return 0
+    flags = yield add_links_traversal(g, links, upsert)
+    if len(flags) < len(links):
+        logging.warning('%s links are skipped, their vertices are not found.' % (len(links) - len(flags)))
+    created = sum(1 for flag in flags if flag)
+    if report is not None:
+        report["edges"] += created
+        report["round_trips"] += 1
+    return created
+
+
+def run_round_trips(round_trips, submit=None):
+    """
+        Submit the traversals generated by one of the *_round_trips generators, sending the results of each one
+        back to the generator, which returns the outcome. The generators hold the logic of the loading functions,
+        shared by the blocking functions, run here, and by their asyncio counterparts, see rdf2g.aio.
+    :param round_trips: the generator, yielding a traversal per round-trip
+    :param submit: function submitting a traversal and returning its results, e.g. submit_on_conflict; toList
+        if None
+    :return: the value returned by the generator
+    """
+    try:
+        traversal = next(round_trips)
+        while True:
+            traversal = round_trips.send(traversal.toList() if submit is None else submit(traversal))
+    except StopIteration as stop:
+        return stop.value
+
+
+def split_statements(triples, node_ids, rdf_graph, literal_mapper=None):
+    """
+        Turn a batch of triples into the properties and the links to be written
+    :param triples: the list of (subject, predicate, object) triples
+    :param node_ids: dict mapping the iri of every subject and object node to its vertex id
+    :param rdf_graph: the graph to which the triples belong, or the LabelResolver computing its labels
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :return: the list of (vertex id, property key, property value) tuples and
+        the list of (source vertex id, edge label, target vertex id) tuples
+    """
+    properties = []
+    links = []
+    for s, p, o in triples:
+        if isinstance(o, (rdflib.URIRef, rdflib.BNode)):
+            links.append((node_ids[str(s)], predicate_label(p, rdf_graph), node_ids[str(o)]))
+        elif isinstance(o, rdflib.Literal):
+            key, value = literal_property(predicate_label(p, rdf_graph), o, literal_mapper)
+            properties.append((node_ids[str(s)], key, value))
+    return properties, links
+
+
+def cached_node_ids(terms, node_cache=None):
+    """
+        Look up the vertex ids of the nodes in the node cache
+    :param terms: the node IRIs
+    :param node_cache: the NodeCache, if any
+    :return: dict mapping the cached node IRIs to their vertex ids
+    """
+    node_ids = {}
+    if node_cache is not None:
+        for iri in terms:
+            node_id = node_cache.get(iri)
+            if node_id is not None:
+                node_ids[iri] = node_id
+    return node_ids
+
+
+def lookup_nodes_traversal(g, iris):
+    """
+        Build the traversal finding the vertices of the given IRIs, projected as {"iri": ..., "id": ...} maps
+    :param g: gremlin graph or traversal
+    :param iris: the node IRIs
+    :return: the traversal
+    """
+    return g.V().has("iri", P.within(*iris)).project("iri", "id").by("iri").by(T.id)
+
+
+def create_nodes_traversal(g, rdf_terms, rdf_graph, upsert=None):
+    """
+        Build the traversal creating a vertex for each of the rdf terms, in a single round-trip, and returning
+        their {"iri": ..., "id": ..., "created": ...} maps; created is False for the vertices that existed already
+    :param g: gremlin graph
+    :param rdf_terms: the rdf terms identifying the new nodes
+    :param rdf_graph: the graph to which the rdf terms belong, or the LabelResolver computing its labels
+    :param upsert: "coalesce" or "merge" to create only the vertices that do not exist yet, None to add them all
+    :return: the traversal
+    """
+    return g.inject(0).union(*[upsert_node_traversal(__, term, rdf_graph, upsert).
+                               project("iri", "id", "created").by(IRI_KEY).by(T.id).by(created_flag(upsert=upsert))
+                               for term in rdf_terms])
+
+
+def upsert_node_traversal(g, rdf_term, rdf_graph, upsert=COALESCE):
+    """
+        Build the traversal returning the vertex of the rdf term, which is created, in the same round-trip, only if
+        no vertex has its iri. The vertices found are labelled "existing", see created_flag.
+    :param g: gremlin graph or anonymous traversal
+    :param rdf_term: the rdf term identifying the node
+    :param rdf_graph: the graph to which the rdf term belongs, or the LabelResolver computing its label
+    :param upsert: "coalesce" for the fold().coalesce(unfold(), addV()) pattern, "merge" for the mergeV step,
+        None to add the vertex without looking for it
+    :return: the traversal
+    """
+    iri = str(rdf_term)
+    label = node_label(rdf_term, rdf_graph)
+    if upsert is None:
+        return g.addV(label).property(IRI_KEY, iri)
+    existing = g.V().has(IRI_KEY, iri).fold().as_(EXISTING)
+    if upsert == MERGE:
+        return existing.merge_v({IRI_KEY: iri}).option(Merge.on_create, {T.label: label, IRI_KEY: iri})
+    return existing.coalesce(__.unfold(), __.addV(label).property(IRI_KEY, iri))
+
+
+def add_properties_traversal(g, properties, cardinality=None):
+    """
+        Build the traversal adding the properties to their vertices, in a single round-trip, and returning the
+        number of properties written. Every property is written by its own branch, so a vertex that is not found
+        only skips its own properties.
+    :param g: gremlin graph
+    :param properties: list of (vertex id, property key, property value) tuples
+    :param cardinality: the cardinality of the properties, None for the default cardinality of the server
+    :return: the traversal
+    """
+    if cardinality is not None:
+        branches = [__.V(node_id).property(cardinality, key, value) for node_id, key, value in properties]
+    else:
+        branches = [__.V(node_id).property(key, value) for node_id, key, value in properties]
+    return g.inject(0).union(*branches).count()
+
+
+def add_links_traversal(g, links, upsert=None):
+    """
+        Build the traversal creating the edges between existent vertices, in a single round-trip, and returning
+        the created flag of every link written, see created_flag. Every link is written by its own branch, so a
+        vertex that is not found only skips its own links.
+    :param g: gremlin graph
+    :param links: list of (source vertex id, edge label, target vertex id) tuples
+    :param upsert: "coalesce" or "merge" to create only the edges that do not exist yet, None to add them all
+    :return: the traversal
+    """
+    return g.inject(0).union(*[created_flag(upsert_link_traversal(__, source_id, label, target_id, upsert), upsert)
+                               for source_id, label, target_id in links])
+
+
+def upsert_link_traversal(g, source_id, label, target_id, upsert=COALESCE):
+    """
+        Build the traversal returning the edge with the label between the two vertices, which is created, in the
+        same round-trip, only if there is none. The edges found are labelled "existing", see created_flag. The
+        traversal is empty if one of the vertices is not found.
+    :param g: gremlin graph or anonymous traversal
+    :param source_id: the id of the source vertex
+    :param label: the edge label
+    :param target_id: the id of the target vertex
+    :param upsert: "coalesce" for the coalesce(outE(), addE()) pattern, "merge" for the mergeE step, None to
+        add the edge without looking for it
+    :return: the traversal
+    """
+    ends = g.V(source_id).filter_(__.V(target_id))
+    if upsert is None:
+        return ends.addE(label).to(__.V(target_id))
+    existing = __.outE(label).where(__.inV().hasId(target_id))
+    if upsert == MERGE:
+        return ends.map(existing.fold()).as_(EXISTING). \
+            merge_e({T.label: label, Direction.OUT: source_id, Direction.IN: target_id})
+    # the label is set outside the coalesce step, whose children do not pass their labels on
+    return ends.as_("source").map(existing.fold()).as_(EXISTING). \
+        coalesce(__.unfold(), __.addE(label).from_("source").to(__.V(target_id)))
+
+
+def created_flag(traversal=__, upsert=COALESCE):
+    """
+        Map the elements written by upsert_node_traversal or upsert_link_traversal to True if they were created,
+        False if they existed already
+    :param traversal: the traversal writing the elements; the flag is an anonymous traversal, e.g. for a by()
+        modulator, if not provided
+    :param upsert: the upsert of the elements; without upsert, every element written is created
+    :return: the traversal
+    """
+    if upsert is None:
+        return traversal.constant(True)
+    return traversal.coalesce(__.select(EXISTING).unfold().constant(False), __.constant(True))
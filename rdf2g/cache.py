@@ -0,0 +1,238 @@
+"""
+cache
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import rdflib
+from gremlin_python.process.traversal import T
+from gremlin_python.structure.graph import Vertex
+
+from rdf2g.retrieve import get_node
+
+DEFAULT_VERTEX_CACHE_SIZE = 10000
+# the seconds after which a cached vertex is resolved again by the server
+DEFAULT_VERTEX_CACHE_TTL = 300
+
+# the vertex caches alive, invalidated by the update functions
+_vertex_caches = weakref.WeakSet()
+
+
+class NodeCache(object):
+    """
+        Client side map of node IRIs to vertex ids, used to avoid asking the server about nodes it has already seen.
+        When maxsize is provided, the least recently used entries are evicted once the cache is full.
+        The cache can be shared by the threads of a parallel load.
+    """
+
+    def __init__(self, maxsize=None):
+        """
+        :param maxsize: the maximum number of entries, or None for an unbounded cache
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, iri):
+        return str(iri) in self._ids
+
+    def get(self, iri, default=None):
+        """
+            return the vertex id cached for the iri, or default if the iri is unknown
+        :param iri: the node URI
+        :param default: the value returned on a cache miss
+        :return: the vertex id
+        """
+        key = str(iri)
+        with self._lock:
+            if key not in self._ids:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.maxsize is not None:
+                self._ids.move_to_end(key)
+            return self._ids[key]
+
+    def put(self, iri, node_id):
+        """
+            remember the vertex id of the iri
+        :param iri: the node URI
+        :param node_id: the vertex id
+        :return: None
+        """
+        key = str(iri)
+        with self._lock:
+            self._ids[key] = node_id
+            if self.maxsize is not None:
+                self._ids.move_to_end(key)
+                while len(self._ids) > self.maxsize:
+                    self._ids.popitem(last=False)
+
+    def invalidate(self, iri=None):
+        """
+            forget the vertex id of the iri, or the entire cache if no iri is provided
+        :param iri: the node URI
+        :return: None
+        """
+        with self._lock:
+            if iri is None:
+                self._ids.clear()
+            else:
+                self._ids.pop(str(iri), None)
+
+    def resolve(self, g, rdf_term):
+        """
+            return the node identified by rdf_term, asking the server only when it is not cached
+        :param g: gremlin graph
+        :param rdf_term: the rdf term identifying the node
+        :return: the node, or an empty list if it does not exist
+        """
+        node_id = self.get(rdf_term)
+        if node_id is not None:
+            return Vertex(node_id)
+        node = get_node(g, rdf_term)
+        if node:
+            self.put(rdf_term, node.id)
+        return node
+
+    def warm_up(self, g):
+        """
+            fill the cache with the IRIs and ids of the nodes already present in the graph, in a single scan
+        :param g: gremlin graph
+        :return: the cache itself
+        """
+        for item in g.V().has("iri").project("iri", "id").by("iri").by(T.id).toList():
+            self.put(item["iri"], item["id"])
+        logging.info('%s nodes loaded into the node cache.' % str(len(self)))
+        return self
+
+
+class VertexCache(object):
+    """
+        Read-through cache of the nodes resolved by get_node, for the services resolving the same nodes over and
+        over. The least recently used entries are evicted once maxsize is reached, and the entries expire after
+        ttl seconds, so that the changes made by other clients are eventually seen.
+
+        clear_graph, create_node and the node removals of sync_rdf2g invalidate every vertex cache; the
+        applications changing the nodes otherwise shall call invalidate. A node cached under its label is
+        forgotten together with its iri only if it was also cached under the iri, otherwise when it expires.
+    """
+
+    def __init__(self, maxsize=DEFAULT_VERTEX_CACHE_SIZE, ttl=DEFAULT_VERTEX_CACHE_TTL, timer=time.monotonic):
+        """
+        :param maxsize: the maximum number of entries, or None for an unbounded cache
+        :param ttl: the seconds an entry is kept, or None to keep the entries until they are invalidated
+        :param timer: function returning the current time in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        # the key of the node identifier mapped to the (node, expiry time) pair
+        self._entries = OrderedDict()
+        # the vertex id mapped to the keys under which the vertex is cached
+        self._keys = {}
+        self._lock = threading.Lock()
+        _vertex_caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_node(self, g, id_):
+        """
+            return the node identified by id_, as get_node does, asking the server only when it is not cached
+        :param g: gremlin graph
+        :param id_: the node id, URI, label or gremlin Vertex
+        :return: the node, or an empty list if it does not exist; the missing nodes are not cached
+        """
+        if isinstance(id_, Vertex):
+            return id_
+        key = _vertex_key(id_)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > self.timer()):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+        node = get_node(g, id_)
+        if node:
+            self._put(key, node)
+        return node
+
+    def invalidate(self, *nodes):
+        """
+            forget the given nodes, or the entire cache if no node is provided
+        :param nodes: the node URIs, labels, ids or gremlin Vertex objects
+        :return: None
+        """
+        with self._lock:
+            if not nodes:
+                self._entries.clear()
+                self._keys.clear()
+                return
+            vertex_ids = set()
+            for node in nodes:
+                if isinstance(node, Vertex):
+                    vertex_ids.add(node.id)
+                    continue
+                keys = [("iri", str(node)), ("name", str(node))] if isinstance(node, str) else [_vertex_key(node)]
+                for key in keys:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        vertex_ids.add(entry[0].id)
+                if not isinstance(node, str):
+                    vertex_ids.add(node)
+            for vertex_id in vertex_ids:
+                for key in self._keys.pop(vertex_id, ()):
+                    self._entries.pop(key, None)
+
+    def _put(self, key, node):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (node, None if self.ttl is None else self.timer() + self.ttl)
+            self._keys.setdefault(node.id, set()).add(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys.get(entry[0].id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys[entry[0].id]
+
+
+def invalidate_vertex_caches(*nodes):
+    """
+        forget the given nodes, or all the nodes if none is provided, in every VertexCache
+    :param nodes: the node URIs, labels, ids or gremlin Vertex objects
+    :return: None
+    """
+    for cache in list(_vertex_caches):
+        cache.invalidate(*nodes)
+
+
+def _vertex_key(id_):
+    """
+        the cache key of a node identifier, distinguishing the URIs from the strings that may be labels
+    """
+    if isinstance(id_, (rdflib.URIRef, rdflib.BNode)):
+        return "iri", str(id_)
+    return ("name", id_) if isinstance(id_, str) else ("id", id_)
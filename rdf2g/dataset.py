@@ -0,0 +1,112 @@
+"""
+dataset
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import rdflib
+from gremlin_python.process.strategies import PartitionStrategy
+
+from rdf2g.bulk import DEFAULT_BATCH_SIZE, COALESCE, WorkerGraphs, load_rdf2g_bulk, merge_reports, new_report
+from rdf2g.cache import NodeCache
+from rdf2g.index import check_iri_index, WARN
+from rdf2g.labels import LabelResolver
+from rdf2g.update import clear_graph
+
+# the vertex and edge property holding the name of the graph the element was loaded from
+DEFAULT_PARTITION_KEY = "graph"
+
+
+def load_dataset(g, dataset, graphs=None, partition_key=DEFAULT_PARTITION_KEY, workers=1, graph_factory=None,
+                 batch_size=DEFAULT_BATCH_SIZE, label_resolver=None, on_missing_index=WARN, literal_mapper=None,
+                 bnode_strategy=None, upsert=COALESCE):
+    """
+        Load the named graphs of an RDF dataset into a property graph g, each graph into its own partition.
+
+        Every graph is bulk loaded through a TinkerPop PartitionStrategy (see graph_source): its vertices and
+        edges carry the graph name in the partition_key property, and the node lookups only see the partition
+        being loaded. So a node appearing in several graphs has a vertex in each of them, the provenance of
+        every statement is kept, and a graph can be dropped (drop_graph) and reloaded without touching the others.
+        As the partitions do not share vertices, several graphs are loaded at the same time by the workers.
+        The iri index must not be unique, see ensure_indexes.
+
+    :param g: gremlin graph
+    :param dataset: the rdflib.Dataset or rdflib.ConjunctiveGraph; a plain rdflib.Graph is loaded as one graph
+    :param graphs: the names of the graphs to load, all the non empty graphs if None
+    :param partition_key: the property holding the graph name
+    :param workers: the number of graphs loaded at the same time
+    :param graph_factory: function without arguments returning the gremlin graph of a worker, closed at the end of
+        the load; the workers share g if None
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param label_resolver: the LabelResolver computing the labels; a new one is used for this load if not provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param bnode_strategy: "fixed", "skolem" or "inline" to map the blank nodes of every graph with map_bnodes
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: the load report with the totals, and the report of every graph by name under "graphs"
+    """
+    check_iri_index(g, on_missing_index)
+    contexts = list(dataset.contexts()) if isinstance(dataset, rdflib.ConjunctiveGraph) else [dataset]
+    contexts = [context for context in contexts if len(context) and
+                (graphs is None or str(context.identifier) in graphs)]
+    labels = LabelResolver(dataset) if label_resolver is None else label_resolver
+
+    def load(context):
+        graph_name = str(context.identifier)
+        logging.info('Loading the graph %s.' % graph_name)
+        return graph_name, load_rdf2g_bulk(graph_source(worker_graphs.get(), graph_name, partition_key), context,
+                                           batch_size=batch_size, node_cache=NodeCache(), label_resolver=labels,
+                                           on_missing_index=None, literal_mapper=literal_mapper,
+                                           bnode_strategy=bnode_strategy, upsert=upsert)
+
+    with WorkerGraphs(g, graph_factory) as worker_graphs, ThreadPoolExecutor(max_workers=workers) as executor:
+        reports = dict(executor.map(load, contexts))
+    report = merge_reports(new_report(), *reports.values())
+    logging.info('Loaded %s graphs: %s triples, %s new vertices, %s properties and %s edges.' %
+                 (len(reports), report["triples"], report["vertices"], report["properties"], report["edges"]))
+    report["graphs"] = reports
+    return report
+
+
+def graph_source(g, graph_name, partition_key=DEFAULT_PARTITION_KEY, read_graphs=()):
+    """
+        Return the traversal source of g restricted to a graph of the dataset by a PartitionStrategy: the
+        vertices and edges added through it belong to the graph and the traversals only see the elements of the
+        graph and of the read_graphs. The rdf2g functions accept it as any gremlin graph.
+    :param g: gremlin graph
+    :param graph_name: the name of the graph, e.g. the IRI of a named graph
+    :param partition_key: the property holding the graph name
+    :param read_graphs: the names of the other graphs visible through the traversal source
+    :return: gremlin graph
+    """
+    read_partitions = [str(graph_name)] + [str(name) for name in read_graphs if str(name) != str(graph_name)]
+    return g.withStrategies(PartitionStrategy(partition_key=partition_key, write_partition=str(graph_name),
+                                              read_partitions=read_partitions))
+
+
+def drop_graph(g, graph_name, partition_key=DEFAULT_PARTITION_KEY, batch_size=None):
+    """
+        Remove the vertices and edges of a graph of the dataset, leaving the other graphs untouched
+    :param g: gremlin graph
+    :param graph_name: the name of the graph
+    :param partition_key: the property holding the graph name
+    :param batch_size: the number of elements dropped in one round-trip, None for a single traversal
+    :return: True
+    """
+    logging.info('Dropping the graph %s.' % str(graph_name))
+    return clear_graph(graph_source(g, graph_name, partition_key), batch_size=batch_size)
+
+
+def dataset_graph_names(g, partition_key=DEFAULT_PARTITION_KEY):
+    """
+        return the sorted names of the graphs loaded into g by load_dataset
+    :param g: gremlin graph
+    :param partition_key: the property holding the graph name
+    :return: list of graph names
+    """
+    return sorted(g.V().values(partition_key).dedup().toList())
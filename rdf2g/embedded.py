@@ -0,0 +1,967 @@
+"""
+embedded
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+
+In-process property graph, for the small graphs and the tests that do not need a Gremlin server. The traversal
+bytecode sent by gremlinpython is interpreted over an in-memory graph; the steps used by rdf2g are supported.
+"""
+
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Binding, Bytecode, Cardinality, Direction, Merge, Order, P, T, Traverser, \
+    WithOptions
+from gremlin_python.structure.graph import Edge, Path, Property, Vertex, VertexProperty
+
+from rdf2g.index import IRI_KEY
+
+# the modulators are not steps, they configure the step preceding them
+_MODULATORS = ("by", "to", "from", "with", "until", "emit", "times", "option")
+
+# the steps whose elements are filtered by a PartitionStrategy
+_PARTITIONED_STEPS = ("V", "E", "outE", "inE", "bothE", "inV", "outV", "otherV", "out", "in")
+
+_PREDICATES = {
+    "eq": lambda x, y: x == y,
+    "neq": lambda x, y: x != y,
+    "lt": lambda x, y: x is not None and x < y,
+    "lte": lambda x, y: x is not None and x <= y,
+    "gt": lambda x, y: x is not None and x > y,
+    "gte": lambda x, y: x is not None and x >= y,
+    "within": lambda x, y: x in y,
+    "without": lambda x, y: x not in y,
+    "between": lambda x, y: x is not None and y[0] <= x < y[1],
+    "inside": lambda x, y: x is not None and y[0] < x < y[1],
+    "outside": lambda x, y: x is not None and (x < y[0] or x > y[1]),
+    "containing": lambda x, y: isinstance(x, str) and y in x,
+    "notContaining": lambda x, y: isinstance(x, str) and y not in x,
+    "startingWith": lambda x, y: isinstance(x, str) and x.startswith(y),
+    "notStartingWith": lambda x, y: isinstance(x, str) and not x.startswith(y),
+    "endingWith": lambda x, y: isinstance(x, str) and x.endswith(y),
+    "notEndingWith": lambda x, y: isinstance(x, str) and not x.endswith(y),
+    "regex": lambda x, y: isinstance(x, str) and re.search(y, x) is not None,
+    "notRegex": lambda x, y: isinstance(x, str) and re.search(y, x) is None,
+}
+
+
+def embedded_graph(graph=None):
+    """
+        Create a gremlin graph backed by an in-process property graph instead of a Gremlin server. It is accepted
+        by every rdf2g function and works offline, e.g. for the vocabularies loaded in batch jobs and for the tests.
+    :param graph: the EmbeddedGraph holding the data; a new, empty one if None
+    :return: gremlin graph; the connection is available as g.remote_connection and the data as
+        g.remote_connection.graph
+    """
+    return traversal().withRemote(EmbeddedConnection(graph))
+
+
+class EmbeddedConnection(RemoteConnection):
+    """
+        Remote connection answering the traversals in-process, one at a time, and counting the round-trips.
+        The asynchronous submissions, e.g. of the rdf2g.aio coroutines, are answered by worker threads, as a
+        driver connection answers them when the server responds, so the event loop is never blocked.
+    """
+
+    def __init__(self, graph=None, max_workers=None):
+        """
+        :param graph: the EmbeddedGraph holding the data; a new, empty one if None
+        :param max_workers: the number of threads answering the asynchronous submissions; the default of
+            ThreadPoolExecutor if None
+        """
+        RemoteConnection.__init__(self, "embedded", "g")
+        self.graph = graph if graph is not None else EmbeddedGraph()
+        self.round_trips = 0
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+
+    def submit(self, bytecode):
+        with self._lock:
+            self.round_trips += 1
+        results = self.graph.execute(bytecode)
+        return RemoteTraversal(iter([Traverser(result) for result in results]))
+
+    def submit_async(self, bytecode):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="rdf2g-embedded")
+        return self._executor.submit(self.submit, bytecode)
+
+    def is_closed(self):
+        return self._closed
+
+    def close(self):
+        with self._lock:
+            executor, self._executor, self._closed = self._executor, None, True
+        if executor is not None:
+            executor.shutdown()
+
+
+class _Traverser(object):
+    """
+        the object at the current step of a traversal, the path leading to it as (object, previous path) pairs,
+        the step labels and the loop counter
+    """
+    __slots__ = ("obj", "path", "labels", "loops")
+
+    def __init__(self, obj, path=None, labels=None, loops=0):
+        self.obj = obj
+        self.path = (obj, path)
+        self.labels = labels if labels is not None else {}
+        self.loops = loops
+
+    def split(self, obj):
+        traverser = _Traverser.__new__(_Traverser)
+        traverser.obj, traverser.path = obj, (obj, self.path)
+        traverser.labels, traverser.loops = self.labels, self.loops
+        return traverser
+
+    def objects(self):
+        objects = []
+        path = self.path
+        while path is not None:
+            objects.append(path[0])
+            path = path[1]
+        return objects[::-1]
+
+
+class EmbeddedGraph(object):
+    """
+        In-memory property graph with the labels and the property cardinality of a TinkerGraph.
+
+        The vertex and edge ids are their positions in compact arrays: the labels (shared between the elements),
+        the property dicts and the adjacency lists of edge ids, which are created only for the vertices having
+        properties or edges. The iri property and the vertex labels are hash indexed, so the node lookups of
+        rdf2g do not scan the graph.
+    """
+
+    def __init__(self, default_cardinality=Cardinality.list_):
+        """
+        :param default_cardinality: the cardinality of the properties added without one, Cardinality.list_ as
+            in the default configuration of the Gremlin server, or Cardinality.single
+        """
+        self.default_cardinality = default_cardinality
+        # a removed element leaves a None label behind, so that the ids are never reused
+        self.vertex_labels = []
+        self.vertex_properties = []
+        self.out_edges = []
+        self.in_edges = []
+        self.edge_labels = []
+        # the out and in vertex ids of the edge i are at 2i and 2i + 1
+        self.edge_ends = array("q")
+        self.edge_properties = {}
+        self.label_index = {}
+        # the iri mapped to the vertex id, or to the list of vertex ids in the rare case of duplicates
+        self.iri_index = {}
+        self.vertex_count = 0
+        self.edge_count = 0
+        self._labels = {}
+        # the values seen by the dedup steps of the enclosing repeat steps, which are kept across the iterations
+        self._repeat_seen = []
+        # the configuration of the PartitionStrategy of the running traversal, if any
+        self._partition = None
+        # the graph may be shared by several connections, the traversals run one at a time
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ storage
+
+    def vertex(self, vertex_id):
+        """
+            return the vertex with the id, or None if there is none
+        """
+        if isinstance(vertex_id, int) and 0 <= vertex_id < len(self.vertex_labels) and \
+                self.vertex_labels[vertex_id] is not None:
+            return Vertex(vertex_id, self.vertex_labels[vertex_id])
+        return None
+
+    def edge(self, edge_id):
+        """
+            return the edge with the id, or None if there is none
+        """
+        if isinstance(edge_id, int) and 0 <= edge_id < len(self.edge_labels) and self.edge_labels[edge_id] is not None:
+            out_id, in_id = self.edge_ends[2 * edge_id], self.edge_ends[2 * edge_id + 1]
+            return Edge(edge_id, Vertex(out_id, self.vertex_labels[out_id]), self.edge_labels[edge_id],
+                        Vertex(in_id, self.vertex_labels[in_id]))
+        return None
+
+    def vertex_ids(self):
+        return [vertex_id for vertex_id, label in enumerate(self.vertex_labels) if label is not None]
+
+    def edge_ids(self):
+        return [edge_id for edge_id, label in enumerate(self.edge_labels) if label is not None]
+
+    def iri_vertex_ids(self, iri):
+        """
+            return the ids of the vertices with the iri, using the index
+        """
+        vertex_ids = self.iri_index.get(iri)
+        return [] if vertex_ids is None else vertex_ids if isinstance(vertex_ids, list) else [vertex_ids]
+
+    def add_vertex(self, label):
+        label = self._labels.setdefault(label, label)
+        vertex_id = len(self.vertex_labels)
+        self.vertex_labels.append(label)
+        self.vertex_properties.append(None)
+        self.out_edges.append(None)
+        self.in_edges.append(None)
+        self.label_index.setdefault(label, OrderedDict())[vertex_id] = None
+        self.vertex_count += 1
+        return Vertex(vertex_id, label)
+
+    def add_edge(self, out_vertex, label, in_vertex):
+        edge_id = len(self.edge_labels)
+        self.edge_labels.append(self._labels.setdefault(label, label))
+        self.edge_ends.extend((out_vertex.id, in_vertex.id))
+        for adjacency, vertex_id in ((self.out_edges, out_vertex.id), (self.in_edges, in_vertex.id)):
+            if adjacency[vertex_id] is None:
+                adjacency[vertex_id] = array("q")
+            adjacency[vertex_id].append(edge_id)
+        self.edge_count += 1
+        return self.edge(edge_id)
+
+    def set_property(self, element, key, value, cardinality=None):
+        if isinstance(element, Edge):
+            self.edge_properties.setdefault(element.id, {})[key] = value
+            return
+        cardinality = self.default_cardinality if cardinality is None else cardinality
+        properties = self.vertex_properties[element.id]
+        if properties is None:
+            properties = self.vertex_properties[element.id] = {}
+        values = properties.setdefault(key, [])
+        if cardinality == Cardinality.single:
+            for old in list(values):
+                self.remove_property(element, key, old)
+            values = properties.setdefault(key, [])
+        elif cardinality == Cardinality.set_ and value in values:
+            return
+        values.append(value)
+        if key == IRI_KEY:
+            vertex_ids = self.iri_index.get(value)
+            if vertex_ids is None:
+                self.iri_index[value] = element.id
+            elif isinstance(vertex_ids, list):
+                vertex_ids.append(element.id)
+            else:
+                self.iri_index[value] = [vertex_ids, element.id]
+
+    def remove_property(self, element, key, value):
+        if isinstance(element, Edge):
+            self.edge_properties.get(element.id, {}).pop(key, None)
+            return
+        properties = self.vertex_properties[element.id] or {}
+        values = properties.get(key)
+        if values and value in values:
+            values.remove(value)
+            if not values:
+                del properties[key]
+            if key == IRI_KEY:
+                vertex_ids = self.iri_index[value]
+                if not isinstance(vertex_ids, list):
+                    del self.iri_index[value]
+                else:
+                    vertex_ids.remove(element.id)
+                    if len(vertex_ids) == 1:
+                        self.iri_index[value] = vertex_ids[0]
+
+    def remove_edge(self, edge_id):
+        edge = self.edge(edge_id)
+        if edge is None:
+            return
+        self.out_edges[edge.outV.id].remove(edge_id)
+        self.in_edges[edge.inV.id].remove(edge_id)
+        self.edge_labels[edge_id] = None
+        self.edge_properties.pop(edge_id, None)
+        self.edge_count -= 1
+
+    def remove_vertex(self, vertex_id):
+        vertex = self.vertex(vertex_id)
+        if vertex is None:
+            return
+        for edge_id in list(self.out_edges[vertex_id] or []) + list(self.in_edges[vertex_id] or []):
+            self.remove_edge(edge_id)
+        for iri in list((self.vertex_properties[vertex_id] or {}).get(IRI_KEY, [])):
+            self.remove_property(vertex, IRI_KEY, iri)
+        del self.label_index[vertex.label][vertex_id]
+        self.vertex_labels[vertex_id] = None
+        self.vertex_properties[vertex_id] = self.out_edges[vertex_id] = self.in_edges[vertex_id] = None
+        self.vertex_count -= 1
+
+    def values(self, element, key):
+        if isinstance(element, Vertex):
+            return (self.vertex_properties[element.id] or {}).get(key, [])
+        if isinstance(element, Edge):
+            properties = self.edge_properties.get(element.id, {})
+            return [properties[key]] if key in properties else []
+        if isinstance(element, dict):
+            return [element[key]] if key in element else []
+        return []
+
+    def element_properties(self, element, keys=()):
+        if isinstance(element, Vertex):
+            return [VertexProperty(None, key, value, element)
+                    for key, values in (self.vertex_properties[element.id] or {}).items()
+                    if not keys or key in keys for value in values]
+        if isinstance(element, Edge):
+            return [Property(key, value, element) for key, value in self.edge_properties.get(element.id, {}).items()
+                    if not keys or key in keys]
+        return []
+
+    # ------------------------------------------------------------------ interpretation
+
+    def execute(self, bytecode):
+        """
+            run the traversal bytecode and return the list of results; PartitionStrategy is the only traversal
+            strategy supported
+        """
+        partition = None
+        for instruction in bytecode.source_instructions:
+            if instruction[0] != "withStrategies":
+                continue
+            for strategy in instruction[1:]:
+                if strategy.strategy_name != "PartitionStrategy":
+                    raise NotImplementedError("The %s is not supported by the embedded graph." %
+                                              strategy.strategy_name)
+                partition = strategy.configuration
+        with self._lock:
+            self._partition = partition
+            try:
+                return [traverser.obj for traverser in self._run(bytecode, [None])]
+            finally:
+                self._partition = None
+
+    def _run(self, bytecode, traversers):
+        """
+            run the steps of the bytecode over the traversers; a None traverser starts a new traversal
+        """
+        steps = _group_steps(bytecode)
+        for i, (name, args, modulators) in enumerate(steps):
+            if name in ("or", "and") and not args:
+                # infix connective: the steps before and after are the operands of a filter
+                left, right = Bytecode(), Bytecode()
+                left.step_instructions = bytecode.step_instructions[:_instruction_index(bytecode, i)]
+                right.step_instructions = bytecode.step_instructions[_instruction_index(bytecode, i) + 1:]
+                test = any if name == "or" else all
+                return [t for t in traversers if test(self._run(operand, [t]) for operand in (left, right))]
+        traversers = list(traversers)
+        for i, (name, args, modulators) in enumerate(steps):
+            step = getattr(self, "_step_" + name, None)
+            if step is None:
+                raise NotImplementedError("The %s step is not supported by the embedded graph." % name)
+            next_step = steps[i + 1] if i + 1 < len(steps) else None
+            traversers = step(traversers, [_unbind(arg) for arg in args], modulators, next_step)
+            if self._partition is not None:
+                traversers = self._partitioned(name, traversers)
+        return [t for t in traversers if t is not None]
+
+    def _partitioned(self, name, traversers):
+        """
+            apply the PartitionStrategy to the result of a step: the new elements are written to the write
+            partition and the elements outside the read partitions are filtered out
+        """
+        key = self._partition["partitionKey"]
+        if name in ("addV", "addE"):
+            for t in traversers:
+                self.set_property(t.obj, key, self._partition["writePartition"], Cardinality.single)
+        elif name in _PARTITIONED_STEPS:
+            traversers = [t for t in traversers if self._readable(t.obj)]
+        return traversers
+
+    def _readable(self, element):
+        """
+            whether the element is in the read partitions of the running traversal, if it has a PartitionStrategy
+        """
+        if self._partition is None:
+            return True
+        partitions = self._partition.get("readPartitions") or []
+        return any(value in partitions for value in self.values(element, self._partition["partitionKey"]))
+
+    def _merged(self, element, search, properties):
+        """
+            whether the element matches the search map of a mergeV or mergeE step
+        """
+        return search.get(T.label, element.label) == element.label and self._readable(element) and \
+            all(value in self.values(element, key) for key, value in properties.items())
+
+    def _merge_properties(self, properties):
+        """
+            the properties of an element created by a mergeV or mergeE step, in the write partition if any
+        """
+        if self._partition is None:
+            return properties
+        return dict(properties, **{self._partition["partitionKey"]: self._partition["writePartition"]})
+
+    def _first(self, bytecode, traverser):
+        results = self._run(bytecode, [traverser])
+        return results[0].obj if results else None
+
+    def _by(self, modulator, traverser):
+        """
+            apply a by() modulator to the traverser and return the value, or raise LookupError if there is none
+        """
+        args = modulator[1] if modulator else []
+        if not args:
+            return traverser.obj
+        arg = args[0]
+        if isinstance(arg, Bytecode):
+            results = self._run(arg, [traverser])
+            if not results:
+                raise LookupError()
+            return results[0].obj
+        if arg == T.id:
+            return traverser.obj.id
+        if arg == T.label:
+            return traverser.obj.label
+        if isinstance(arg, str):
+            values = self.values(traverser.obj, arg)
+            if not values:
+                raise LookupError()
+            return values[0]
+        raise NotImplementedError("Unsupported by() modulator %s." % str(arg))
+
+    # start and map steps
+
+    def _step_V(self, traversers, args, modulators, next_step):
+        ids = _ids(args)
+        result = []
+        for t in traversers:
+            if ids:
+                vertices = [v for v in map(self.vertex, ids) if v is not None]
+            else:
+                vertices = self._indexed_vertices(next_step)
+            result += [_Traverser(v) if t is None else t.split(v) for v in vertices]
+        return result
+
+    def _indexed_vertices(self, next_step):
+        """
+            the vertices filtered by the following has("iri", ...) or hasLabel(...) step, using the indexes
+        """
+        if next_step and next_step[0] == "has" and len(next_step[1]) == 2 and next_step[1][0] == "iri":
+            value = _unbind(next_step[1][1])
+            iris = value.value if isinstance(value, P) and value.operator == "within" else \
+                [value.value] if isinstance(value, P) and value.operator == "eq" else \
+                None if isinstance(value, P) else [value]
+            if iris is not None:
+                ids = sorted({id_ for iri in iris for id_ in self.iri_vertex_ids(iri)})
+                return [self.vertex(id_) for id_ in ids]
+        if next_step and next_step[0] == "hasLabel" and all(isinstance(a, str) for a in next_step[1]):
+            ids = sorted({id_ for label in next_step[1] for id_ in self.label_index.get(label, {})})
+            return [self.vertex(id_) for id_ in ids]
+        return [self.vertex(id_) for id_ in self.vertex_ids()]
+
+    def _step_E(self, traversers, args, modulators, next_step):
+        ids = _ids(args)
+        result = []
+        for t in traversers:
+            edges = [e for e in map(self.edge, ids if ids else self.edge_ids()) if e is not None]
+            result += [_Traverser(e) if t is None else t.split(e) for e in edges]
+        return result
+
+    def _step_inject(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            result += [_Traverser(arg) if t is None else t.split(arg) for arg in args]
+        return result
+
+    def _step_addV(self, traversers, args, modulators, next_step):
+        label = args[0] if args else "vertex"
+        return [_Traverser(self.add_vertex(label)) if t is None else t.split(self.add_vertex(label))
+                for t in traversers]
+
+    def _step_addE(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            ends = {"from": None if t is None else t.obj, "to": None if t is None else t.obj}
+            for name, modulator_args in modulators:
+                end = _unbind(modulator_args[0])
+                if isinstance(end, Bytecode):
+                    end = self._first(end, t)
+                elif isinstance(end, str):
+                    end = t.labels[end]
+                ends[name] = self.vertex(end.id if isinstance(end, Vertex) else end)
+            edge = self.add_edge(ends["from"], args[0], ends["to"])
+            result.append(_Traverser(edge) if t is None else t.split(edge))
+        return result
+
+    def _step_mergeV(self, traversers, args, modulators, next_step):
+        options = {modulator_args[0]: modulator_args[1] for name, modulator_args in modulators if name == "option"}
+        result = []
+        for t in traversers:
+            search = args[0] if args else t.obj
+            properties = {key: value for key, value in search.items() if key != T.label}
+            candidates = self.iri_vertex_ids(properties[IRI_KEY]) if IRI_KEY in properties else self.vertex_ids()
+            vertices = [v for v in map(self.vertex, candidates) if self._merged(v, search, properties)]
+            if vertices:
+                updates = options.get(Merge.on_match, {})
+            else:
+                created = {**search, **options.get(Merge.on_create, {})}
+                vertices = [self.add_vertex(created.get(T.label, "vertex"))]
+                updates = self._merge_properties({key: value for key, value in created.items() if key != T.label})
+            for vertex in vertices:
+                for key, value in updates.items():
+                    self.set_property(vertex, key, value, Cardinality.single)
+                result.append(_Traverser(vertex) if t is None else t.split(vertex))
+        return result
+
+    def _step_mergeE(self, traversers, args, modulators, next_step):
+        options = {modulator_args[0]: modulator_args[1] for name, modulator_args in modulators if name == "option"}
+        result = []
+        for t in traversers:
+            search = args[0] if args else t.obj
+            ends = {direction: _ids([search[direction]])[0] for direction in (Direction.OUT, Direction.IN)}
+            properties = {key: value for key, value in search.items() if isinstance(key, str)}
+            edges = [e for e in map(self.edge, self.out_edges[ends[Direction.OUT]] or ())
+                     if e.inV.id == ends[Direction.IN] and self._merged(e, search, properties)]
+            if edges:
+                updates = options.get(Merge.on_match, {})
+            else:
+                created = {**search, **options.get(Merge.on_create, {})}
+                edges = [self.add_edge(self.vertex(ends[Direction.OUT]), created.get(T.label, "edge"),
+                                       self.vertex(ends[Direction.IN]))]
+                updates = self._merge_properties({key: value for key, value in created.items()
+                                                  if isinstance(key, str)})
+            for edge in edges:
+                for key, value in updates.items():
+                    self.set_property(edge, key, value)
+                result.append(_Traverser(edge) if t is None else t.split(edge))
+        return result
+
+    def _step_property(self, traversers, args, modulators, next_step):
+        cardinality = None
+        if isinstance(args[0], Cardinality):
+            cardinality, args = args[0], args[1:]
+        for t in traversers:
+            value = self._first(args[1], t) if isinstance(args[1], Bytecode) else args[1]
+            self.set_property(t.obj, args[0], value, cardinality)
+        return traversers
+
+    def _step_outE(self, traversers, args, modulators, next_step):
+        return self._adjacent_edges(traversers, args, self.out_edges)
+
+    def _step_inE(self, traversers, args, modulators, next_step):
+        return self._adjacent_edges(traversers, args, self.in_edges)
+
+    def _step_bothE(self, traversers, args, modulators, next_step):
+        return self._adjacent_edges(traversers, args, self.out_edges) + \
+            self._adjacent_edges(traversers, args, self.in_edges)
+
+    def _adjacent_edges(self, traversers, labels, adjacency):
+        result = []
+        for t in traversers:
+            for edge_id in adjacency[t.obj.id] or ():
+                edge = self.edge(edge_id)
+                if not labels or edge.label in labels:
+                    result.append(t.split(edge))
+        return result
+
+    def _step_inV(self, traversers, args, modulators, next_step):
+        return [t.split(self.vertex(t.obj.inV.id)) for t in traversers]
+
+    def _step_outV(self, traversers, args, modulators, next_step):
+        return [t.split(self.vertex(t.obj.outV.id)) for t in traversers]
+
+    def _step_otherV(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            previous = t.path[1][0] if t.path[1] is not None else None
+            other = t.obj.inV if isinstance(previous, Vertex) and previous.id == t.obj.outV.id else t.obj.outV
+            result.append(t.split(self.vertex(other.id)))
+        return result
+
+    def _step_out(self, traversers, args, modulators, next_step):
+        return self._step_inV(self._step_outE(traversers, args, modulators, None), [], [], None)
+
+    def _step_in(self, traversers, args, modulators, next_step):
+        return self._step_outV(self._step_inE(traversers, args, modulators, None), [], [], None)
+
+    def _step_id(self, traversers, args, modulators, next_step):
+        return [t.split(t.obj.id) for t in traversers]
+
+    def _step_label(self, traversers, args, modulators, next_step):
+        return [t.split(t.obj.label) for t in traversers]
+
+    def _step_values(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            if args:
+                values = [value for key in args for value in self.values(t.obj, key)]
+            else:
+                values = [p.value for p in self.element_properties(t.obj)]
+            result += [t.split(value) for value in values]
+        return result
+
+    def _step_properties(self, traversers, args, modulators, next_step):
+        return [t.split(p) for t in traversers for p in self.element_properties(t.obj, args)]
+
+    def _step_valueMap(self, traversers, args, modulators, next_step):
+        tokens = any(modulator_args and modulator_args[0] == WithOptions.tokens
+                     for name, modulator_args in modulators if name == "with")
+        result = []
+        for t in traversers:
+            element = t.obj
+            if isinstance(element, Vertex):
+                value_map = {key: list(values) for key, values in (self.vertex_properties[element.id] or {}).items()
+                             if not args or key in args}
+            elif isinstance(element, Edge):
+                value_map = {key: value for key, value in self.edge_properties.get(element.id, {}).items()
+                             if not args or key in args}
+            else:
+                value_map = {}
+            if tokens:
+                value_map = {T.id: element.id, T.label: element.label, **value_map}
+            result.append(t.split(value_map))
+        return result
+
+    def _step_propertyMap(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            property_map = {}
+            for p in self.element_properties(t.obj, args):
+                property_map.setdefault(p.key, []).append(p)
+            result.append(t.split(property_map))
+        return result
+
+    def _step_project(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            projection = {}
+            for i, key in enumerate(args):
+                try:
+                    projection[key] = self._by(modulators[i] if i < len(modulators) else None, t)
+                except LookupError:
+                    pass
+            result.append(t.split(projection))
+        return result
+
+    def _step_as(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            labelled = t.split(t.obj)
+            labelled.path = t.path
+            labelled.labels = dict(t.labels, **{label: t.obj for label in args})
+            result.append(labelled)
+        return result
+
+    def _step_select(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            if not all(label in t.labels for label in args):
+                continue
+            if len(args) == 1:
+                result.append(t.split(t.labels[args[0]]))
+            else:
+                result.append(t.split({label: t.labels[label] for label in args}))
+        return result
+
+    def _step_constant(self, traversers, args, modulators, next_step):
+        return [t.split(args[0]) for t in traversers]
+
+    def _step_identity(self, traversers, args, modulators, next_step):
+        return traversers
+
+    def _step_unfold(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            if isinstance(t.obj, dict):
+                result += [t.split({key: value}) for key, value in t.obj.items()]
+            elif isinstance(t.obj, (list, tuple, set)):
+                result += [t.split(item) for item in t.obj]
+            else:
+                result.append(t)
+        return result
+
+    def _step_path(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            objects = t.objects()
+            if modulators:
+                objects = [self._by(modulators[i % len(modulators)], _Traverser(obj)) for i, obj in enumerate(objects)]
+            result.append(t.split(Path([set() for _ in objects], objects)))
+        return result
+
+    def _step_loops(self, traversers, args, modulators, next_step):
+        return [t.split(t.loops) for t in traversers]
+
+    # filter steps
+
+    def _step_has(self, traversers, args, modulators, next_step):
+        if len(args) == 3:
+            traversers = [t for t in traversers if t.obj.label == args[0]]
+            args = args[1:]
+        if len(args) == 1:
+            return [t for t in traversers if self.values(t.obj, args[0])]
+        key, predicate = args
+        if isinstance(predicate, Bytecode):
+            raise NotImplementedError("has() with a traversal is not supported by the embedded graph.")
+        if key == T.id:
+            return [t for t in traversers if _test(predicate, t.obj.id)]
+        if key == T.label:
+            return [t for t in traversers if _test(predicate, t.obj.label)]
+        return [t for t in traversers if any(_test(predicate, value) for value in self.values(t.obj, key))]
+
+    def _step_hasNot(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if not self.values(t.obj, args[0])]
+
+    def _step_hasLabel(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if any(_test(label, t.obj.label) for label in args)]
+
+    def _step_hasId(self, traversers, args, modulators, next_step):
+        ids = [arg for arg in args if not isinstance(arg, P)]
+        ids = _ids(ids)
+        predicates = [arg for arg in args if isinstance(arg, P)]
+        return [t for t in traversers if t.obj.id in ids or any(_test(p, t.obj.id) for p in predicates)]
+
+    def _step_hasKey(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if any(_test(key, t.obj.key) for key in args)]
+
+    def _step_hasValue(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if any(_test(value, t.obj.value) for value in args)]
+
+    def _step_is(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if _test(args[0], t.obj)]
+
+    def _step_where(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if self._run(args[0], [t])]
+
+    _step_filter = _step_where
+
+    def _step_not(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if not self._run(args[0], [t])]
+
+    def _step_or(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if any(self._run(arg, [t]) for arg in args)]
+
+    def _step_and(self, traversers, args, modulators, next_step):
+        return [t for t in traversers if all(self._run(arg, [t]) for arg in args)]
+
+    def _step_limit(self, traversers, args, modulators, next_step):
+        return traversers[:args[-1]]
+
+    def _step_range(self, traversers, args, modulators, next_step):
+        return traversers[args[-2]:args[-1]] if args[-1] >= 0 else traversers[args[-2]:]
+
+    def _step_dedup(self, traversers, args, modulators, next_step):
+        seen = self._repeat_seen[-1].setdefault(repr(modulators), set()) if self._repeat_seen else set()
+        result = []
+        for t in traversers:
+            key = _hashable(self._by(modulators[0], t) if modulators else t.obj)
+            if key not in seen:
+                seen.add(key)
+                result.append(t)
+        return result
+
+    def _step_simplePath(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            objects = t.objects()
+            if len(objects) == len({_hashable(o) for o in objects}):
+                result.append(t)
+        return result
+
+    # side effect and branch steps
+
+    def _step_sideEffect(self, traversers, args, modulators, next_step):
+        for t in traversers:
+            self._run(args[0], [t])
+        return traversers
+
+    def _step_drop(self, traversers, args, modulators, next_step):
+        for t in traversers:
+            if isinstance(t.obj, Vertex):
+                self.remove_vertex(t.obj.id)
+            elif isinstance(t.obj, Edge):
+                self.remove_edge(t.obj.id)
+            elif isinstance(t.obj, VertexProperty):
+                self.remove_property(t.obj.vertex, t.obj.key, t.obj.value)
+            elif isinstance(t.obj, Property):
+                self.remove_property(t.obj.element, t.obj.key, t.obj.value)
+        return []
+
+    def _step_none(self, traversers, args, modulators, next_step):
+        return []
+
+    _step_discard = _step_none
+
+    def _step_barrier(self, traversers, args, modulators, next_step):
+        return traversers
+
+    def _step_coalesce(self, traversers, args, modulators, next_step):
+        # as on a server, the results of the branch continue the parent path, the labels set in it are dropped
+        result = []
+        for t in traversers:
+            for arg in args:
+                branch = self._run(arg, [t])
+                if branch:
+                    result += [t.split(b.obj) for b in branch]
+                    break
+        return result
+
+    def _step_union(self, traversers, args, modulators, next_step):
+        return [branch for t in traversers for arg in args for branch in self._run(arg, [t])]
+
+    def _step_optional(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            result += self._run(args[0], [t]) or [t]
+        return result
+
+    def _step_map(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            results = self._run(args[0], [t])
+            if results:
+                result.append(t.split(results[0].obj))
+        return result
+
+    def _step_local(self, traversers, args, modulators, next_step):
+        result = []
+        for t in traversers:
+            for branch in self._run(args[0], [t]):
+                # the path walked in the child is kept, but only the labels of the parent
+                branch.labels = t.labels
+                result.append(branch)
+        return result
+
+    def _step_repeat(self, traversers, args, modulators, next_step):
+        until = [_unbind(a[0]) for name, a in modulators if name == "until"]
+        times = [a[0] for name, a in modulators if name == "times"]
+        emit = [a for name, a in modulators if name == "emit"]
+        result = []
+        frontier = []
+        for t in traversers:
+            looping = t.split(t.obj)
+            looping.path, looping.loops = t.path, 0
+            frontier.append(looping)
+        self._repeat_seen.append({})
+        try:
+            while frontier:
+                frontier = self._run(args[0], frontier)
+                looping = []
+                for t in frontier:
+                    t.loops += 1
+                    done = (until and (_test(until[0], t.loops) if isinstance(until[0], P) else
+                                       bool(self._run(until[0], [t])))) or (times and t.loops >= times[0])
+                    if done:
+                        t.loops = 0
+                        result.append(t)
+                    else:
+                        if emit and (not emit[0] or self._run(emit[0][0], [t])):
+                            result.append(t)
+                        looping.append(t)
+                frontier = looping
+        finally:
+            self._repeat_seen.pop()
+        return result
+
+    # reducing steps
+
+    def _step_count(self, traversers, args, modulators, next_step):
+        return [_Traverser(len(traversers))]
+
+    def _step_sum(self, traversers, args, modulators, next_step):
+        return [_Traverser(sum(t.obj for t in traversers))]
+
+    def _step_fold(self, traversers, args, modulators, next_step):
+        return [_Traverser([t.obj for t in traversers])]
+
+    def _step_order(self, traversers, args, modulators, next_step):
+        traversers = list(traversers)
+        for name, modulator_args in reversed(modulators or [("by", [])]):
+            order = modulator_args[1] if len(modulator_args) > 1 else Order.asc
+            if order == Order.shuffle:
+                continue
+            keyed = [(self._by((name, modulator_args[:1]), t), t) for t in traversers]
+            keyed.sort(key=lambda pair: _sort_key(pair[0]), reverse=order == Order.desc)
+            traversers = [t for key, t in keyed]
+        return traversers
+
+    def _step_tree(self, traversers, args, modulators, next_step):
+        tree = OrderedDict()
+        for t in traversers:
+            level = tree
+            for depth, obj in enumerate(t.objects()):
+                key = _hashable(obj)
+                if key not in level:
+                    by = modulators[depth % len(modulators)] if modulators else None
+                    level[key] = (self._by(by, _Traverser(obj)), OrderedDict())
+                level = level[key][1]
+        return [_Traverser(_tree_dict(tree))]
+
+
+def _tree_dict(tree):
+    """
+        turn the nested dicts of a tree into the g:Tree structure returned by the gremlinpython driver
+    """
+    return {"@type": "g:Tree", "@value": [{"key": key, "value": _tree_dict(subtree)}
+                                          for key, subtree in tree.values()]}
+
+
+def _group_steps(bytecode):
+    """
+        group the step instructions with the modulators that follow them
+    """
+    steps = []
+    for instruction in bytecode.step_instructions:
+        name, args = instruction[0], list(instruction[1:])
+        if name in _MODULATORS and steps:
+            steps[-1][2].append((name, args))
+        else:
+            steps.append((name, args, []))
+    return steps
+
+
+def _instruction_index(bytecode, step_index):
+    """
+        the index in the step instructions of the step_index-th step, skipping the modulators
+    """
+    count = -1
+    for i, instruction in enumerate(bytecode.step_instructions):
+        if instruction[0] not in _MODULATORS:
+            count += 1
+        if count == step_index:
+            return i
+    raise IndexError(step_index)
+
+
+def _unbind(arg):
+    return arg.value if isinstance(arg, Binding) else arg
+
+
+def _ids(args):
+    ids = []
+    for arg in args:
+        arg = _unbind(arg)
+        if isinstance(arg, (list, tuple, set)):
+            ids += _ids(arg)
+        else:
+            ids.append(arg.id if isinstance(arg, (Vertex, Edge)) else arg)
+    return ids
+
+
+def _test(predicate, value):
+    if not isinstance(predicate, P):
+        return predicate == value
+    if predicate.operator in ("and", "or"):
+        combine = all if predicate.operator == "and" else any
+        return combine(_test(p, value) for p in (predicate.value, predicate.other))
+    if predicate.operator == "not":
+        return not _test(predicate.value, value)
+    operand = predicate.value if predicate.other is None else [predicate.value, predicate.other]
+    return _PREDICATES[predicate.operator](value, operand)
+
+
+def _hashable(obj):
+    return (type(obj).__name__, obj.id) if isinstance(obj, (Vertex, Edge)) else \
+        repr(sorted(obj.items(), key=repr)) if isinstance(obj, dict) else obj
+
+
+def _sort_key(value):
+    return (0, value) if isinstance(value, (int, float)) else (1, str(value))
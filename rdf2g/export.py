@@ -0,0 +1,250 @@
+"""
+export
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import csv
+import datetime
+import hashlib
+import io
+import json
+import logging
+import pathlib
+import tempfile
+
+import rdflib
+
+from rdf2g.labels import LabelResolver, node_label, predicate_label
+from rdf2g.literals import literal_property
+from rdf2g.stream import RDFFileSource, namespace_graph
+
+# the statements are spread over this many temporary files, so that only one of them is held in memory at a time
+DEFAULT_BUCKETS = 64
+
+NEPTUNE_VERTICES_FILE = "vertices.csv"
+NEPTUNE_EDGES_FILE = "edges.csv"
+
+# the Neptune CSV types of the typed GraphSON values
+NEPTUNE_TYPES = {"g:Int64": "Long", "g:Double": "Double", "g:Date": "Date"}
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def export_graphson(source, path, namespaces=None, label_resolver=None, buckets=DEFAULT_BUCKETS,
+                    literal_mapper=None):
+    """
+        Export an RDF graph, or an N-Triples or N-Quads file, into a GraphSON 3 lines file, one vertex per line with
+        its properties and its outgoing and incoming edges, ready for the GraphSON readers of TinkerPop and
+        JanusGraph.
+        The mapping is the one of load_rdf2g; the ids are computed from the IRIs, so they are the same in every
+        export. No server is needed.
+    :param source: the rdf graph or the path of the N-Triples or N-Quads file
+    :param path: the path of the GraphSON file to be written
+    :param namespaces: dict mapping prefixes to namespace URIs, used to compute the qualified names of a file
+    :param label_resolver: the LabelResolver computing the labels; a new one is used if not provided
+    :param buckets: the number of temporary files the statements are spread over
+    :param literal_mapper: the LiteralMapper mapping the literals to typed values and keys; the properties are
+        multi-valued whatever its cardinality. The literals are exported as strings if None.
+    :return: the export report, a dict with the number of vertices, properties and edges
+    """
+    report = {"vertices": 0, "properties": 0, "edges": 0}
+    with io.open(str(path), "w", encoding="utf-8") as f:
+        for vertex_id, vertex in _grouped_vertices(source, namespaces, label_resolver, buckets, literal_mapper,
+                                                   in_edges=True):
+            f.write(json.dumps(_graphson_vertex(vertex_id, vertex), ensure_ascii=False) + "\n")
+            _count(report, vertex)
+    logging.info('Exported %(vertices)s vertices, %(properties)s properties and %(edges)s edges.' % report)
+    return report
+
+
+def export_neptune_csv(source, directory, namespaces=None, label_resolver=None, buckets=DEFAULT_BUCKETS,
+                       literal_mapper=None):
+    """
+        Export an RDF graph, or an N-Triples or N-Quads file, into the vertex and edge CSV files of the Amazon
+        Neptune bulk loader, vertices.csv and edges.csv. The mapping is the one of load_rdf2g; the literal
+        properties are multi-valued (String[]) columns, whose names escape the colons of the qualified names with a
+        backslash, e.g. "skos\\:prefLabel:String[]", since Neptune splits the column headers on the colons. The ids
+        are computed from the IRIs, so they are the same in every export. No server is needed.
+    :param source: the rdf graph or the path of the N-Triples or N-Quads file
+    :param directory: the directory where the CSV files are written
+    :param namespaces: dict mapping prefixes to namespace URIs, used to compute the qualified names of a file
+    :param label_resolver: the LabelResolver computing the labels; a new one is used if not provided
+    :param buckets: the number of temporary files the statements are spread over
+    :param literal_mapper: the LiteralMapper mapping the literals to typed values and keys; the properties are
+        multi-valued whatever its cardinality. The literals are exported as strings if None.
+    :return: the export report, a dict with the number of vertices, properties and edges
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    report = {"vertices": 0, "properties": 0, "edges": 0}
+    keys = {}
+    with io.open(str(directory / NEPTUNE_VERTICES_FILE), "w", encoding="utf-8", newline="") as vertex_file, \
+            io.open(str(directory / NEPTUNE_EDGES_FILE), "w", encoding="utf-8", newline="") as edge_file:
+        vertex_writer = csv.writer(vertex_file)
+        edge_writer = csv.writer(edge_file)
+        edge_writer.writerow(["~id", "~from", "~to", "~label"])
+        for vertex_id, vertex in _grouped_vertices(source, namespaces, label_resolver, buckets, literal_mapper,
+                                                   keys):
+            if not report["vertices"]:
+                vertex_writer.writerow(["~id", "~label", "iri:String"] +
+                                       ["%s:%s[]" % (_neptune_key(key), types.pop() if len(types) == 1 else "String")
+                                        for key, types in keys.items()])
+            vertex_writer.writerow([vertex_id, vertex["label"], vertex["iri"]] +
+                                   [";".join(_neptune_value(value) for value in vertex["properties"].get(key, []))
+                                    for key in keys])
+            for label, edges in vertex["edges"].items():
+                for edge_id, target_id in edges.items():
+                    edge_writer.writerow([edge_id, vertex_id, target_id, label])
+            _count(report, vertex)
+        if not report["vertices"]:
+            vertex_writer.writerow(["~id", "~label", "iri:String"])
+    logging.info('Exported %(vertices)s vertices, %(properties)s properties and %(edges)s edges.' % report)
+    return report
+
+
+def element_id(*parts):
+    """
+        compute the deterministic id of a graph element from the strings identifying it
+    :param parts: the strings, e.g. the IRI of a node or the subject, predicate and object of a link
+    :return: a positive 60 bit integer
+    """
+    return int(hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:15], 16)
+
+
+def _grouped_vertices(source, namespaces, label_resolver, buckets, literal_mapper=None, keys=None, in_edges=False):
+    """
+        generate the (id, vertex) pairs of the source, a vertex being a dict with the label, the iri, the GraphSON
+        property values and the outgoing edges grouped by label, as well as the incoming ones if in_edges. The
+        statements are first spread over bucket files by vertex, then each bucket is grouped in memory. The property
+        keys, mapped to the set of the Neptune types of their values, are added to keys before the first vertex.
+    """
+    if isinstance(source, rdflib.Graph):
+        triples, rdf_graph = source, source
+    else:
+        triples, rdf_graph = RDFFileSource(source), namespace_graph(namespaces)
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
+    property_keys = {}
+    with tempfile.TemporaryDirectory(prefix="rdf2g-export-") as directory:
+        files = [io.open(str(pathlib.Path(directory) / ("%s.jsonl" % i)), "w", encoding="utf-8")
+                 for i in range(buckets)]
+        try:
+            for s, p, o in triples:
+                subject_id = element_id(str(s))
+                records = [["v", subject_id, node_label(s, labels), str(s)]]
+                if isinstance(o, (rdflib.URIRef, rdflib.BNode)):
+                    object_id = element_id(str(o))
+                    label = predicate_label(p, labels)
+                    records.append(["e", subject_id, label, element_id(str(s), str(p), str(o)), object_id])
+                    object_records = [["v", object_id, node_label(o, labels), str(o)]]
+                    if in_edges:
+                        object_records.append(["i", object_id, label, records[-1][3], subject_id])
+                    files[object_id % buckets].write("".join(json.dumps(record) + "\n" for record in object_records))
+                elif isinstance(o, rdflib.Literal):
+                    key, value = literal_property(predicate_label(p, labels), o, literal_mapper)
+                    value = _graphson_value(value)
+                    property_keys.setdefault(key, set()).add(_neptune_type(value))
+                    records.append(["p", subject_id, key, value])
+                files[subject_id % buckets].write("".join(json.dumps(record) + "\n" for record in records))
+        finally:
+            for f in files:
+                f.close()
+        if keys is not None:
+            keys.update(sorted(property_keys.items()))
+        for i in range(buckets):
+            with io.open(str(pathlib.Path(directory) / ("%s.jsonl" % i)), "r", encoding="utf-8") as f:
+                vertices = {}
+                for line in f:
+                    record = json.loads(line)
+                    vertex = vertices.get(record[1])
+                    if vertex is None:
+                        vertex = vertices[record[1]] = {"label": None, "iri": None, "properties": {}, "edges": {},
+                                                        "in_edges": {}}
+                    if record[0] == "v":
+                        vertex["label"], vertex["iri"] = record[2], record[3]
+                    elif record[0] == "p":
+                        values = vertex["properties"].setdefault(record[2], [])
+                        if record[3] not in values:
+                            values.append(record[3])
+                    else:
+                        edges = vertex["edges"] if record[0] == "e" else vertex["in_edges"]
+                        edges.setdefault(record[2], {})[record[3]] = record[4]
+            yield from vertices.items()
+
+
+def _graphson_vertex(vertex_id, vertex):
+    """
+        the GraphSON 3 representation of a vertex with its properties and its outgoing and incoming edges
+    """
+    properties = {key: [{"id": _int64(element_id(vertex["iri"], key, value if isinstance(value, str) else
+                                                  json.dumps(value, sort_keys=True))), "value": value}
+                        for value in values]
+                  for key, values in [("iri", [vertex["iri"]])] + list(vertex["properties"].items())}
+    graphson = {"id": _int64(vertex_id), "label": vertex["label"], "properties": properties}
+    if vertex["edges"]:
+        graphson["outE"] = {label: [{"id": _int64(edge_id), "inV": _int64(target_id)}
+                                    for edge_id, target_id in edges.items()]
+                            for label, edges in vertex["edges"].items()}
+    if vertex["in_edges"]:
+        graphson["inE"] = {label: [{"id": _int64(edge_id), "outV": _int64(source_id)}
+                                   for edge_id, source_id in edges.items()]
+                           for label, edges in vertex["in_edges"].items()}
+    return graphson
+
+
+def _int64(value):
+    return {"@type": "g:Int64", "@value": value}
+
+
+def _graphson_value(value):
+    """
+        the GraphSON 3 representation of a property value
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return _int64(value)
+    if isinstance(value, float):
+        return {"@type": "g:Double", "@value": value}
+    if isinstance(value, datetime.datetime):
+        milliseconds = value.timestamp() * 1000 if value.tzinfo else (value - EPOCH).total_seconds() * 1000
+        return {"@type": "g:Date", "@value": int(milliseconds)}
+    return value
+
+
+def _neptune_type(value):
+    """
+        the Neptune CSV type of a GraphSON property value
+    """
+    if isinstance(value, bool):
+        return "Bool"
+    if isinstance(value, dict):
+        return NEPTUNE_TYPES[value["@type"]]
+    return "String"
+
+
+def _neptune_key(key):
+    """
+        the Neptune CSV column name of a property key, the colons of the qualified names being escaped
+    """
+    return key.replace(":", "\\:")
+
+
+def _neptune_value(value):
+    """
+        the Neptune CSV cell of a GraphSON property value, the semicolons separating the values of a set
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, dict) and value["@type"] == "g:Date":
+        return (EPOCH + datetime.timedelta(milliseconds=value["@value"])).isoformat() + "Z"
+    if isinstance(value, dict):
+        return str(value["@value"])
+    return value.replace(";", "\\;")
+
+
+def _count(report, vertex):
+    report["vertices"] += 1
+    report["properties"] += sum(len(values) for values in vertex["properties"].values())
+    report["edges"] += sum(len(edges) for edges in vertex["edges"].values())
@@ -0,0 +1,170 @@
+"""
+index
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import logging
+
+IRI_KEY = "iri"
+TINKERGRAPH = "tinkergraph"
+JANUSGRAPH = "janusgraph"
+
+# the name of the graph variable bound in the server scripts; "graph" is the default of the server configurations
+DEFAULT_GRAPH_NAME = "graph"
+
+WARN = "warn"
+RAISE = "raise"
+
+
+class TinkerGraphIndexAdapter(object):
+    """
+        Index management scripts for TinkerGraph. TinkerGraph indexes are not unique, so the uniqueness of the
+        iri property is only guaranteed by the loaders.
+    """
+    supports_unique = False
+
+    @staticmethod
+    def indexed_keys_script(graph_name):
+        return "%s.getIndexedKeys(Vertex.class)" % graph_name
+
+    @staticmethod
+    def create_index_script(graph_name):
+        return "%s.createIndex(indexKey, Vertex.class); indexKey" % graph_name
+
+
+class JanusGraphIndexAdapter(object):
+    """
+        Index management scripts for JanusGraph, using single key composite indexes named "by_<key>". An index is
+        only used by the queries once ENABLED, so only the enabled indexes are reported and the creation waits for
+        that status: a new index is enabled right away, while an index on a key that already has values is
+        reindexed first, which may take a while on a large graph.
+    """
+    supports_unique = True
+
+    @staticmethod
+    def indexed_keys_script(graph_name):
+        return "mgmt = %s.openManagement(); " \
+               "try { mgmt.getGraphIndexes(Vertex.class).findAll { it.isCompositeIndex() && " \
+               "it.getFieldKeys().size() == 1 && it.getIndexStatus(it.getFieldKeys()[0]) == " \
+               "org.janusgraph.core.schema.SchemaStatus.ENABLED }.collect { it.getFieldKeys()[0].name() } } " \
+               "finally { mgmt.rollback() }" % graph_name
+
+    @staticmethod
+    def create_index_script(graph_name):
+        return "status = org.janusgraph.core.schema.SchemaStatus; action = org.janusgraph.core.schema.SchemaAction; " \
+               "watcher = { org.janusgraph.graphdb.database.management.ManagementSystem." \
+               "awaitGraphIndexStatus(%(graph)s, 'by_' + indexKey) }; " \
+               "hasData = %(graph)s.traversal().V().has(indexKey).limit(1).hasNext(); %(graph)s.tx().rollback(); " \
+               "mgmt = %(graph)s.openManagement(); " \
+               "if (!mgmt.containsGraphIndex('by_' + indexKey)) { " \
+               "key = mgmt.getPropertyKey(indexKey) ?: mgmt.makePropertyKey(indexKey).dataType(String.class)." \
+               "cardinality(org.janusgraph.core.Cardinality.SINGLE).make(); " \
+               "builder = mgmt.buildIndex('by_' + indexKey, Vertex.class).addKey(key); " \
+               "if (unique) { builder = builder.unique() }; " \
+               "builder.buildCompositeIndex() }; mgmt.commit(); " \
+               "watcher().status(status.REGISTERED, status.ENABLED).call(); " \
+               "mgmt = %(graph)s.openManagement(); index = mgmt.getGraphIndex('by_' + indexKey); " \
+               "if (index.getIndexStatus(mgmt.getPropertyKey(indexKey)) != status.ENABLED) { " \
+               "mgmt.updateIndex(index, hasData ? action.REINDEX : action.ENABLE_INDEX).get() }; mgmt.commit(); " \
+               "watcher().status(status.ENABLED).call(); indexKey" % {"graph": graph_name}
+
+
+INDEX_ADAPTERS = {TINKERGRAPH: TinkerGraphIndexAdapter, JANUSGRAPH: JanusGraphIndexAdapter}
+
+
+def submit_script(g, script, bindings=None):
+    """
+        submit a script to the server behind the gremlin graph and return all the results
+    :param g: gremlin graph connected with setup_graph, or a ConnectionManager
+    :param script: the gremlin-groovy script
+    :param bindings: dict of the variables bound in the script
+    :return: the list of results
+    """
+    connection = g.remote_connection
+    if connection is None or not hasattr(connection, "_client"):
+        raise ValueError("Scripts can only be submitted through a driver connection to a Gremlin server.")
+    return connection._client.submit(script, bindings).all().result()
+
+
+def detect_backend(g, graph_name=DEFAULT_GRAPH_NAME):
+    """
+        detect the graph system behind the server
+    :param g: gremlin graph
+    :param graph_name: the name of the graph variable on the server
+    :return: "tinkergraph" or "janusgraph"
+    """
+    class_name = submit_script(g, "%s.getClass().getSimpleName()" % graph_name)[0]
+    for backend in INDEX_ADAPTERS:
+        if backend in class_name.lower():
+            return backend
+    raise ValueError("Unsupported graph system %s, expecting one of %s." % (class_name, ", ".join(INDEX_ADAPTERS)))
+
+
+def get_indexed_keys(g, backend=None, graph_name=DEFAULT_GRAPH_NAME):
+    """
+        return the vertex property keys that are indexed
+    :param g: gremlin graph
+    :param backend: "tinkergraph" or "janusgraph"; detected if not provided
+    :param graph_name: the name of the graph variable on the server
+    :return: set of property keys
+    """
+    adapter = INDEX_ADAPTERS[backend if backend else detect_backend(g, graph_name)]
+    keys = set()
+    for result in submit_script(g, adapter.indexed_keys_script(graph_name)):
+        keys.update(result if isinstance(result, (list, set)) else [result])
+    return keys
+
+
+def ensure_indexes(g, keys=(), backend=None, graph_name=DEFAULT_GRAPH_NAME, unique=True):
+    """
+        Create the index on the iri property, unique where the backend supports it, and on the other vertex
+        property keys, unless they are indexed already. Vertex labels cannot be indexed on these backends; index
+        the property keys that are filtered together with the labels instead.
+    :param g: gremlin graph
+    :param keys: other vertex property keys to be indexed, e.g. "skos:prefLabel"
+    :param backend: "tinkergraph" or "janusgraph"; detected if not provided
+    :param graph_name: the name of the graph variable on the server
+    :param unique: False if an iri may have several vertices, e.g. one per named graph with load_dataset
+    :return: the list of the newly indexed keys
+    """
+    backend = backend if backend else detect_backend(g, graph_name)
+    adapter = INDEX_ADAPTERS[backend]
+    indexed_keys = get_indexed_keys(g, backend, graph_name)
+    created = []
+    for key in [IRI_KEY] + [key for key in keys if key != IRI_KEY]:
+        if key in indexed_keys:
+            logging.debug('The %s property is already indexed.' % key)
+            continue
+        submit_script(g, adapter.create_index_script(graph_name),
+                      {"indexKey": key, "unique": unique and key == IRI_KEY and adapter.supports_unique})
+        logging.info('Created the %s index on the %s property.' % (backend, key))
+        created.append(key)
+    return created
+
+
+def check_iri_index(g, on_missing=WARN, backend=None, graph_name=DEFAULT_GRAPH_NAME):
+    """
+        Check that the iri property is indexed before loading, since every node lookup filters on it.
+        If the indexes cannot be inspected, e.g. the server does not accept scripts, the check is skipped.
+    :param g: gremlin graph
+    :param on_missing: "warn" to log a warning, "raise" to refuse with a ValueError, None to skip the check
+    :param backend: "tinkergraph" or "janusgraph"; detected if not provided
+    :param graph_name: the name of the graph variable on the server
+    :return: True if the index exists, False if it is missing, None if it could not be checked
+    """
+    if on_missing is None:
+        return None
+    try:
+        indexed = IRI_KEY in get_indexed_keys(g, backend, graph_name)
+    except Exception as e:  # any failure means the indexes cannot be inspected on this server
+        logging.debug('Could not check the %s index: %s' % (IRI_KEY, str(e)))
+        return None
+    if not indexed:
+        message = 'The %s property is not indexed, every node lookup scans all the vertices. ' \
+                  'Create the index with ensure_indexes(g).' % IRI_KEY
+        if on_missing == RAISE:
+            raise ValueError(message)
+        logging.warning(message)
+    return indexed
@@ -0,0 +1,162 @@
+"""
+instrument
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import sys
+import threading
+import time
+
+from gremlin_python.driver.remote_connection import RemoteStrategy
+
+from rdf2g.access import ConnectionManager
+
+# the rdf2g functions that only submit traversals on behalf of their callers
+_SUBMITTING_HELPERS = {("rdf2g.aio", "submit"), ("rdf2g.aio", "_run_round_trips"), ("rdf2g.bulk", "run_round_trips"),
+                       ("rdf2g.bulk", "submit_on_conflict"), ("rdf2g.bulk", "_retrying")}
+
+
+class TraversalStats(object):
+    """
+        Number, errors and duration of the traversals submitted by every rdf2g function.
+
+        The duration of a traversal is the time between its submission and the arrival of all its results, so it
+        includes the network round-trip and the execution on the server. The statistics are safe to share between
+        threads and graphs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def record(self, function, seconds, error=None):
+        """
+            add a traversal to the statistics of the function
+        :param function: the qualified name of the rdf2g function, e.g. "rdf2g.retrieve.get_node"
+        :param seconds: the duration of the traversal
+        :param error: the exception raised by the traversal, if any
+        :return: None
+        """
+        with self._lock:
+            stats = self._functions.get(function)
+            if stats is None:
+                stats = self._functions[function] = {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0}
+            stats["count"] += 1
+            stats["errors"] += error is not None
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def to_dict(self):
+        """
+            return a copy of the statistics
+        :return: dict mapping the function names to dicts with the count, errors, seconds and max_seconds
+        """
+        with self._lock:
+            return {function: dict(stats) for function, stats in self._functions.items()}
+
+    def reset(self):
+        """
+            forget all the statistics
+        """
+        with self._lock:
+            self._functions.clear()
+
+
+class InstrumentedConnection(object):
+    """
+        Remote connection wrapper timing every submitted traversal and attributing it to the rdf2g function
+        submitting it; everything else is delegated to the wrapped connection.
+    """
+
+    def __init__(self, connection, stats=None, callback=None):
+        """
+        :param connection: the wrapped remote connection
+        :param stats: the TraversalStats to be updated, if any
+        :param callback: function called after each traversal with the function name, the duration in seconds and
+            the exception raised, if any; e.g. to observe a Prometheus histogram or an OpenTelemetry instrument
+        """
+        self.connection = connection
+        self.stats = stats
+        self.callback = callback
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def submit(self, bytecode):
+        function = calling_function()
+        start = time.perf_counter()
+        try:
+            result = self.connection.submit(bytecode)
+        except Exception as e:
+            self._record(function, time.perf_counter() - start, e)
+            raise
+        self._record(function, time.perf_counter() - start)
+        return result
+
+    def submit_async(self, bytecode):
+        function = calling_function()
+        start = time.perf_counter()
+        future = self.connection.submit_async(bytecode)
+        future.add_done_callback(lambda f: self._record(function, time.perf_counter() - start, f.exception()))
+        return future
+
+    def _record(self, function, seconds, error=None):
+        if self.stats is not None:
+            self.stats.record(function, seconds, error)
+        if self.callback is not None:
+            self.callback(function, seconds, error)
+
+
+def instrument(g, stats=None, callback=None):
+    """
+        Time every traversal submitted through the connection of the gremlin graph, and of the graphs spawned from
+        it, until uninstrument is called. Nothing is measured, at no cost, unless the graph is instrumented.
+    :param g: gremlin graph, or a connected ConnectionManager
+    :param stats: the TraversalStats to be updated; a new one is used if neither stats nor callback is provided
+    :param callback: function called after each traversal with the function name, the duration in seconds and
+        the exception raised, if any
+    :return: the TraversalStats, or None if only the callback is used
+    """
+    if stats is None and callback is None:
+        stats = TraversalStats()
+    g = g.g if isinstance(g, ConnectionManager) else g
+    for strategy in g.traversal_strategies.traversal_strategies:
+        if isinstance(strategy, RemoteStrategy):
+            if isinstance(strategy.remote_connection, InstrumentedConnection):
+                raise ValueError("The graph is already instrumented.")
+            strategy.remote_connection = InstrumentedConnection(strategy.remote_connection, stats, callback)
+            g.remote_connection = strategy.remote_connection
+            return stats
+    raise ValueError("Only the graphs connected to a server can be instrumented.")
+
+
+def uninstrument(g):
+    """
+        Stop timing the traversals of an instrumented gremlin graph
+    :param g: gremlin graph, or a connected ConnectionManager
+    :return: None
+    """
+    g = g.g if isinstance(g, ConnectionManager) else g
+    for strategy in g.traversal_strategies.traversal_strategies:
+        if isinstance(strategy, RemoteStrategy) and isinstance(strategy.remote_connection, InstrumentedConnection):
+            strategy.remote_connection = strategy.remote_connection.connection
+            g.remote_connection = strategy.remote_connection
+
+
+def calling_function():
+    """
+        return the qualified name of the innermost rdf2g function on the call stack, or "other" for the traversals
+        submitted directly by the application
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_name
+        # the lambdas and comprehensions are attributed to the function defining them
+        if module.startswith("rdf2g.") and module != __name__ and not name.startswith("<") and \
+                (module, name) not in _SUBMITTING_HELPERS:
+            return "%s.%s" % (module, name)
+        frame = frame.f_back
+    return "other"
@@ -0,0 +1,146 @@
+"""
+labels
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import threading
+from collections import OrderedDict
+
+import rdflib
+
+# the maximum number of node labels memoized by a LabelResolver
+DEFAULT_NODE_LABELS_SIZE = 10000
+# the label and the IRI prefix of the vertices of the blank nodes mapped by map_bnodes
+BNODE_LABEL = "_:bnode"
+BNODE_IRI_PREFIX = "urn:rdf2g:bnode:"
+
+
+def node_label(rdf_term, rdf_graph):
+    """
+        Compute the vertex label of an RDF term: the qualified name of a URI or the string of a blank node;
+        the blank nodes mapped to IRIs by map_bnodes share the "_:bnode" label
+    :param rdf_term: the rdf term identifying the node
+    :param rdf_graph: the graph providing the namespace prefixes, or a LabelResolver
+    :return: the vertex label
+    """
+    if isinstance(rdf_graph, LabelResolver):
+        return rdf_graph.node_label(rdf_term)
+    if isinstance(rdf_term, rdflib.BNode):
+        return str(rdf_term)
+    if rdf_term.startswith(BNODE_IRI_PREFIX):
+        return BNODE_LABEL
+    qname = rdf_graph.qname(rdf_term)
+    return qname if qname else str(rdf_term)
+
+
+def predicate_label(property_term, rdf_graph):
+    """
+        Compute the edge label or property key of a predicate: its qualified name, if one can be computed, or the
+        path of the qualified names of a predicate inlined by map_bnodes
+    :param property_term: the predicate rdf term
+    :param rdf_graph: the graph providing the namespace prefixes, or a LabelResolver
+    :return: the edge label or the property key
+    """
+    if isinstance(property_term, InlinedPredicate):
+        return "%s/%s" % (predicate_label(property_term.parent, rdf_graph),
+                          predicate_label(property_term.child, rdf_graph))
+    if isinstance(property_term, rdflib.URIRef) and rdf_graph is not None:
+        qname = rdf_graph.qname(property_term)
+        return qname if qname else str(property_term)
+    return str(property_term)
+
+
+class InlinedPredicate(rdflib.URIRef):
+    """
+        The predicate of a statement of an inlined blank node, moved to the parent node. Its property key is the
+        path of the keys, e.g. "schema:geo/schema:latitude".
+    """
+    __slots__ = ("parent", "child")
+
+    def __new__(cls, parent, child):
+        predicate = rdflib.URIRef.__new__(cls, "%s/%s" % (parent, child))
+        predicate.parent, predicate.child = parent, child
+        return predicate
+
+
+class LabelResolver(object):
+    """
+        Memoized computation of the labels of the predicates and of the nodes, meant to be shared across a whole
+        load.
+
+        The resolver can be used wherever an rdf2g function expects the RDF graph for computing labels. The memo
+        table, labels, maps the predicate URIs to their qualified names; it can be pre-seeded and persisted
+        between loads. A node is labelled once for each statement it occurs in, so the node labels are memoized
+        too, apart from the table: in node_labels, whose least recently used entries are evicted beyond
+        node_labels_maxsize, so that the memory stays bounded on large graphs and the table stays as small as
+        the vocabulary. The seeded entries of the table are used for the nodes as well.
+    """
+
+    def __init__(self, rdf_graph, labels=None, node_labels_maxsize=DEFAULT_NODE_LABELS_SIZE):
+        """
+        :param rdf_graph: the graph providing the namespace prefixes
+        :param labels: dict mapping URIs to qualified names used to pre-seed the memo table
+        :param node_labels_maxsize: the maximum number of memoized node labels, or None for no bound
+        """
+        self.rdf_graph = rdf_graph
+        self.labels = {}
+        self.node_labels_maxsize = node_labels_maxsize
+        self.node_labels = OrderedDict()
+        self._lock = threading.Lock()
+        if labels:
+            self.seed(labels)
+
+    def qname(self, uri):
+        """
+            return the memoized qualified name of the URI; meant for the predicates, see node_label for the nodes
+        :param uri: the URI
+        :return: the qualified name
+        """
+        label = self.labels.get(uri)
+        if label is None:
+            label = self.rdf_graph.qname(uri)
+            self.labels[uri] = label
+        return label
+
+    def node_label(self, rdf_term):
+        """
+            return the vertex label of the rdf term, as node_label does, seeded or memoized in node_labels
+        """
+        label = self.labels.get(rdf_term)
+        if label is not None:
+            return label
+        with self._lock:
+            label = self.node_labels.get(rdf_term)
+            if label is not None:
+                self.node_labels.move_to_end(rdf_term)
+                return label
+        label = node_label(rdf_term, self.rdf_graph)
+        with self._lock:
+            self.node_labels[rdf_term] = label
+            if self.node_labels_maxsize is not None:
+                while len(self.node_labels) > self.node_labels_maxsize:
+                    self.node_labels.popitem(last=False)
+        return label
+
+    def predicate_label(self, property_term):
+        """
+            return the edge label or the property key of the predicate, as predicate_label does
+        """
+        return predicate_label(property_term, self)
+
+    def seed(self, labels):
+        """
+            add entries to the memo table
+        :param labels: dict mapping URIs, as rdf terms or strings, to qualified names
+        :return: None
+        """
+        self.labels.update({rdflib.URIRef(uri): label for uri, label in labels.items()})
+
+    def to_dict(self):
+        """
+            return the memo table with string keys, ready to be persisted (e.g. as JSON) and seeded again
+        """
+        return {str(uri): label for uri, label in self.labels.items()}
+
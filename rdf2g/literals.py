@@ -0,0 +1,88 @@
+"""
+literals
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import datetime
+import decimal
+
+from gremlin_python.process.traversal import Cardinality
+from rdflib.namespace import XSD
+
+# the XSD datatypes whose literals are stored as native values; the others are stored as strings
+NATIVE_DATATYPES = {XSD.integer, XSD.int, XSD.long, XSD.short, XSD.byte, XSD.nonNegativeInteger,
+                    XSD.nonPositiveInteger, XSD.positiveInteger, XSD.negativeInteger, XSD.unsignedLong,
+                    XSD.unsignedInt, XSD.unsignedShort, XSD.unsignedByte, XSD.decimal, XSD.double, XSD.float,
+                    XSD.boolean, XSD.dateTime, XSD.date}
+
+
+class LiteralMapper(object):
+    """
+        Maps the RDF literals to the values of the vertex properties.
+
+        By default rdf2g stores every literal as its string under the predicate key, with the cardinality of the
+        server. A mapper passed to the loaders stores instead the numbers, booleans and dates as native values,
+        so that the server can compare them (e.g. with P.gt or P.between) and index them, adds every value of a
+        repeated predicate with list or set cardinality, and optionally keeps the language tags in the keys.
+    """
+
+    def __init__(self, typed=True, cardinality=Cardinality.set_, language_keys=False):
+        """
+        :param typed: store the literals of the XSD numeric, boolean, date and dateTime datatypes as native values
+        :param cardinality: the cardinality of the vertex properties, Cardinality.set_, Cardinality.list_ or
+            Cardinality.single; None for the default cardinality of the server
+        :param language_keys: append the language tag to the key, e.g. "skos:prefLabel@en"
+        """
+        self.typed = typed
+        self.cardinality = cardinality
+        self.language_keys = language_keys
+
+    def property(self, key, literal):
+        """
+            map the literal object of a statement to a property
+        :param key: the property key computed from the predicate
+        :param literal: the rdf literal
+        :return: the (key, value) pair
+        """
+        if self.language_keys and literal.language:
+            key = "%s@%s" % (key, literal.language)
+        return key, self.value(literal)
+
+    def value(self, literal):
+        """
+            map a literal to a property value
+        :param literal: the rdf literal
+        :return: an int, float, bool or datetime for the well formed literals of the native datatypes,
+            the string of the literal otherwise
+        """
+        if not self.typed or literal.datatype not in NATIVE_DATATYPES:
+            return str(literal)
+        value = literal.toPython()
+        if isinstance(value, decimal.Decimal):
+            return float(value)
+        if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            return datetime.datetime.combine(value, datetime.time())
+        if isinstance(value, (bool, int, float, datetime.datetime)):
+            return value
+        # an ill formed literal is returned unchanged by rdflib
+        return str(literal)
+
+
+def literal_property(key, literal, literal_mapper=None):
+    """
+        map the literal object of a statement to a property, with the literal mapper if one is provided
+    :param key: the property key computed from the predicate
+    :param literal: the rdf literal
+    :param literal_mapper: the LiteralMapper, if any
+    :return: the (key, value) pair; the value is the string of the literal without a mapper
+    """
+    return literal_mapper.property(key, literal) if literal_mapper is not None else (key, str(literal))
+
+
+def property_cardinality(literal_mapper=None):
+    """
+        return the cardinality used to add the properties, None for the default cardinality of the server
+    """
+    return literal_mapper.cardinality if literal_mapper is not None else None
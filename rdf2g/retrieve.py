@@ -5,19 +5,71 @@ Author: Eugeniu Costetchi
 Email: costezki.eugen@gmail.com
 """
 
+from collections import OrderedDict
+from itertools import islice
+
 import rdflib
 from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import T, P, WithOptions
 from gremlin_python.structure.graph import Vertex
 
+# the number of nodes requested in one round-trip, small enough to stay under the server frame limits
+DEFAULT_CHUNK_SIZE = 1000
+
 
 def get_nodes(g):
     """
-        return all the nodes and their properties
+        return all the nodes and their properties, fetched in a single traversal
     :param g:
     :return:
     """
-    return [{**node.__dict__, **properties} for node in g.V()
-            for properties in g.V(node).valueMap()]
+    return [_node_dict(value_map) for value_map in g.V().valueMap().with_(WithOptions.tokens).toList()]
+
+
+def iter_nodes(g, page_size=DEFAULT_CHUNK_SIZE):
+    """
+        generate all the nodes and their properties, as get_nodes does, fetching them in pages of page_size nodes.
+        The pages are ordered by node id and each page starts after the last id of the previous one, so only one
+        page is held in memory at a time.
+
+        The cost is on the server: unless the backend has an ordered index on the ids, every page filters and
+        sorts the remaining vertices, so reading N vertices costs about N / page_size scans, O(N^2 log N) for a
+        fixed page size. Choose a page size as large as the client memory allows, or use get_nodes, a single
+        traversal, when the whole graph fits in memory.
+    :param g: gremlin graph
+    :param page_size: the number of nodes fetched in one round-trip
+    :return: generator of nodes
+    """
+    last_id = None
+    while True:
+        page = node_page_traversal(g, last_id, page_size).valueMap().with_(WithOptions.tokens).toList()
+        for value_map in page:
+            yield _node_dict(value_map)
+        if len(page) < page_size:
+            return
+        last_id = page[-1][T.id]
+
+
+def node_page_traversal(g, last_id, page_size):
+    """
+        Build the traversal of a page of vertices ordered by id, starting after last_id. Paging with the last id
+        of the previous page, instead of an offset, stays correct when vertices are added or removed meanwhile;
+        see iter_nodes for its cost.
+    :param g: gremlin graph
+    :param last_id: the id of the last vertex of the previous page, None for the first page
+    :param page_size: the number of vertices
+    :return: the traversal
+    """
+    traversal = g.V() if last_id is None else g.V().hasId(P.gt(last_id))
+    return traversal.order().by(T.id).limit(page_size)
+
+
+def _node_dict(value_map):
+    """
+        turn a value map with the id and label tokens into a node dict with 'id' and 'label' keys
+    """
+    node = dict(value_map)
+    return {"id": node.pop(T.id), "label": node.pop(T.label), **node}
 
 
 def get_node(g, id_):
@@ -27,17 +79,20 @@ def get_node(g, id_):
     :param id_: the node id or URI
     :return: the node
     """
-    if isinstance(id_, (rdflib.URIRef, rdflib.BNode,)):
-        nodes = g.V().has("iri", str(id_)).toList()
-    elif isinstance(id_, str):
-        nodes = g.V().hasLabel(id_).toList()
-        if not nodes:
-            nodes = g.V().has("iri", id_).toList()
-    elif isinstance(id_, Vertex):
+    if isinstance(id_, Vertex):
         return id_
-    else:
+    elif not isinstance(id_, str):
         return g.V(id_).next()
+    return single_node(get_node_traversal(g, id_).toList(), id_)
+
 
+def single_node(nodes, id_):
+    """
+        return the node found by get_node_traversal, or [] if none is found
+    :param nodes: the nodes found
+    :param id_: the node identifier looked up
+    :return: the node
+    """
     # If not found
     if not nodes:
         return []
@@ -47,6 +102,19 @@ def get_node(g, id_):
     return nodes[-1]
 
 
+def get_node_traversal(g, id_):
+    """
+        Build the traversal finding the node identified by a URI, or by a label and else by an iri, in a single
+        round-trip. At most two nodes are fetched, enough to detect the duplicates.
+    :param g: gremlin graph
+    :param id_: the node URI (rdflib term), or a string being the node label or iri
+    :return: the traversal
+    """
+    if isinstance(id_, (rdflib.URIRef, rdflib.BNode,)):
+        return g.V().has("iri", str(id_)).limit(2)
+    return g.inject(0).coalesce(__.V().hasLabel(id_).limit(2), __.V().has("iri", id_).limit(2))
+
+
 def get_edges(g, source_iri, target_iri):
     """
         retrieve the edges between source and target nodes identified by their URIs
@@ -55,15 +123,25 @@ def get_edges(g, source_iri, target_iri):
     :param target_iri: target node URI
     :return: the edge list
     """
+    return get_edges_traversal(g, source_iri, target_iri).toList()
+
+
+def get_edges_traversal(g, source_iri, target_iri):
+    """
+        Build the traversal of the edges between source and target nodes, see get_edges
+    :param g: gremlin graph
+    :param source_iri: source node URI, any source if None
+    :param target_iri: target node URI, any target if None
+    :return: the traversal
+    """
     if source_iri:
         if target_iri:
-            return g.V().has("iri", str(source_iri)).outE().as_("q").inV().has("iri", str(target_iri)).select(
-                "q").toList()
+            return g.V().has("iri", str(source_iri)).outE().as_("q").inV().has("iri", str(target_iri)).select("q")
         else:
-            return g.V().has("iri", str(source_iri)).outE().toList()
+            return g.V().has("iri", str(source_iri)).outE()
     elif target_iri:
-        return g.V().has("iri", str(target_iri)).inE().toList()
-    return g.E().toList()
+        return g.V().has("iri", str(target_iri)).inE()
+    return g.E()
 
 
 def get_node_properties(g, id_):
@@ -76,10 +154,40 @@ def get_node_properties(g, id_):
     props = g.V(id_).propertyMap().next()
     # reduction of props to simple dict (abandoning VertexProperty class in favour of property value)
     props = {key: [e.value for e in props[key]] for key in props}
-    # deflating lists
+    return deflate_properties(props, g.V(id_).label().next(), g.V(id_).id_().next())
+
+
+def get_nodes_properties(g, ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        get the property dictionaries of many graph nodes, as get_node_properties does, with one round-trip for
+        every chunk of chunk_size nodes
+    :param g: gremlin graph
+    :param ids: iterable of node ids or gremlin Vertex objects
+    :param chunk_size: the number of nodes requested in one round-trip
+    :return: the list of property dicts, in the order of ids; the nodes that are not found are left out
+    """
+    ids = iter(id_.id if isinstance(id_, Vertex) else id_ for id_ in ids)
+    result = []
+    chunk = list(islice(ids, chunk_size))
+    while chunk:
+        found = {item["id"]: deflate_properties(item["props"], item["label"], item["id"]) for item in
+                 g.V(*chunk).project("props", "label", "id").by(__.valueMap()).by(T.label).by(T.id).toList()}
+        result += [found[id_] for id_ in chunk if id_ in found]
+        chunk = list(islice(ids, chunk_size))
+    return result
+
+
+def deflate_properties(props, label, id_):
+    """
+        reduce the property lists with a single value to that value and add the special @label and @id properties
+    :param props: dict mapping the property keys to lists of values
+    :param label: the node label
+    :param id_: the node id
+    :return: the property dict
+    """
     d_props = {key: props[key] if len(props[key]) > 1 else props[key][0] for key in props}
-    d_props["@label"] = g.V(id_).label().next()
-    d_props["@id"] = g.V(id_).id().next()
+    d_props["@label"] = label
+    d_props["@id"] = id_
     return d_props
 
 
@@ -93,7 +201,8 @@ def get_nodes_of_type(g, id_):
     return g.V().as_("node").where(__.out("rdf:type").hasId(type_id.id)).select("node").dedup().toList()
 
 
-def generate_traversal_tree(g, root_, max_depth=4):
+def generate_traversal_tree(g, root_, max_depth=4, simple_path=False, dedup=False, fan_out=None, edge_labels=None,
+                            limit=None):
     """
         generate the traversal tree in the graph starting from the selected root node down to max_depth iterations.
 
@@ -103,18 +212,97 @@ def generate_traversal_tree(g, root_, max_depth=4):
             - the maximum allowed repetitions was reached
             - remove duplicates and generate the tree
 
+        On graphs with cycles or shared sub-trees the number of paths grows exponentially with the depth; the
+        options of traversal_hops keep the tree bounded.
+
     :param g: gremlin graph
     :param root_: the graph node selected as starting point of the traversal
     :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once, the tree being then a spanning tree of the reachable nodes
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths in the tree
+    :return: the traversal tree
+    """
+    node = get_node(g, root_)
+    return paths_tree(traversal_hops(g, node, max_depth, simple_path, dedup, fan_out, edge_labels, limit).
+                      path().toList())
+
+
+def paths_tree(paths, key=None):
+    """
+        build the tree of the paths of a traversal, in the g:Tree structure the tree step returns over GraphSON.
+        The tree is built on the client because the GraphBinary serializer, the default one of the driver, has no
+        g:Tree type; the paths can be fetched with either serializer.
+    :param paths: the paths, as returned by the path step
+    :param key: the function computing the hashable identity of a path object, the object itself if None
     :return: the traversal tree
     """
+    tree = OrderedDict()
+    for path in paths:
+        level = tree
+        for obj in path.objects:
+            level = level.setdefault(obj if key is None else key(obj), (obj, OrderedDict()))[1]
+    return _tree_dict(tree)
+
+
+def _tree_dict(tree):
+    """
+        turn the nested dicts of a tree into the g:Tree structure
+    """
+    return {"@type": "g:Tree", "@value": [{"key": obj, "value": _tree_dict(subtree)} for obj, subtree in tree.values()]}
+
+
+def iter_traversal_paths(g, root_, max_depth=4, simple_path=False, dedup=False, fan_out=None, edge_labels=None,
+                         limit=None):
+    """
+        generate the paths of the traversal tree, as generate_traversal_tree does, one path at a time. The server
+        sends the paths in batches, instead of the whole tree as a single result.
+    :param g: gremlin graph
+    :param root_: the graph node selected as starting point of the traversal
+    :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths
+    :return: generator of paths, lists alternating the node IRIs and the edge labels, from the root onwards
+    """
     node = get_node(g, root_)
+    for path in traversal_hops(g, node, max_depth, simple_path, dedup, fan_out, edge_labels, limit). \
+            path().by("iri").by(T.label):
+        yield list(path.objects)
+
+
+def traversal_hops(g, node, max_depth=4, simple_path=False, dedup=False, fan_out=None, edge_labels=None, limit=None):
+    """
+        Build the traversal walking the outgoing edges from the node, down to the leaves or to max_depth hops; the
+        tree or path step is appended by the caller.
 
-    # return g.V(node). \
-    #     repeat(__.outE().inV().dedup()). \
-    #     until(__.outE().count().is_(0).or_().loops().is_(max_depth)). \
-    #     dedup().tree().next()
-    return g.V(node). \
-        repeat(__.outE().inV()). \
-        until(__.outE().count().is_(0).or_().loops().is_(max_depth)). \
-        tree().next()
+        The leaves are the nodes without (matching) outgoing edges, which the server checks without counting the
+        edges. With simple_path or dedup the walk is cut where it would revisit a node, so every node reached
+        ends a path, not only the leaves; no node is lost when all its children are pruned.
+    :param g: gremlin graph
+    :param node: the gremlin node, or the node id, from which the walk starts
+    :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths
+    :return: the traversal
+    """
+    edge_labels = list(edge_labels or [])
+    hop = __.outE(*edge_labels) if fan_out is None else __.local(__.outE(*edge_labels).limit(fan_out))
+    hop = hop.inV()
+    if simple_path:
+        hop = hop.simplePath()
+    if dedup:
+        hop = hop.dedup()
+    traversal = g.V(node).repeat(hop)
+    if simple_path or dedup:
+        traversal = traversal.emit().until(__.loops().is_(max_depth))
+    else:
+        traversal = traversal.until(__.or_(__.not_(__.outE(*edge_labels)), __.loops().is_(max_depth)))
+    return traversal.limit(limit) if limit is not None else traversal
@@ -0,0 +1,245 @@
+"""
+serialize
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import gzip
+import io
+import logging
+import pathlib
+import re
+
+import rdflib
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import T
+from rdflib.namespace import RDF
+
+from rdf2g.dataset import DEFAULT_PARTITION_KEY
+from rdf2g.index import IRI_KEY
+from rdf2g.labels import BNODE_IRI_PREFIX
+from rdf2g.retrieve import node_page_traversal
+from rdf2g.stream import NTRIPLES_FORMAT
+
+TURTLE_FORMAT = "turtle"
+
+# the number of vertices, with their properties and outgoing edges, fetched in one round-trip
+DEFAULT_PAGE_SIZE = 1000
+
+# the property keys that do not come from statements
+DEFAULT_EXCLUDED_KEYS = (IRI_KEY, DEFAULT_PARTITION_KEY)
+
+# a property key ending with a language tag, as written by a LiteralMapper with language_keys
+_LANGUAGE_KEY = re.compile(r"^(.+)@([a-zA-Z]{1,8}(?:-[a-zA-Z0-9]{1,8})*)$")
+
+
+def export_rdf(g, path, namespaces=None, format=None, page_size=DEFAULT_PAGE_SIZE,
+               exclude_keys=DEFAULT_EXCLUDED_KEYS):
+    """
+        Export a property graph into an N-Triples or Turtle file, inverting the conventions of load_rdf2g: the iri
+        property of a vertex is the subject, the outgoing edges are links to the iri of their target and the other
+        properties are literals. The labels and the keys are expanded into predicates with the namespace map; the
+        language keys ("skos:prefLabel@en") become language tagged literals, the native values typed literals and
+        the paths of the blank nodes inlined by map_bnodes ("schema:geo/schema:latitude") blank nodes again.
+
+        The vertices are read page by page, each with its properties and outgoing edges, and written right away,
+        so the memory needed does not depend on the size of the graph. As in iter_nodes, the pages are ordered by
+        vertex id and each page starts after the last id of the previous one, so every vertex is exported once.
+        A vertex without an iri, and a vertex loaded from a blank node, whose iri is the rdflib id or the IRI given
+        by map_bnodes, is written as a blank node.
+
+    :param g: gremlin graph, e.g. the graph_source of a graph of a dataset
+    :param path: the path of the file to be written; a ".gz" suffix means the file is gzip compressed
+    :param namespaces: dict mapping prefixes to namespace URIs, or the rdf graph providing them, normally the
+        one the property graph was loaded from
+    :param format: "nt" or "turtle"; guessed from the file extension if not provided, N-Triples by default
+    :param page_size: the number of vertices fetched in one round-trip
+    :param exclude_keys: the vertex property keys that are not exported
+    :return: the export report, a dict with the number of vertices, properties and edges
+    """
+    path = pathlib.Path(path)
+    format = format if format else _guess_format(path)
+    if format not in (NTRIPLES_FORMAT, TURTLE_FORMAT):
+        raise ValueError('Unsupported format %s, expecting "%s" or "%s".' % (format, NTRIPLES_FORMAT, TURTLE_FORMAT))
+    namespace_manager = _namespace_manager(namespaces)
+    expand = _QualifiedNames(namespace_manager)
+    report = {"vertices": 0, "properties": 0, "edges": 0}
+    opener = gzip.open if path.suffix == ".gz" else io.open
+    with opener(str(path), "wt", encoding="utf-8") as f:
+        if format == TURTLE_FORMAT:
+            f.write("".join("@prefix %s: <%s> .\n" % (prefix, namespace)
+                            for prefix, namespace in namespace_manager.namespaces()) + "\n")
+        last_id = None
+        while True:
+            page = vertex_page_traversal(g, last_id, page_size).toList()
+            for vertex in page:
+                statements = list(vertex_statements(vertex, expand, exclude_keys, report))
+                f.write(_turtle_block(statements, namespace_manager) if format == TURTLE_FORMAT else
+                        "".join("%s %s %s .\n" % (s.n3(), p.n3(), _nt_object(o)) for s, p, o in statements))
+            report["vertices"] += len(page)
+            if len(page) < page_size:
+                break
+            last_id = page[-1]["id"]
+    logging.info('Exported %(vertices)s vertices, %(properties)s properties and %(edges)s edges.' % report)
+    return report
+
+
+def vertex_page_traversal(g, last_id, page_size):
+    """
+        Build the traversal fetching a page of vertices, see node_page_traversal, projected as {"id": ...,
+        "iri": [...], "properties": {...}, "edges": [{"label": ..., "id": ..., "iri": [...]}, ...]} maps, the edges
+        giving the id and iri of their target
+    :param g: gremlin graph
+    :param last_id: the id of the last vertex of the previous page, None for the first page
+    :param page_size: the number of vertices
+    :return: the traversal
+    """
+    return node_page_traversal(g, last_id, page_size). \
+        project("id", "iri", "properties", "edges"). \
+        by(T.id). \
+        by(__.values(IRI_KEY).fold()). \
+        by(__.valueMap()). \
+        by(__.outE().project("label", "id", "iri").by(T.label).by(__.inV().id_()).
+           by(__.inV().values(IRI_KEY).fold()).fold())
+
+
+def vertex_statements(vertex, expand, exclude_keys=DEFAULT_EXCLUDED_KEYS, report=None):
+    """
+        generate the RDF statements of a vertex fetched by vertex_page_traversal
+    :param vertex: the vertex map
+    :param expand: function mapping a label or a key to the list of its predicates, one per step of an inlined
+        path, or to None if it cannot be expanded
+    :param exclude_keys: the property keys that are not exported
+    :param report: the export report to be updated, if any
+    :return: generator of (subject, predicate, object) triples
+    """
+    subject = _node_term(vertex["id"], vertex["iri"])
+    # the blank nodes of the inlined paths, by path, shared by the values of the paths beginning the same way
+    path_nodes = {}
+    for key, values in vertex["properties"].items():
+        if key in exclude_keys:
+            continue
+        match = _LANGUAGE_KEY.match(key)
+        predicates = expand(match.group(1) if match else key)
+        if predicates is None:
+            continue
+        for value in values:
+            parent = subject
+            for i, predicate in enumerate(predicates[:-1]):
+                path = tuple(predicates[:i + 1])
+                if path not in path_nodes:
+                    path_nodes[path] = rdflib.BNode("v%sb%s" % (vertex["id"], len(path_nodes)))
+                    yield parent, predicate, path_nodes[path]
+                parent = path_nodes[path]
+            yield parent, predicates[-1], _literal_term(predicates[-1], value, match.group(2) if match else None)
+            if report is not None:
+                report["properties"] += 1
+    for edge in vertex["edges"]:
+        predicates = expand(edge["label"])
+        if predicates is None:
+            continue
+        yield subject, predicates[-1], _node_term(edge["id"], edge["iri"])
+        if report is not None:
+            report["edges"] += 1
+
+
+class _QualifiedNames(object):
+    """
+        Memoized expansion of the edge labels and property keys into predicates; the labels that cannot be
+        expanded are reported once and skipped
+    """
+
+    def __init__(self, namespace_manager):
+        self.namespaces = {prefix: str(namespace) for prefix, namespace in namespace_manager.namespaces()}
+        self.predicates = {}
+
+    def __call__(self, label):
+        if label not in self.predicates:
+            # a path of qualified names is an inlined path, the qualified names cannot contain a slash
+            steps = [self._expand(step, qualified_only=True) for step in label.split("/")]
+            if len(steps) > 1 and None not in steps:
+                self.predicates[label] = steps
+            else:
+                predicate = self._expand(label)
+                self.predicates[label] = [predicate] if predicate is not None else None
+            if self.predicates[label] is None:
+                logging.warning('Cannot expand %s into a predicate, it is not exported.' % label)
+        return self.predicates[label]
+
+    def _expand(self, label, qualified_only=False):
+        prefix, separator, local_name = label.partition(":")
+        if separator and prefix in self.namespaces:
+            return rdflib.URIRef(self.namespaces[prefix] + local_name)
+        if not qualified_only and separator and "/" not in prefix and not prefix.isdigit() and \
+                (local_name.startswith("//") or prefix in ("urn", "mailto", "tag")):
+            return rdflib.URIRef(label)
+        return None
+
+
+def _namespace_manager(namespaces):
+    """
+        the namespace manager of the prefixes of a dict or of an rdf graph
+    """
+    graph = rdflib.Graph(bind_namespaces="none")
+    if isinstance(namespaces, rdflib.Graph):
+        namespaces = dict(namespaces.namespaces())
+    for prefix, namespace in (namespaces or {}).items():
+        graph.bind(prefix, rdflib.Namespace(namespace), override=True, replace=True)
+    return graph.namespace_manager
+
+
+def _node_term(vertex_id, iris):
+    """
+        the subject or object of a vertex: its iri, or a blank node
+    """
+    iri = iris[0] if iris else None
+    if iri is None:
+        return rdflib.BNode("v%s" % vertex_id)
+    if iri.startswith(BNODE_IRI_PREFIX):
+        return rdflib.BNode(iri[len(BNODE_IRI_PREFIX):])
+    # the rdflib identifiers of the blank nodes are used as their iri by load_rdf2g
+    return rdflib.URIRef(iri) if ":" in iri else rdflib.BNode(iri)
+
+
+def _literal_term(predicate, value, language=None):
+    """
+        the object of a property value; the rdf:type of an inlined blank node is an IRI again
+    """
+    if predicate == RDF.type and isinstance(value, str):
+        return rdflib.URIRef(value)
+    if isinstance(value, str):
+        return rdflib.Literal(value, lang=language)
+    return rdflib.Literal(value)
+
+
+def _nt_object(term):
+    """
+        the N-Triples representation of an object; the literals are written on one line
+    """
+    if not isinstance(term, rdflib.Literal):
+        return term.n3()
+    value = str(term).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    if term.language:
+        return '"%s"@%s' % (value, term.language)
+    if term.datatype:
+        return '"%s"^^%s' % (value, term.datatype.n3())
+    return '"%s"' % value
+
+
+def _turtle_block(statements, namespace_manager):
+    """
+        the Turtle statements of a subject and of the blank nodes of its inlined paths, predicate lists grouped
+    """
+    if not statements:
+        return ""
+    subjects = {}
+    for s, p, o in statements:
+        subjects.setdefault(s, []).append("%s %s" % (p.n3(namespace_manager), o.n3(namespace_manager)))
+    return "".join("%s\n    %s .\n\n" % (s.n3(namespace_manager), " ;\n    ".join(objects))
+                   for s, objects in subjects.items())
+
+
+def _guess_format(path):
+    suffix = pathlib.Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+    return TURTLE_FORMAT if suffix.lower() == ".ttl" else NTRIPLES_FORMAT
@@ -0,0 +1,163 @@
+"""
+stream
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import gzip
+import io
+import logging
+import mmap
+import pathlib
+
+import rdflib
+from rdflib.exceptions import ParserError
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.plugins.parsers.nquads import NQuadsParser
+
+from rdf2g.bulk import DEFAULT_BATCH_SIZE, COALESCE, load_rdf2g_bulk
+from rdf2g.index import WARN
+
+NTRIPLES_FORMAT = "nt"
+NQUADS_FORMAT = "nquads"
+
+FILE_EXTENSION_FORMATS = {".nt": NTRIPLES_FORMAT, ".ntriples": NTRIPLES_FORMAT, ".nq": NQUADS_FORMAT,
+                          ".nquads": NQUADS_FORMAT}
+
+
+class _StatementSink(object):
+    """
+        Collect the statements found by the rdflib line parsers; quads are kept as (s, p, o, graph_iri) tuples
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.default_context = self
+
+    def triple(self, s, p, o):
+        self.statements.append((s, p, o, None))
+
+    def get_context(self, context):
+        return _ContextSink(self, context)
+
+    def add(self, triple):
+        self.statements.append(triple + (None,))
+
+
+class _ContextSink(object):
+    def __init__(self, sink, context):
+        self.sink = sink
+        self.context = context
+
+    def add(self, triple):
+        self.sink.statements.append(triple + (self.context,))
+
+
+class RDFFileSource(object):
+    """
+        Re-iterable source of the triples in a line-based N-Triples or N-Quads file (optionally gzip compressed).
+        The file is read incrementally, one line at a time, every time the source is iterated. Blank node
+        identifiers are mapped to the same rdflib.BNode in every iteration.
+    """
+
+    def __init__(self, path, format=None, use_mmap=False):
+        """
+        :param path: the file path; a ".gz" suffix means the file is gzip compressed
+        :param format: "nt" or "nquads"; guessed from the file extension if not provided
+        :param use_mmap: read an uncompressed file through a memory map
+        """
+        self.path = pathlib.Path(path)
+        self.compressed = self.path.suffix == ".gz"
+        self.format = format if format else guess_format(self.path)
+        if self.format not in (NTRIPLES_FORMAT, NQUADS_FORMAT):
+            raise ValueError('Unsupported format %s, expecting "%s" or "%s".' %
+                             (self.format, NTRIPLES_FORMAT, NQUADS_FORMAT))
+        self.use_mmap = use_mmap and not self.compressed
+        self.bnode_context = {}
+
+    def __iter__(self):
+        for s, p, o, graph_iri in self.quads():
+            yield s, p, o
+
+    def quads(self):
+        """
+            generate the statements of the file as (subject, predicate, object, graph IRI) tuples;
+            the graph IRI is None for N-Triples and for the default graph of N-Quads.
+        """
+        sink = _StatementSink()
+        parser = NQuadsParser(sink) if self.format == NQUADS_FORMAT else W3CNTriplesParser(sink)
+        for line_number, line in enumerate(self._lines(), 1):
+            parser.line = line.rstrip("\r\n")
+            try:
+                parser.parseline(bnode_context=self.bnode_context)
+            except ParserError as e:
+                raise ParserError("Invalid line %s in %s: %s" % (line_number, str(self.path), str(e)))
+            if sink.statements:
+                yield from sink.statements
+                sink.statements.clear()
+
+    def _lines(self):
+        if self.compressed:
+            with gzip.open(str(self.path), "rt", encoding="utf-8") as f:
+                yield from f
+        elif self.use_mmap:
+            with open(str(self.path), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b""):
+                    yield line.decode("utf-8")
+        else:
+            with io.open(str(self.path), "r", encoding="utf-8") as f:
+                yield from f
+
+
+def guess_format(path):
+    """
+        guess the RDF format of a line-based file from its extension
+    :param path: the file path
+    :return: "nt" or "nquads"
+    """
+    path = pathlib.Path(path)
+    suffix = pathlib.Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+    if suffix.lower() not in FILE_EXTENSION_FORMATS:
+        raise ValueError('Cannot guess the format of %s, expecting one of %s' %
+                         (str(path), ", ".join(FILE_EXTENSION_FORMATS)))
+    return FILE_EXTENSION_FORMATS[suffix.lower()]
+
+
+def namespace_graph(namespaces=None):
+    """
+        create an empty RDF graph that only provides the prefix definitions used to compute the qualified names
+    :param namespaces: dict mapping prefixes to namespace URIs
+    :return: rdf graph
+    """
+    rdf_graph = rdflib.Graph()
+    for prefix, namespace in (namespaces or {}).items():
+        rdf_graph.bind(prefix, rdflib.Namespace(namespace), override=True, replace=True)
+    return rdf_graph
+
+
+def load_file(g, path, namespaces=None, format=None, batch_size=DEFAULT_BATCH_SIZE, use_mmap=False,
+              node_cache=None, label_resolver=None, on_missing_index=WARN, literal_mapper=None, upsert=COALESCE):
+    """
+        Load an N-Triples or N-Quads file into a property graph g without building an rdflib.Graph in memory.
+        The triples are read incrementally and fed into the bulk loader in batches; the graph names of the quads
+        are ignored.
+    :param g: gremlin graph
+    :param path: the file path; a ".gz" suffix means the file is gzip compressed
+    :param namespaces: dict mapping prefixes to namespace URIs, used to compute the qualified names
+    :param format: "nt" or "nquads"; guessed from the file extension if not provided
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param use_mmap: read an uncompressed file through a memory map
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used for this load if not provided
+    :param label_resolver: the LabelResolver computing the labels; namespaces is ignored if provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param upsert: "coalesce" or "merge" to create the vertices and edges only if they do not exist yet, None to
+        add them without checking
+    :return: the load report
+    """
+    logging.info('Streaming %s into the graph.' % str(path))
+    return load_rdf2g_bulk(g, namespace_graph(namespaces), batch_size=batch_size, node_cache=node_cache,
+                           triples=RDFFileSource(path, format=format, use_mmap=use_mmap),
+                           label_resolver=label_resolver, on_missing_index=on_missing_index,
+                           literal_mapper=literal_mapper, upsert=upsert)
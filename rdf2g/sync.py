@@ -0,0 +1,173 @@
+"""
+sync
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import hashlib
+import logging
+
+import rdflib
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import P
+
+from rdf2g.bulk import DEFAULT_BATCH_SIZE, batches, distinct_nodes, resolve_nodes, write_statements, new_report
+from rdf2g.cache import NodeCache, invalidate_vertex_caches
+from rdf2g.dataset import DEFAULT_PARTITION_KEY
+from rdf2g.labels import LabelResolver, predicate_label
+from rdf2g.literals import literal_property
+
+
+def sync_rdf2g(g, rdf_graph, previous_graph=None, previous_digests=None, batch_size=DEFAULT_BATCH_SIZE,
+               node_cache=None, label_resolver=None, literal_mapper=None, partition_key=DEFAULT_PARTITION_KEY):
+    """
+        Bring a property graph loaded from a previous version of an RDF graph up to date with the new version,
+        applying only the differences instead of clearing and reloading the whole graph.
+
+        The differences are computed either from the previous RDF graph, triple by triple, or, if only the
+        digests of the previous version are kept (see subject_digests), node by node: the outgoing edges and the
+        properties of every node whose digest changed are replaced, and the replaced ones are not counted in the
+        report. Blank nodes get new identifiers every time a file is parsed, so the triples involving them are
+        always seen as changed.
+
+    :param g: gremlin graph
+    :param rdf_graph: the new version of the rdf graph
+    :param previous_graph: the rdf graph previously loaded into g
+    :param previous_digests: the subject_digests of the rdf graph previously loaded, used without previous_graph
+    :param batch_size: the number of vertices or triples sent to the server in one round-trip
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used if not provided
+    :param label_resolver: the LabelResolver computing the labels; a new one is used if not provided
+    :param literal_mapper: the LiteralMapper the graph was loaded with, if any
+    :param partition_key: the property holding the graph name of the vertices loaded by load_dataset, kept by
+        clear_nodes
+    :return: the sync report, a dict with the number of added and removed vertices, properties and edges
+    """
+    if previous_graph is None and previous_digests is None:
+        raise ValueError("Either the previous rdf graph or its subject digests are needed to compute the changes.")
+    node_cache = NodeCache() if node_cache is None else node_cache
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
+    report = {"vertices_added": 0, "vertices_removed": 0, "properties_added": 0, "properties_removed": 0,
+              "edges_added": 0, "edges_removed": 0, "round_trips": 0}
+
+    if previous_graph is not None:
+        removed = [triple for triple in previous_graph if triple not in rdf_graph]
+        added = [triple for triple in rdf_graph if triple not in previous_graph]
+        for triples in batches(removed, batch_size):
+            remove_statements(g, triples, labels, report, literal_mapper)
+        stale_nodes = [node for node in distinct_nodes(removed) if not _is_node_of(node, rdf_graph)]
+    else:
+        digests = subject_digests(rdf_graph)
+        changed = [node for node, digest in digests.items() if previous_digests.get(node) != digest]
+        stale_nodes = [rdflib.URIRef(node) for node in previous_digests if node not in digests]
+        for nodes in batches(changed, batch_size):
+            clear_nodes(g, nodes, report, partition_key)
+        changed = set(changed)
+        added = [triple for triple in rdf_graph if str(triple[0]) in changed]
+
+    for nodes in batches(stale_nodes, batch_size):
+        remove_nodes(g, nodes, report, node_cache)
+
+    load_report = new_report()
+    for nodes in batches(distinct_nodes(added), batch_size):
+        resolve_nodes(g, nodes, labels, load_report, node_cache)
+    for triples in batches(added, batch_size):
+        write_statements(g, triples, labels, load_report, node_cache, literal_mapper)
+    report["vertices_added"] += load_report["vertices"]
+    report["properties_added"] += load_report["properties"]
+    report["edges_added"] += load_report["edges"]
+    report["round_trips"] += load_report["round_trips"]
+
+    logging.info('Synchronised the graph: %(vertices_added)s/%(vertices_removed)s vertices, '
+                 '%(properties_added)s/%(properties_removed)s properties and %(edges_added)s/%(edges_removed)s '
+                 'edges added/removed.' % report)
+    return report
+
+
+def subject_digests(rdf_graph):
+    """
+        Compute a digest of the statements of every node, to be stored after a load and used by the next sync.
+        The nodes that are only objects get the digest of an empty statement list.
+    :param rdf_graph: rdf graph
+    :return: dict mapping the node IRIs to hexadecimal digests
+    """
+    statements = {}
+    for s, p, o in rdf_graph:
+        statements.setdefault(str(s), []).append("%s %s" % (p.n3(), o.n3()))
+        if isinstance(o, (rdflib.URIRef, rdflib.BNode)):
+            statements.setdefault(str(o), [])
+    return {node: hashlib.sha1("\n".join(sorted(node_statements)).encode("utf-8")).hexdigest()
+            for node, node_statements in statements.items()}
+
+
+def remove_statements(g, triples, rdf_graph, report=None, literal_mapper=None):
+    """
+        Remove the literal properties and the links corresponding to a batch of triples, in a single traversal.
+        Every triple is a branch of its own, so a missing node only skips its triple, and only the properties and
+        edges actually found are counted as removed.
+    :param g: gremlin graph
+    :param triples: the list of (subject, predicate, object) triples
+    :param rdf_graph: the graph to which the triples belong, or the LabelResolver computing its labels
+    :param report: the sync report to be updated, if any
+    :param literal_mapper: the LiteralMapper the graph was loaded with, if any
+    :return: None
+    """
+    branches = []
+    for s, p, o in triples:
+        label = predicate_label(p, rdf_graph)
+        if isinstance(o, rdflib.Literal):
+            key, value = literal_property(label, o, literal_mapper)
+            branches.append(__.V().has("iri", str(s)).properties(key).hasValue(value).
+                            sideEffect(__.drop()).constant("properties_removed"))
+        else:
+            branches.append(__.V().has("iri", str(s)).outE(label).where(__.inV().has("iri", str(o))).
+                            sideEffect(__.drop()).constant("edges_removed"))
+    removed = g.inject(0).union(*branches).toList()
+    if report is not None:
+        report["properties_removed"] += removed.count("properties_removed")
+        report["edges_removed"] += removed.count("edges_removed")
+        report["round_trips"] += 1
+
+
+def clear_nodes(g, nodes, report=None, partition_key=DEFAULT_PARTITION_KEY):
+    """
+        Remove the outgoing edges and all the properties of the nodes, but the iri and the partition key, so the
+        vertices of a graph loaded by load_dataset stay in their partition
+    :param g: gremlin graph
+    :param nodes: the list of node IRIs
+    :param report: the sync report to be updated, if any
+    :param partition_key: the property holding the graph name, see load_dataset
+    :return: None
+    """
+    g.V().has("iri", P.within(*[str(node) for node in nodes])). \
+        sideEffect(__.outE().drop()). \
+        sideEffect(__.properties().not_(__.hasKey(P.within("iri", partition_key))).drop()).iterate()
+    if report is not None:
+        report["round_trips"] += 1
+
+
+def remove_nodes(g, nodes, report=None, node_cache=None):
+    """
+        Remove the nodes and their edges from the graph
+    :param g: gremlin graph
+    :param nodes: the list of node IRIs
+    :param report: the sync report to be updated, if any
+    :param node_cache: the NodeCache to forget the removed nodes
+    :return: None
+    """
+    g.V().has("iri", P.within(*[str(node) for node in nodes])).drop().iterate()
+    if nodes:
+        invalidate_vertex_caches(*nodes)
+    if node_cache is not None:
+        for node in nodes:
+            node_cache.invalidate(node)
+    if report is not None:
+        report["vertices_removed"] += len(nodes)
+        report["round_trips"] += 1
+
+
+def _is_node_of(rdf_term, rdf_graph):
+    """
+        check whether the rdf term is still a subject or an object in the graph
+    """
+    return (rdf_term, None, None) in rdf_graph or (None, None, rdf_term) in rdf_graph
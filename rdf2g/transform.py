@@ -9,7 +9,9 @@ import logging
 from functools import reduce
 from pprint import pprint
 
-from rdf2g.retrieve import get_node_properties
+from rdf2g.retrieve import get_node, get_nodes_properties, deflate_properties, traversal_hops, paths_tree
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import T, WithOptions
 from gremlin_python.structure.graph import Vertex, Edge
 
 
@@ -27,6 +29,25 @@ def expand_tree(g, tree_dict) -> list:
     :param tree_dict: the traversal tree
     :return: list of nodes
     """
+    # the properties of all the nodes in the tree are fetched at once
+    properties = {props["@id"]: props for props in get_nodes_properties(g, set(tree_vertex_ids(tree_dict)))}
+    return _expand_tree(tree_dict, properties)
+
+
+def tree_vertex_ids(tree_dict):
+    """
+        generate the ids of the vertices found in a tree of vertices/edges
+    :param tree_dict: the traversal tree
+    :return: generator of vertex ids
+    """
+    for item in tree_dict.get("@value") or []:
+        if isinstance(item.get("key"), Vertex):
+            yield item["key"].id
+        if isinstance(item.get("value"), dict):
+            yield from tree_vertex_ids(item["value"])
+
+
+def _expand_tree(tree_dict, properties):
     # if it is a 'g:Tree' dict
     if "@type" in tree_dict and "@value" in tree_dict:
         if not tree_dict["@value"]:
@@ -36,8 +57,8 @@ def expand_tree(g, tree_dict) -> list:
             # deal with tree of vertices
             node_list = []
             for node in tree_dict["@value"]:
-                prop_dict = get_node_properties(g, node["key"])
-                edge_dict = expand_tree(g, node["value"])
+                prop_dict = dict(properties[node["key"].id])
+                edge_dict = _expand_tree(node["value"], properties)
                 merged_dict = {**prop_dict, **edge_dict} if edge_dict else prop_dict  # expect only edge dict to be null
                 node_list.append(merged_dict)
             return node_list
@@ -49,7 +70,7 @@ def expand_tree(g, tree_dict) -> list:
                 edge_label = edge["key"].label
                 if edge_label not in edge_dict:
                     edge_dict[edge_label] = []
-                edge_dict[edge_label] += expand_tree(g, edge["value"])
+                edge_dict[edge_label] += _expand_tree(edge["value"], properties)
             # deflate lists with single nodes
             edge_dict = {
                 edge_label: node_list if len(node_list) > 1 else node_list[0]
@@ -61,6 +82,69 @@ def expand_tree(g, tree_dict) -> list:
         raise IndexError("Unexpected structure! Expecting a dict and ['@type', '@value'] among the keys.")
 
 
+def expand_traversal_tree(g, root_, max_depth=4, simple_path=False, dedup=False, fan_out=None, edge_labels=None,
+                          limit=None):
+    """
+        Generate the traversal tree starting from the root node, as generate_traversal_tree does, and expand it, as
+        expand_tree does, fetching the paths of the tree together with the node properties in a single traversal.
+
+    :param g: the gremlin graph
+    :param root_: the graph node selected as starting point of the traversal
+    :param max_depth: the maximum number of traversal hops
+    :param simple_path: do not walk back to a node already on the path
+    :param dedup: visit every node only once
+    :param fan_out: the maximum number of outgoing edges followed from every node
+    :param edge_labels: the labels of the edges to be followed, all the edges if None
+    :param limit: the maximum number of paths in the tree
+    :return: list of nodes
+    """
+    node = get_node(g, root_)
+    paths = traversal_hops(g, node, max_depth, simple_path, dedup, fan_out, edge_labels, limit). \
+        path().by(__.valueMap().with_(WithOptions.tokens)).toList()
+    # a level of the tree holds either vertices or edges, so their value maps are told apart by the id token
+    return expand_value_map_tree(paths_tree(paths, key=lambda value_map: value_map[T.id]))
+
+
+def expand_value_map_tree(tree_dict, vertex_level=True):
+    """
+        Expand a tree whose nodes and edges are value maps including the id and label tokens, for example the tree
+        built by paths_tree from g.V(233).outE().inV().path().by(__.valueMap().with_(WithOptions.tokens)).toList()
+
+        The result has the same structure as the one of expand_tree, but no further query is needed.
+
+    :param tree_dict: the traversal tree of value maps, alternating node and edge levels
+    :param vertex_level: whether the top level of the tree holds nodes (or edges)
+    :return: list of nodes
+    """
+    if "@type" in tree_dict and "@value" in tree_dict:
+        if not tree_dict["@value"]:
+            # a leaf is reached
+            return None
+        elif vertex_level:
+            node_list = []
+            for node in tree_dict["@value"]:
+                value_map = dict(node["key"])
+                label, id_ = value_map.pop(T.label), value_map.pop(T.id)
+                prop_dict = deflate_properties(value_map, label, id_)
+                edge_dict = expand_value_map_tree(node["value"], vertex_level=False)
+                merged_dict = {**prop_dict, **edge_dict} if edge_dict else prop_dict  # expect only edge dict to be null
+                node_list.append(merged_dict)
+            return node_list
+        else:
+            edge_dict = {}
+            for edge in tree_dict["@value"]:
+                # consider having multiple usages of the same edge label
+                edge_label = edge["key"][T.label]
+                if edge_label not in edge_dict:
+                    edge_dict[edge_label] = []
+                edge_dict[edge_label] += expand_value_map_tree(edge["value"], vertex_level=True)
+            # deflate lists with single nodes
+            return {edge_label: node_list if len(node_list) > 1 else node_list[0]
+                    for edge_label, node_list in edge_dict.items()}
+    else:
+        raise IndexError("Unexpected structure! Expecting a dict and ['@type', '@value'] among the keys.")
+
+
 def flatten_list_of_dicts(list_of_dicts):
     """
         Flatten the list of dictionaries:
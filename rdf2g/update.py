@@ -7,113 +7,239 @@ Email: costezki.eugen@gmail.com
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import rdflib
 from gremlin_python import statics
 from gremlin_python.structure.graph import Graph, Vertex, Edge, Element
 from gremlin_python.process.graph_traversal import __
 from gremlin_python.process.strategies import *
-from gremlin_python.process.traversal import T, P, Operator, Bindings
+from gremlin_python.process.traversal import T, P, TextP, Operator, Bindings
 from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
 
 from rdf2g.retrieve import *
+from rdf2g.bnodes import apply_bnode_strategy
+from rdf2g.bulk import COALESCE, WorkerGraphs, created_flag, upsert_link_traversal, upsert_node_traversal
+from rdf2g.cache import NodeCache, invalidate_vertex_caches
+from rdf2g.labels import LabelResolver, node_label, predicate_label
+from rdf2g.index import check_iri_index, WARN
+from rdf2g.literals import literal_property, property_cardinality
 
 
-def load_rdf2g(g, rdf_graph):
+def load_rdf2g(g, rdf_graph, node_cache=None, label_resolver=None, on_missing_index=WARN, literal_mapper=None,
+               bnode_strategy=None, upsert=COALESCE):
     """
         Load an RDF graph into a property graph g
     :param g: gremlin graph
     :param rdf_graph: rdf graph
+    :param node_cache: the NodeCache used to resolve the nodes; a new one is used for this load if not provided
+    :param label_resolver: the LabelResolver computing the labels; a new one is used for this load if not provided
+    :param on_missing_index: "warn" or "raise" if the iri property is not indexed, None to skip the check
+    :param literal_mapper: the LiteralMapper mapping the literals to property values; their strings if None
+    :param bnode_strategy: "fixed", "skolem" or "inline" to map the blank nodes with map_bnodes; the blank nodes
+        are labelled and identified by their rdflib ids if None
+    :param upsert: "coalesce" or "merge" to create the nodes and links only if they do not exist yet, so that
+        concurrent and repeated loads create neither duplicate nodes nor duplicate links; None to look the nodes up
+        before adding them and to add the links without checking
     :return: gremlin graph
     """
+    check_iri_index(g, on_missing_index)
+    rdf_graph = apply_bnode_strategy(rdf_graph, bnode_strategy)
+    node_cache = NodeCache() if node_cache is None else node_cache
+    labels = LabelResolver(rdf_graph) if label_resolver is None else label_resolver
     for s, p, o in rdf_graph:
-        subj_node = create_node(g, s, rdf_graph)
+        subj_node = create_node(g, s, labels, node_cache=node_cache, upsert=upsert)
         if isinstance(o, (rdflib.URIRef, rdflib.BNode)):
-            obj_node = create_node(g, o, rdf_graph)
-            link_nodes(g, subj_node, obj_node, p, rdf_graph)
+            obj_node = create_node(g, o, labels, node_cache=node_cache, upsert=upsert)
+            link_nodes(g, subj_node, obj_node, p, labels, upsert=upsert)
         elif isinstance(o, rdflib.Literal):
-            add_property(g, node=subj_node, property_term=p, value_term=o, rdf_graph=rdf_graph)
+            add_property(g, node=subj_node, property_term=p, value_term=o, rdf_graph=labels,
+                         literal_mapper=literal_mapper)
     return g
 
 
-def clear_graph(g):
+def clear_graph(g, batch_size=None, labels=None, iri_prefix=None, workers=1, progress=None, graph_factory=None):
     """
-        erase all the vertices and edges from a graph
+        erase all the vertices and edges from a graph, or only the selected nodes and their edges.
+
+        By default everything is dropped in a single traversal. Large graphs shall be cleared in batches of
+        batch_size elements, edges first, so that no request exceeds the server timeout or transaction size
+        and the clearing can be interrupted between batches. With several workers, the ids of up to workers
+        batches are selected at a time and the batches are dropped in parallel, each worker through its own
+        graph if a graph_factory is given; all the edges are dropped before the first vertex is. Without a
+        factory the workers share the connection of g, whose pool should have a connection per worker
+        (the pool_size of the DriverRemoteConnection).
     :param g:
+    :param batch_size: the number of elements dropped in one round-trip, None for a single traversal
+    :param labels: the labels of the nodes to be dropped, all the nodes if None
+    :param iri_prefix: the beginning of the iri of the nodes to be dropped, all the nodes if None
+    :param workers: the number of batches dropped at the same time
+    :param progress: function called after each batch with the element kind ("edges" or "vertices") and the
+        number of elements of that kind dropped so far
+    :param graph_factory: function without arguments returning the gremlin graph of a worker, closed at the end;
+        the workers share g if None
     :return:
     """
     # g = setup_graph()
     logging.info('Cleaning up the graph.')
-    g.V().drop().iterate()
+    invalidate_vertex_caches()
+    if batch_size is None:
+        _selected_nodes(g, labels, iri_prefix).drop().iterate()
+        return True
+    if labels is None and iri_prefix is None:
+        selections = (("edges", lambda: g.E()), ("vertices", lambda: g.V()))
+    else:
+        selections = (("edges", lambda: _selected_nodes(g, labels, iri_prefix).bothE().dedup()),
+                      ("vertices", lambda: _selected_nodes(g, labels, iri_prefix)))
+
+    def drop(kind, chunk):
+        worker_g = worker_graphs.get()
+        elements = worker_g.E(*chunk) if kind == "edges" else worker_g.V(*chunk)
+        return elements.sideEffect(__.drop()).count().next()
+
+    with WorkerGraphs(g, graph_factory) as worker_graphs, ThreadPoolExecutor(max_workers=workers) as executor:
+        for kind, selection in selections:
+            dropped = 0
+            while True:
+                if workers > 1:
+                    ids = selection().limit(batch_size * workers).id_().toList()
+                    chunks = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+                    # all the batches of a round are dropped before the next selection, and so the edges before
+                    # the vertices
+                    count = sum(executor.map(lambda chunk: drop(kind, chunk), chunks))
+                else:
+                    count = selection().limit(batch_size).sideEffect(__.drop()).count().next()
+                if not count:
+                    break
+                dropped += count
+                logging.debug('%s %s dropped.' % (dropped, kind))
+                if progress is not None:
+                    progress(kind, dropped)
+            logging.info('%s %s dropped.' % (dropped, kind))
     return True
 
 
-def create_node(g, rdf_term, rdf_graph):
+def _selected_nodes(g, labels=None, iri_prefix=None):
+    """
+        return the traversal of the nodes having one of the labels and an iri beginning with the prefix
+    """
+    traversal = g.V()
+    if labels is not None:
+        traversal = traversal.hasLabel(*([labels] if isinstance(labels, str) else labels))
+    if iri_prefix is not None:
+        traversal = traversal.has("iri", TextP.startingWith(iri_prefix))
+    return traversal
+
+
+def create_node(g, rdf_term, rdf_graph, node_cache=None, upsert=COALESCE):
     """
         Add a new node to the graph.
     :param g: gremlin graph
     :param rdf_term:  the rdf_term identifying the node
-    :param rdf_graph: the graph to which rdf_term belongs
-    :return: the newly created node
+    :param rdf_graph: the graph to which rdf_term belongs, or the LabelResolver computing its labels
+    :param node_cache: the NodeCache consulted before asking the server whether the node exists
+    :param upsert: "coalesce" or "merge" to find or create the node in a single round-trip, None to look it up
+        first and add it if it is missing
+    :return: the newly created node, or the existing one
     """
 
     # pg = g if g else setup_graph()
 
+    iri = str(rdf_term)
+    if upsert is not None:
+        node_id = node_cache.get(iri) if node_cache is not None else None
+        if node_id is not None:
+            logging.debug('Node exists.')
+            return Vertex(node_id, node_label(rdf_term, rdf_graph))
+        # the server adds the node unless it exists, so that concurrent loaders do not duplicate it
+        result = upsert_node_traversal(g, rdf_term, rdf_graph, upsert).project("vertex", "created"). \
+            by(__.identity()).by(created_flag(upsert=upsert)).next()
+        node = result["vertex"]
+        if result["created"]:
+            logging.debug('Added a new node to the graph.')
+            invalidate_vertex_caches(rdf_term, node_label(rdf_term, rdf_graph))
+        if node_cache is not None:
+            node_cache.put(iri, node.id)
+        return node
+
     # if already exists, do not add a new node
-    existing_node = get_node(g, rdf_term)
+    existing_node = node_cache.resolve(g, rdf_term) if node_cache is not None else get_node(g, rdf_term)
     if existing_node:
         logging.debug('Node exists.')
         return existing_node
 
     logging.debug('Adding a new node to the graph.')
 
-    if isinstance(rdf_term, rdflib.BNode):
-        label = str(rdf_term)
-    else:
-        label = rdf_graph.qname(rdf_term) if rdf_graph.qname(rdf_term) else str(rdf_term)
-    iri = str(rdf_term)
-    return g.addV(label).property('iri', iri).next()
+    label = node_label(rdf_term, rdf_graph)
+    node = g.addV(label).property('iri', iri).next()
+    invalidate_vertex_caches(rdf_term, label)
+    if node_cache is not None:
+        node_cache.put(iri, node.id)
+    return node
+
+
+def _resolve_node(g, node, node_cache):
+    """
+        accept a node given as an rdf term and resolve it through the node cache
+    """
+    if node_cache is not None and isinstance(node, (rdflib.URIRef, rdflib.BNode)):
+        return node_cache.resolve(g, node)
+    return node
 
 
-def add_property(g, node, property_term, value_term, rdf_graph):
+def add_property(g, node, property_term, value_term, rdf_graph, node_cache=None, literal_mapper=None):
     """
         Add or overwrite the property of a graph node
     :param g: gremlin graph
-    :param node: gremlin node
+    :param node: gremlin node, or the rdf term identifying it when a node_cache is provided
     :param property_term: property label rdf term
     :param value_term: the value rdf term
-    :param rdf_graph: the RDF graph
+    :param rdf_graph: the RDF graph, or the LabelResolver computing its labels
+    :param node_cache: the NodeCache used to resolve the node
+    :param literal_mapper: the LiteralMapper mapping a literal value to the property key and value, with its
+        cardinality; the string of the value with the default cardinality if None
     :return: the enriched node
     """
     logging.debug('Adding a new property to the graph.')
+    node = _resolve_node(g, node, node_cache)
     # pg = g if g else setup_graph()
-    if isinstance(property_term, rdflib.URIRef) and rdf_graph:
-        property_label = rdf_graph.qname(property_term) if rdf_graph.qname(property_term) else str(
-            property_term)
+    property_label = predicate_label(property_term, rdf_graph)
+    if isinstance(value_term, rdflib.Literal):
+        property_label, property_value = literal_property(property_label, value_term, literal_mapper)
     else:
-        property_label = str(property_term)
-    property_value = str(value_term)
+        property_value = str(value_term)
+    cardinality = property_cardinality(literal_mapper)
 
+    if cardinality is not None:
+        return g.V(node).property(cardinality, property_label, property_value).next()
     return g.V(node).property(property_label, property_value).next()
 
 
-def link_nodes(g, source_node, target_node, property_term, rdf_graph):
+def link_nodes(g, source_node, target_node, property_term, rdf_graph, node_cache=None, upsert=COALESCE):
     """
-        establish a new link/edge between two existent nodes
+        establish a new link/edge between two existent nodes, unless they are linked already
     :param g: gremlin graph
-    :param source_node: from gremlin node
-    :param target_node: to gremlin node
+    :param source_node: from gremlin node, or the rdf term identifying it when a node_cache is provided
+    :param target_node: to gremlin node, or the rdf term identifying it when a node_cache is provided
     :param property_term: edge label rdf term
-    :param rdf_graph: the RDF graph
+    :param rdf_graph: the RDF graph, or the LabelResolver computing its labels
+    :param node_cache: the NodeCache used to resolve the nodes
+    :param upsert: "coalesce" or "merge" to add the edge only if there is none with the same label between the
+        nodes, None to add it anyway
     :return: the newly created edge
     """
+    source_node = _resolve_node(g, source_node, node_cache)
+    target_node = _resolve_node(g, target_node, node_cache)
     # pg = g if g else setup_graph()
-    if isinstance(property_term, rdflib.URIRef) and rdf_graph:
-        property_label = rdf_graph.qname(property_term) if rdf_graph.qname(property_term) else str(
-            property_term)
-    else:
-        property_label = str(property_term)
+    property_label = predicate_label(property_term, rdf_graph)
 
     logging.debug('Adding the link "%s" from %s to %s.' % (str(property_label), str(source_node), str(target_node)))
 
+    if upsert is not None:
+        return upsert_link_traversal(g, _node_id(source_node), property_label, _node_id(target_node),
+                                     upsert).iterate()
     return g.V(Bindings.of('id', source_node)).addE(property_label).to(target_node).iterate()
+
+
+def _node_id(node):
+    return node.id if isinstance(node, Vertex) else node
@@ -0,0 +1,42 @@
+"""
+test_access
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdf2g
+
+UNREACHABLE_CONNECTION_STRING = "ws://localhost:1/gremlin"
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_connect_gives_up(self):
+        manager = rdf2g.ConnectionManager(UNREACHABLE_CONNECTION_STRING, max_retries=1, retry_delay=0)
+        with self.assertRaises(ConnectionError):
+            manager.connect()
+        assert not manager.is_healthy(), "An unreachable server should not be healthy"
+
+    def test_delegation(self):
+        manager = rdf2g.ConnectionManager(UNREACHABLE_CONNECTION_STRING)
+        manager.connect(check=False)
+        try:
+            traversal = manager.V().has("iri", "http://example.com/a")
+            assert traversal.bytecode.step_instructions[0][0] == "V", "The traversal is not delegated"
+            assert manager.remote_connection is not None, "The managed graph is not remote"
+        finally:
+            manager.close()
+        assert manager._g is None, "The connection is not released"
+
+    def test_context_manager(self):
+        with rdf2g.ConnectionManager(rdf2g.DEFAULT_LOCAL_CONNECTION_STRING, pool_size=2) as g:
+            assert g.is_healthy(), "The server is not healthy"
+            assert g.V().limit(1).count().next() in (0, 1), "Unexpected answer"
+        assert not g.is_healthy(), "The connection is not closed"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+test_aio
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+import unittest
+
+import rdflib
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.graph_traversal import __
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+
+class DelayedConnection(rdf2g.EmbeddedConnection):
+    """
+        Embedded connection answering every traversal after a short delay, as a server would, and recording the
+        largest number of traversals in flight
+    """
+
+    def __init__(self, delay=0.01):
+        rdf2g.EmbeddedConnection.__init__(self)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._flight_lock = threading.Lock()
+
+    def submit(self, bytecode):
+        with self._flight_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return rdf2g.EmbeddedConnection.submit(self, bytecode)
+        finally:
+            with self._flight_lock:
+                self.in_flight -= 1
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+        self.connection = DelayedConnection()
+        self.g = traversal().withRemote(self.connection)
+        self.graph = self.connection.graph
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_load_rdf2g(self):
+        report = asyncio.run(rdf2g.aio.load_rdf2g(self.g, self.rdf_graph, batch_size=10, concurrency=4,
+                                                  on_missing_index=None))
+        nodes = set(rdf2g.distinct_nodes(self.rdf_graph))
+        literals = [o for o in self.rdf_graph.objects() if isinstance(o, rdflib.Literal)]
+        assert report["triples"] == len(self.rdf_graph), "Not all the triples are loaded"
+        assert report["vertices"] == len(nodes) == self.graph.vertex_count, "Unexpected number of vertices"
+        properties = self.g.V().properties().not_(__.hasKey("iri")).toList()
+        assert report["properties"] == len(literals) == len(properties), "Unexpected properties"
+        assert report["edges"] == len(self.rdf_graph) - len(literals) == self.graph.edge_count, "Unexpected edges"
+        assert 1 < self.connection.max_in_flight <= 4, "Expecting up to 4 batches in flight, got %s" % \
+                                                       self.connection.max_in_flight
+
+    def test_submit(self):
+        asyncio.run(rdf2g.aio.load_rdf2g(self.g, self.rdf_graph, on_missing_index=None))
+        iri = str(next(rdf2g.distinct_nodes(self.rdf_graph)))
+        node_id = self.graph.iri_vertex_ids(iri)[0]
+        results = asyncio.run(rdf2g.aio.submit(rdf2g.lookup_nodes_traversal(self.g, [iri, "http://missing"])))
+        assert results == [{"iri": iri, "id": node_id}], "Unexpected lookup %s" % results
+
+    def test_failure_cancels_batches(self):
+        cancelled = []
+
+        async def batch(delay, error=None):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            if error is not None:
+                raise error
+
+        async def load():
+            coroutines = itertools.chain([batch(0, ValueError())], (batch(0.5) for _ in range(3)))
+            with self.assertRaises(ValueError):
+                await rdf2g.aio._pipeline(coroutines, 4)
+            assert cancelled == [0.5] * 3, "The running batches should be cancelled before the error is raised"
+
+        asyncio.run(load())
+
+    def test_get_node_and_edges(self):
+        asyncio.run(rdf2g.aio.load_rdf2g(self.g, self.rdf_graph, on_missing_index=None))
+        source, target = next((s, o) for s, p, o in sorted(self.rdf_graph) if isinstance(o, rdflib.URIRef))
+        node = asyncio.run(rdf2g.aio.get_node(self.g, source))
+        assert node == rdf2g.get_node(self.g, source) == asyncio.run(rdf2g.aio.get_node(self.g, node.id)), \
+            "Unexpected node"
+        assert asyncio.run(rdf2g.aio.get_node(self.g, "http://missing")) == [], "Expecting no node"
+        assert asyncio.run(rdf2g.aio.get_edges(self.g, source, target)) == rdf2g.get_edges(self.g, source, target), \
+            "Unexpected edges"
+
+
+if __name__ == '__main__':
+    unittest.main()
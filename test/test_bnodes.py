@@ -0,0 +1,84 @@
+"""
+test_bnodes
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+
+import rdf2g
+from test import STREAM_WITH_BNODES
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(STREAM_WITH_BNODES), format="n3")
+        self.rdf_graph.bind("schema", rdflib.Namespace("http://schema.org/"), replace=True)
+        self.bnodes = {term for term in rdf2g.distinct_nodes(self.rdf_graph) if isinstance(term, rdflib.BNode)}
+        self.g = rdf2g.embedded_graph()
+
+    def labels(self):
+        return set(self.g.V().label().toList())
+
+    def test_fixed(self):
+        rdf2g.load_rdf2g_bulk(self.g, self.rdf_graph, bnode_strategy=rdf2g.FIXED)
+        default = rdf2g.embedded_graph()
+        rdf2g.load_rdf2g_bulk(default, self.rdf_graph)
+        assert rdf2g.BNODE_LABEL in self.labels(), "Expecting the fixed blank node label"
+        assert len(self.labels()) == len(set(default.V().label().toList())) - len(self.bnodes) + 1, \
+            "The blank nodes should share a single label"
+        assert len(self.g.V().toList()) == len(default.V().toList()), "Expecting a vertex per blank node"
+
+    def test_skolem(self):
+        report = rdf2g.load_rdf2g_bulk(self.g, self.rdf_graph, bnode_strategy=rdf2g.SKOLEM)
+        reloaded = rdflib.Graph()
+        reloaded.parse(str(STREAM_WITH_BNODES), format="n3")
+        again = rdf2g.load_rdf2g_bulk(self.g, reloaded, bnode_strategy=rdf2g.SKOLEM)
+        assert report["vertices"] > 0 and again["vertices"] == 0, "The reload should find the skolemized nodes"
+        iris = self.g.V().hasLabel(rdf2g.BNODE_LABEL).values("iri").toList()
+        assert iris and all(iri.startswith(rdf2g.BNODE_IRI_PREFIX) for iri in iris), "Unexpected iris %s" % iris
+        assert len(iris) <= len(self.bnodes), "Expecting at most a vertex per blank node"
+
+    def test_inline(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph, bnode_strategy=rdf2g.INLINE)
+        subject = rdflib.URIRef("http://sample.igsn.org/soilarchive/bqs2dj2u6s73o70jcpr0")
+        properties = rdf2g.get_node_properties(self.g, rdf2g.get_node(self.g, subject).id)
+        assert properties.get("schema:spatialCoverage/schema:geo/schema:latitude") == "23", \
+            "The nested property bag is not inlined: %s" % properties
+        assert properties.get("schema:spatialCoverage/rdf:type") == "http://schema.org/Place", \
+            "The type of the property bag should be a string value"
+        assert len(self.g.V().toList()) < len(set(rdf2g.distinct_nodes(self.rdf_graph))), \
+            "The property bags should not be vertices"
+
+    def test_digest(self):
+        bnode = next(iter(self.bnodes))
+        copy = rdflib.Graph()
+        copy.parse(str(STREAM_WITH_BNODES), format="n3")
+        digests = {rdf2g.bnode_digest(copy, other) for other in copy.all_nodes() if isinstance(other, rdflib.BNode)}
+        assert rdf2g.bnode_digest(self.rdf_graph, bnode) in digests, "The digest should not depend on the parse"
+        with self.assertRaises(ValueError):
+            rdf2g.map_bnodes(self.rdf_graph, "label")
+
+    def test_digest_cycle(self):
+        ex = rdflib.Namespace("http://example.com/")
+        rdf_graph = rdflib.Graph()
+        a, b, c = rdflib.BNode(), rdflib.BNode(), rdflib.BNode()
+        rdf_graph.add((a, ex.next, b))
+        rdf_graph.add((b, ex.next, a))
+        rdf_graph.add((a, ex.value, rdflib.Literal("1")))
+        rdf_graph.add((b, ex.value, rdflib.Literal("2")))
+        rdf_graph.add((c, ex.cycle, a))
+        forward = [rdf2g.bnode_digest(rdf_graph, node) for node in (a, b, c)]
+        digests = {}
+        backward = [rdf2g.bnode_digest(rdf_graph, node, digests) for node in (c, b, a)][::-1]
+        assert forward == backward, "The digests should not depend on where the cycle is entered"
+        assert len(set(forward)) == 3, "The blank nodes of the cycle should have different digests"
+        assert set(digests) == {a, b, c}, "Expecting the digests of all the reachable blank nodes"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+test_bulk
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+from gremlin_python.driver.protocol import GremlinServerError
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.graph_traversal import __
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+
+    def test_batches(self):
+        batches = list(rdf2g.batches(range(7), 3))
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]], "Unexpected batches %s" % batches
+        assert list(rdf2g.batches([], 3)) == [], "Expecting no batch"
+
+    def test_distinct_nodes(self):
+        nodes = list(rdf2g.distinct_nodes(self.rdf_graph))
+        expected = set(self.rdf_graph.subjects()) | {o for o in self.rdf_graph.objects()
+                                                     if not isinstance(o, rdflib.Literal)}
+        assert len(nodes) == len(set(nodes)), "Repeated nodes"
+        assert set(nodes) == expected, "Unexpected nodes"
+
+    def test_retry_on_conflict(self):
+        attempts = []
+
+        def task(report):
+            attempts.append(report)
+            report["edges"] += 1
+            if len(attempts) < 3:
+                raise GremlinServerError({"code": 500, "message": "ConcurrentModificationException", "attributes": {}})
+
+        report = rdf2g.retry_on_conflict(task, max_retries=3, retry_delay=0)
+        assert len(attempts) == 3, "Expecting two retries"
+        assert report["edges"] == 1, "The report of the failed attempts should be discarded"
+
+    def test_retry_gives_up(self):
+        def task(report):
+            raise GremlinServerError({"code": 500, "message": "ConcurrentModificationException", "attributes": {}})
+
+        with self.assertRaises(GremlinServerError):
+            rdf2g.retry_on_conflict(task, max_retries=2, retry_delay=0)
+
+    def test_no_retry_on_other_errors(self):
+        attempts = []
+
+        def task(report):
+            attempts.append(report)
+            raise GremlinServerError({"code": 597, "message": "Script evaluation error", "attributes": {}})
+
+        with self.assertRaises(GremlinServerError):
+            rdf2g.retry_on_conflict(task, max_retries=2, retry_delay=0)
+        assert len(attempts) == 1, "Only the concurrent modifications should be retried"
+
+    def test_parallel_retries_the_traversal(self):
+        class ConflictingConnection(rdf2g.EmbeddedConnection):
+            """
+                rejects the link traversal of the write pass once, after the properties of the batch are written
+            """
+            def submit(self, bytecode):
+                if self.round_trips == 3:
+                    self.round_trips += 1
+                    raise GremlinServerError({"code": 500, "message": "ConcurrentModificationException",
+                                              "attributes": {}})
+                return rdf2g.EmbeddedConnection.submit(self, bytecode)
+
+        connection = ConflictingConnection()
+        g = traversal().withRemote(connection)
+        report = rdf2g.load_rdf2g_parallel(g, self.rdf_graph, workers=1, batch_size=len(self.rdf_graph),
+                                           retry_delay=0, on_missing_index=None)
+        literals = [o for o in self.rdf_graph.objects() if isinstance(o, rdflib.Literal)]
+        assert connection.round_trips == 5, "Expecting only the rejected traversal to be submitted again"
+        assert report["properties"] == len(g.V().properties().not_(__.hasKey("iri")).toList()) == len(literals), \
+            "The properties should not be written twice"
+        assert report["edges"] == connection.graph.edge_count, "Unexpected report %s" % report
+
+    def test_idempotent_load(self):
+        for upsert in (rdf2g.COALESCE, rdf2g.MERGE):
+            g = rdf2g.embedded_graph()
+            graph = g.remote_connection.graph
+            rdf2g.load_rdf2g_bulk(g, self.rdf_graph, upsert=upsert)
+            vertices, edges = graph.vertex_count, graph.edge_count
+            rdf2g.load_rdf2g(g, self.rdf_graph, upsert=upsert)
+            rdf2g.load_rdf2g_bulk(g, self.rdf_graph, upsert=upsert, node_cache=rdf2g.NodeCache())
+            assert (graph.vertex_count, graph.edge_count) == (vertices, edges), \
+                "A reload with %s should create nothing" % upsert
+        rdf2g.load_rdf2g_bulk(g, self.rdf_graph, upsert=None)
+        assert graph.edge_count == 2 * edges, "Expecting duplicate edges without upsert"
+
+    def test_upsert_nodes(self):
+        g = rdf2g.embedded_graph()
+        terms = list(rdf2g.distinct_nodes(self.rdf_graph))
+        for upsert in (rdf2g.COALESCE, rdf2g.MERGE, rdf2g.COALESCE):
+            # the vertices created meanwhile by another loader are found instead of being duplicated
+            results = rdf2g.create_nodes_traversal(g, terms, self.rdf_graph, upsert).toList()
+            assert len(results) == len(terms), "Expecting one vertex per node"
+        assert g.remote_connection.graph.vertex_count == len(terms), "No vertex should be duplicated"
+        node = rdf2g.create_node(g, terms[0], self.rdf_graph)
+        assert node.id in [result["id"] for result in results], "Expecting the existing node"
+        steps = rdf2g.upsert_node_traversal(g, terms[0], self.rdf_graph, rdf2g.MERGE).bytecode.step_instructions
+        assert [step[0] for step in steps][-2:] == ["mergeV", "option"], "Unexpected steps %s" % steps
+
+    def test_report_counts_created(self):
+        g = rdf2g.embedded_graph()
+        graph = g.remote_connection.graph
+        report = rdf2g.load_rdf2g_bulk(g, self.rdf_graph, batch_size=20)
+        assert (report["vertices"], report["edges"]) == (graph.vertex_count, graph.edge_count), \
+            "Unexpected report %s" % report
+        for upsert in (rdf2g.COALESCE, rdf2g.MERGE):
+            again = rdf2g.load_rdf2g_bulk(g, self.rdf_graph, batch_size=20, upsert=upsert)
+            assert again["vertices"] == again["edges"] == 0, "Nothing is created by a reload: %s" % again
+            assert again["properties"] == report["properties"], "The properties are written again"
+
+    def test_existing_link_not_created(self):
+        g = rdf2g.embedded_graph()
+        ids = [g.addV("x").property("iri", "http://example.com/%s" % i).next().id for i in range(2)]
+        for upsert in (rdf2g.COALESCE, rdf2g.MERGE):
+            report = rdf2g.new_report()
+            assert rdf2g.add_links(g, [(ids[0], "p-%s" % upsert, ids[1])], report, upsert) == 1, "Expecting a link"
+            assert rdf2g.add_links(g, [(ids[0], "p-%s" % upsert, ids[1])], report, upsert) == 0, \
+                "The existing edge should not be counted as created"
+            assert report["edges"] == 1, "Unexpected report %s" % report
+        assert len(g.E().toList()) == 2, "No edge should be duplicated"
+        # as on a server, the labels set inside a coalesce step are not visible after it
+        assert g.V(ids[0]).coalesce(__.as_("inner")).select("inner").toList() == [], "The label should be dropped"
+
+    def test_missing_vertex_in_batch(self):
+        g = rdf2g.embedded_graph()
+        ids = [g.addV("x").property("iri", "http://example.com/%s" % i).next().id for i in range(3)]
+        g.V(ids[1]).drop().iterate()
+        report = rdf2g.new_report()
+        for upsert in (None, rdf2g.COALESCE, rdf2g.MERGE):
+            created = rdf2g.add_links(g, [(ids[0], "p", ids[1]), (ids[0], "q", ids[2]), (ids[2], "q", ids[0])],
+                                      report, upsert)
+            assert created == (2 if upsert is None else 0), "Only the links between existing vertices are written"
+        assert report["edges"] == 2 and len(g.E().toList()) == 2, "Unexpected edges %s" % report
+        written = rdf2g.add_properties(g, [(ids[1], "k", "a"), (ids[2], "k", "b")], report)
+        assert written == report["properties"] == 1, "The property of the existing vertex should be written"
+        assert g.V(ids[2]).values("k").toList() == ["b"], "The property is not written"
+
+    def test_parallel_closes_worker_graphs(self):
+        g = rdf2g.embedded_graph()
+        graph = g.remote_connection.graph
+        worker_graphs = []
+
+        def graph_factory():
+            worker_graphs.append(rdf2g.embedded_graph(graph))
+            return worker_graphs[-1]
+
+        report = rdf2g.load_rdf2g_parallel(g, self.rdf_graph, workers=3, batch_size=10, graph_factory=graph_factory)
+        assert report["edges"] == graph.edge_count, "Unexpected report %s" % report
+        assert 0 < len(worker_graphs) <= 3, "Expecting a graph per worker"
+        assert all(worker_g.remote_connection.is_closed() for worker_g in worker_graphs), \
+            "The graphs of the workers should be closed"
+        assert not g.remote_connection.is_closed(), "The graph of the caller should be left open"
+
+    def test_merge_reports(self):
+        report = rdf2g.merge_reports(rdf2g.new_report(), {"edges": 2, "round_trips": 1}, {"edges": 3})
+        assert report["edges"] == 5 and report["round_trips"] == 1, "Unexpected report %s" % report
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+test_cache
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+from rdflib.namespace import SKOS
+
+import rdf2g
+from rdf2g.cache import NodeCache, VertexCache
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_put_get(self):
+        cache = NodeCache()
+        iri = rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Concept")
+        assert cache.get(iri) is None, "Unexpected cache hit"
+        cache.put(iri, 880)
+        assert cache.get(iri) == 880, "The node id is not cached"
+        assert cache.get(str(iri)) == 880, "IRIs and their strings should share the cache entry"
+        assert iri in cache, "The node is not cached"
+        assert cache.hits == 2 and cache.misses == 1, "Unexpected cache statistics"
+
+    def test_lru_eviction(self):
+        cache = NodeCache(maxsize=2)
+        cache.put("http://example.com/a", 1)
+        cache.put("http://example.com/b", 2)
+        cache.get("http://example.com/a")
+        cache.put("http://example.com/c", 3)
+        assert len(cache) == 2, "The cache exceeds its maxsize"
+        assert "http://example.com/b" not in cache, "The least recently used entry is not evicted"
+        assert "http://example.com/a" in cache and "http://example.com/c" in cache, "Wrong entry evicted"
+
+    def test_invalidate(self):
+        cache = NodeCache()
+        cache.put("http://example.com/a", 1)
+        cache.put("http://example.com/b", 2)
+        cache.invalidate("http://example.com/a")
+        assert "http://example.com/a" not in cache, "The entry is not invalidated"
+        cache.invalidate()
+        assert len(cache) == 0, "The cache is not cleared"
+
+    def test_vertex_cache(self):
+        g = rdf2g.embedded_graph()
+        rdf_graph = rdflib.Graph()
+        rdf_graph.bind("skos", SKOS)
+        node = rdf2g.create_node(g, SKOS.Concept, rdf_graph)
+        now = [0]
+        cache = VertexCache(maxsize=2, ttl=10, timer=lambda: now[0])
+        round_trips = g.remote_connection.round_trips
+        assert cache.get_node(g, SKOS.Concept) == node, "The node is not resolved by iri"
+        assert cache.get_node(g, "skos:Concept") == node, "The node is not resolved by label"
+        assert cache.get_node(g, SKOS.Concept) == node and cache.get_node(g, "skos:Concept") == node, \
+            "The cached node differs"
+        assert g.remote_connection.round_trips == round_trips + 2, "Expecting a single round-trip per lookup"
+        assert cache.hits == 2 and cache.misses == 2, "Unexpected cache statistics"
+
+        now[0] = 11
+        cache.get_node(g, SKOS.Concept)
+        assert cache.misses == 3, "The expired entry is still used"
+        assert cache.get_node(g, SKOS.member) == [] and len(cache) == 2, "The missing nodes should not be cached"
+
+    def test_vertex_cache_invalidation(self):
+        g = rdf2g.embedded_graph()
+        rdf_graph = rdflib.Graph()
+        rdf_graph.bind("skos", SKOS)
+        rdf2g.create_node(g, SKOS.Concept, rdf_graph)
+        cache = VertexCache()
+        cache.get_node(g, SKOS.Concept)
+        cache.get_node(g, "skos:Concept")
+        cache.invalidate(SKOS.Concept)
+        assert len(cache) == 0, "The label entry of the vertex should be forgotten with its iri"
+
+        cache.get_node(g, SKOS.Concept)
+        for upsert in (rdf2g.COALESCE, rdf2g.MERGE):
+            node = rdf2g.create_node(g, SKOS.Concept, rdf_graph, upsert=upsert)
+            assert node.label == "skos:Concept" and len(cache) == 1, "Finding the node should not invalidate it"
+        node_cache = NodeCache()
+        node_cache.put(str(SKOS.Concept), node.id)
+        assert rdf2g.create_node(g, SKOS.Concept, rdf_graph, node_cache) == node and \
+            rdf2g.create_node(g, SKOS.Concept, rdf_graph, node_cache).label == node.label, "Unexpected cached node"
+
+        cache.get_node(g, SKOS.Concept)
+        rdf2g.clear_graph(g)
+        assert len(cache) == 0, "clear_graph should invalidate the vertex caches"
+        assert cache.get_node(g, SKOS.Concept) == [], "The removed node is still cached"
+
+
+if __name__ == '__main__':
+    unittest.main()
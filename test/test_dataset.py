@@ -0,0 +1,69 @@
+"""
+test_dataset
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+from rdflib.namespace import SKOS
+
+import rdf2g
+
+EX = rdflib.Namespace("http://example.com/")
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = rdflib.Dataset()
+        self.dataset.bind("ex", EX)
+        self.dataset.bind("skos", SKOS)
+        first = self.dataset.graph(EX.first)
+        first.add((EX.a, SKOS.broader, EX.b))
+        first.add((EX.a, SKOS.prefLabel, rdflib.Literal("Alpha")))
+        second = self.dataset.graph(EX.second)
+        second.add((EX.a, SKOS.related, EX.c))
+        second.add((EX.c, SKOS.prefLabel, rdflib.Literal("Gamma")))
+        self.g = rdf2g.embedded_graph()
+
+    def test_load_dataset(self):
+        report = rdf2g.load_dataset(self.g, self.dataset, workers=2)
+        assert sorted(report["graphs"]) == [str(EX.first), str(EX.second)], "Unexpected graphs %s" % report
+        assert report["triples"] == 4 and report["vertices"] == 4, "Expecting a vertex of ex:a in each graph"
+        assert rdf2g.dataset_graph_names(self.g) == [str(EX.first), str(EX.second)], "Unexpected graph names"
+        assert sorted(self.g.E().values("graph").toList()) == [str(EX.first), str(EX.second)], \
+            "The edges should be tagged with their graph"
+
+        second = rdf2g.graph_source(self.g, EX.second)
+        node = rdf2g.get_node(second, EX.a)
+        assert self.g.V(node).out().values("iri").toList() == [str(EX.c)], "Expecting the links of the graph only"
+        union = rdf2g.graph_source(self.g, EX.second, read_graphs=[EX.first])
+        assert len(union.V().has("iri", str(EX.a)).toList()) == 2, "Expecting the vertices of both graphs"
+
+    def test_drop_and_reload(self):
+        rdf2g.load_dataset(self.g, self.dataset)
+        rdf2g.drop_graph(self.g, EX.first)
+        assert rdf2g.dataset_graph_names(self.g) == [str(EX.second)], "Only the first graph should be dropped"
+        assert len(self.g.E().toList()) == 1, "The edges of the second graph should be kept"
+        report = rdf2g.load_dataset(self.g, self.dataset, graphs=[str(EX.first)])
+        assert list(report["graphs"]) == [str(EX.first)] and report["vertices"] == 2, "Unexpected report %s" % report
+        assert len(self.g.V().toList()) == 4, "Unexpected number of vertices"
+
+    def test_graph_factory(self):
+        graph = self.g.remote_connection.graph
+        worker_graphs = []
+
+        def graph_factory():
+            worker_graphs.append(rdf2g.embedded_graph(graph))
+            return worker_graphs[-1]
+
+        report = rdf2g.load_dataset(self.g, self.dataset, workers=2, graph_factory=graph_factory)
+        assert report["edges"] == graph.edge_count == 2, "Unexpected number of edges"
+        assert all(worker_g.remote_connection.is_closed() for worker_g in worker_graphs), \
+            "The worker graphs should be closed"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+test_embedded
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import Cardinality, TextP
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+        self.g = rdf2g.embedded_graph()
+        self.graph = self.g.remote_connection.graph
+
+    def test_load_and_retrieve(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        nodes = set(rdf2g.distinct_nodes(self.rdf_graph))
+        assert self.graph.vertex_count == len(nodes), "Unexpected number of vertices"
+        assert self.graph.edge_count == len(self.g.E().toList()), "Unexpected number of edges"
+        assert len(self.graph.iri_index) == len(nodes), "Every node should be indexed by its iri"
+
+        node = rdf2g.get_node(self.g, "lamd:res_h9ci2wPXrcUXBh9JkkHzUY")
+        assert node, "The node is not found by label"
+        iri = rdflib.URIRef("http://publications.europa.eu/resources/authority/lam/res_h9ci2wPXrcUXBh9JkkHzUY")
+        assert rdf2g.get_node(self.g, iri) == node, "The node is not found by iri"
+        tree = rdf2g.generate_traversal_tree(self.g, node, max_depth=2)
+        assert len(rdf2g.expand_tree(self.g, tree)[0]["skos:member"]) > 2, "Expecting multiple members"
+
+    def test_bulk_load_matches(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        bulk = rdf2g.embedded_graph()
+        report = rdf2g.load_rdf2g_bulk(bulk, self.rdf_graph, batch_size=50)
+        assert report["vertices"] == self.graph.vertex_count, "Unexpected number of vertices"
+        assert report["edges"] == self.graph.edge_count, "Unexpected number of edges"
+        assert bulk.remote_connection.round_trips < self.g.remote_connection.round_trips, \
+            "The bulk load should need fewer round-trips"
+
+    def test_remove(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        node = rdf2g.get_node(self.g, "lamd:res_h9ci2wPXrcUXBh9JkkHzUY")
+        edges = len(self.g.V(node).bothE().toList())
+        vertices, total_edges = self.graph.vertex_count, self.graph.edge_count
+        self.g.V(node).drop().iterate()
+        assert self.graph.vertex_count == vertices - 1, "The vertex is not removed"
+        assert self.graph.edge_count == total_edges - edges, "The edges of the vertex are not removed"
+        assert self.graph.vertex(node.id) is None and not self.g.V(node.id).toList(), "The vertex is still found"
+        iri = "http://publications.europa.eu/resources/authority/lam/res_h9ci2wPXrcUXBh9JkkHzUY"
+        assert iri not in self.graph.iri_index, "The vertex is still indexed"
+        new = self.g.addV("x").property("iri", iri).next()
+        assert new.id != node.id, "The ids should not be reused"
+
+        rdf2g.clear_graph(self.g)
+        assert self.graph.vertex_count == self.graph.edge_count == 0, "The graph is not empty"
+        assert not self.graph.iri_index and not self.g.V().toList(), "The graph is not empty"
+
+    def test_clear_in_batches(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        prefix = "http://publications.europa.eu/resources/authority/celex/"
+        labels = ["celexd:md_DTS", "celexd:md_DTT", "celexd:md_DTA", "celexd:md_DTN", "lamd:DocumentProperty"]
+        selected = self.g.V().hasLabel(*labels).has("iri", TextP.startingWith(prefix))
+        nodes, edges = len(selected.clone().toList()), len(selected.clone().bothE().dedup().toList())
+        vertices, total_edges = self.graph.vertex_count, self.graph.edge_count
+        assert nodes == 4 and edges > 2, "Expecting a partial selection"
+        progress = []
+        rdf2g.clear_graph(self.g, batch_size=1, labels=labels, iri_prefix=prefix, workers=2,
+                          progress=lambda kind, count: progress.append((kind, count)))
+        assert not selected.clone().toList(), "The selected nodes should be dropped"
+        assert self.graph.vertex_count == vertices - nodes and self.graph.edge_count == total_edges - edges, \
+            "Only the selected nodes and their edges should be dropped"
+        kinds = [kind for kind, count in progress]
+        assert kinds == sorted(kinds) and progress[-1] == ("vertices", nodes), "The edges should be dropped first"
+
+        worker_graphs = []
+
+        def graph_factory():
+            worker_graphs.append(rdf2g.embedded_graph(self.graph))
+            return worker_graphs[-1]
+
+        rdf2g.clear_graph(self.g, batch_size=4, workers=3, graph_factory=graph_factory)
+        assert self.graph.vertex_count == self.graph.edge_count == 0, "The graph is not empty"
+        assert 0 < len(worker_graphs) <= 3, "Expecting a graph per worker"
+        assert all(worker_g.remote_connection.is_closed() for worker_g in worker_graphs), \
+            "The worker graphs should be closed"
+
+    def test_cardinality(self):
+        vertex = self.g.addV("x").property("k", "a").property("k", "a").next()
+        assert self.g.V(vertex).values("k").toList() == ["a", "a"], "Expecting the list cardinality by default"
+        self.g.V(vertex).property(Cardinality.set_, "k", "a").property(Cardinality.single, "j", 1). \
+            property(Cardinality.single, "j", 2).iterate()
+        assert self.g.V(vertex).values("j").toList() == [2], "Expecting the single cardinality"
+
+        g = rdf2g.embedded_graph(rdf2g.EmbeddedGraph(default_cardinality=Cardinality.single))
+        vertex = g.addV("x").property("k", "a").property("k", "b").next()
+        assert g.V(vertex).values("k").toList() == ["b"], "Expecting the configured cardinality"
+
+    def test_dedup_in_repeat(self):
+        a, b, c = [self.g.addV("x").property("iri", name).next() for name in "abc"]
+        for source, target in ((a, b), (a, c), (b, c), (c, a)):
+            self.g.V(source).addE("to").to(__.V(target)).iterate()
+        paths = list(rdf2g.iter_traversal_paths(self.g, a, max_depth=3, dedup=True))
+        assert sorted(path[-1] for path in paths) == ["a", "b", "c"], \
+            "Every node should be visited once, got %s" % paths
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+test_export
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import csv
+import json
+import pathlib
+import tempfile
+import unittest
+
+import rdflib
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name)
+        self.literals = len([o for o in self.rdf_graph.objects() if isinstance(o, rdflib.Literal)])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_export_graphson(self):
+        report = rdf2g.export_graphson(self.rdf_graph, self.path / "graph.json", buckets=4)
+        with open(str(self.path / "graph.json"), encoding="utf-8") as f:
+            vertices = [json.loads(line) for line in f]
+        assert len(vertices) == report["vertices"] == len(set(rdf2g.distinct_nodes(self.rdf_graph))), \
+            "Unexpected number of vertices"
+        assert report["properties"] == self.literals, "Unexpected number of properties"
+        assert report["edges"] == len(self.rdf_graph) - self.literals, "Unexpected number of edges"
+
+        concept = rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Concept")
+        vertex = next(v for v in vertices if v["properties"]["iri"][0]["value"] == str(concept))
+        assert vertex["label"] == "skos:Concept", "Unexpected label %s" % vertex["label"]
+        assert vertex["id"]["@value"] == rdf2g.element_id(str(concept)), "The id is not deterministic"
+
+        out_edges = {(edge["id"]["@value"], v["id"]["@value"], edge["inV"]["@value"], label)
+                     for v in vertices for label, edges in v.get("outE", {}).items() for edge in edges}
+        in_edges = {(edge["id"]["@value"], edge["outV"]["@value"], v["id"]["@value"], label)
+                    for v in vertices for label, edges in v.get("inE", {}).items() for edge in edges}
+        assert in_edges == out_edges, "Every edge should be an incoming edge of its target"
+        assert "inE" in vertex and "outE" not in vertex, "The incoming edges of skos:Concept are missing"
+
+        rdf2g.export_graphson(self.rdf_graph, self.path / "again.json", buckets=4)
+        assert (self.path / "graph.json").read_text() == (self.path / "again.json").read_text(), \
+            "The exports differ"
+
+    def test_neptune_csv_escapes_qualified_names(self):
+        rdf_graph = rdflib.Graph()
+        rdf_graph.bind("skos", rdflib.namespace.SKOS)
+        rdf_graph.add((rdflib.URIRef("http://example.com/a"), rdflib.namespace.SKOS.prefLabel, rdflib.Literal("a")))
+        rdf2g.export_neptune_csv(rdf_graph, self.path / "csv")
+        with open(str(self.path / "csv" / rdf2g.NEPTUNE_VERTICES_FILE), encoding="utf-8") as f:
+            header = next(csv.reader(f))
+        assert header == ["~id", "~label", "iri:String", "skos\\:prefLabel:String[]"], "Unexpected header %s" % header
+
+    def test_export_neptune_csv_from_file(self):
+        self.rdf_graph.serialize(str(self.path / "graph.nt"), format="nt")
+        namespaces = {prefix: str(namespace) for prefix, namespace in self.rdf_graph.namespaces()}
+        report = rdf2g.export_neptune_csv(self.path / "graph.nt", self.path / "csv", namespaces=namespaces)
+        with open(str(self.path / "csv" / rdf2g.NEPTUNE_VERTICES_FILE), encoding="utf-8") as f:
+            vertices = list(csv.reader(f))
+        with open(str(self.path / "csv" / rdf2g.NEPTUNE_EDGES_FILE), encoding="utf-8") as f:
+            edges = list(csv.reader(f))
+        assert vertices[0][:3] == ["~id", "~label", "iri:String"], "Unexpected header %s" % vertices[0]
+        assert "skos\\:prefLabel:String[]" in vertices[0], "The property columns are missing"
+        assert len(vertices) - 1 == report["vertices"] == len(set(rdf2g.distinct_nodes(self.rdf_graph))), \
+            "Unexpected number of vertices"
+        assert len(edges) - 1 == report["edges"] == len(self.rdf_graph) - self.literals, "Unexpected edges"
+        assert len({row[0] for row in vertices[1:]}) == report["vertices"], "Repeated vertices"
+
+
+if __name__ == '__main__':
+    unittest.main()
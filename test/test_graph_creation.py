@@ -47,11 +47,73 @@ class MyTestCase(unittest.TestCase):
         assert len(self.g.V().toList()) > 0, "Nodes have not been created "
         assert len(self.g.E().toList()) > 0, "Edges have not been created "
 
+    def test_load_rdf_bulk(self):
+        rdf2g.clear_graph(self.g)
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        expected_nodes = len(self.g.V().toList())
+        expected_edges = len(self.g.E().toList())
+
+        rdf2g.clear_graph(self.g)
+        report = rdf2g.load_rdf2g_bulk(self.g, self.rdf_graph, batch_size=100)
+        assert report["triples"] == len(self.rdf_graph), "Not all the triples have been loaded"
+        assert report["vertices"] == expected_nodes, "Unexpected number of created nodes"
+        assert len(self.g.V().toList()) == expected_nodes, "Unexpected number of nodes"
+        assert len(self.g.E().toList()) == expected_edges, "Unexpected number of edges"
+
+    def test_load_rdf_parallel(self):
+        rdf2g.clear_graph(self.g)
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        expected_nodes = len(self.g.V().toList())
+        expected_edges = len(self.g.E().toList())
+
+        rdf2g.clear_graph(self.g)
+        report = rdf2g.load_rdf2g_parallel(self.g, self.rdf_graph, workers=4, batch_size=50)
+        assert report["triples"] == len(self.rdf_graph), "Not all the triples have been loaded"
+        assert len(self.g.V().toList()) == expected_nodes, "Unexpected number of nodes"
+        assert len(self.g.E().toList()) == expected_edges, "Unexpected number of edges"
+
+    def test_sync(self):
+        rdf2g.clear_graph(self.g)
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        known_iri = rdflib.URIRef("http://publications.europa.eu/resources/authority/celex/md_OJ_ID")
+        skos_note = rdflib.URIRef("http://www.w3.org/2004/02/skos/core#note")
+
+        new_graph = rdflib.Graph()
+        for prefix, namespace in self.rdf_graph.namespaces():
+            new_graph.bind(prefix, namespace, replace=True)
+        for triple in self.rdf_graph:
+            new_graph.add(triple)
+        new_graph.remove((known_iri, None, None))
+        new_graph.add((known_iri, skos_note, rdflib.Literal("a new note")))
+
+        known_vertex = self.g.V().has("iri", str(known_iri))
+        statements = len(known_vertex.clone().outE().toList()) + \
+            len(known_vertex.clone().properties().not_(rdf2g.__.hasKey("iri")).toList())
+        report = rdf2g.sync_rdf2g(self.g, new_graph, previous_graph=self.rdf_graph)
+        assert report["properties_added"] == 1, "Expecting the new note"
+        assert report["edges_removed"] + report["properties_removed"] == statements, \
+            "Expecting the removed statements"
+        props = rdf2g.get_node_properties(self.g, rdf2g.get_node(self.g, known_iri))
+        assert props["skos:note"] == "a new note", "The new note is not synchronised"
+        assert len(self.g.V().has("iri", str(known_iri)).outE().toList()) == 0, "The old edges are not removed"
+
     def test_clear(self):
         rdf2g.clear_graph(self.g)
         assert len(self.g.V().toList()) == 0, "The graph is not empty"
         # rdf2g.load_rdf2g(self.g, self.rdf_graph)
 
+    def test_clear_in_batches(self):
+        rdf2g.load_rdf2g(self.g, self.rdf_graph)
+        concepts = len(self.g.V().hasLabel("skos:Concept").toList())
+        nodes = len(self.g.V().toList())
+        rdf2g.clear_graph(self.g, batch_size=10, labels="skos:Concept")
+        assert len(self.g.V().toList()) == nodes - concepts, "Only the concept nodes should be dropped"
+
+        progress = []
+        rdf2g.clear_graph(self.g, batch_size=10, workers=2, progress=lambda kind, count: progress.append(kind))
+        assert len(self.g.V().toList()) == 0, "The graph is not empty"
+        assert "vertices" in progress, "The progress is not reported"
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+"""
+test_index
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import logging
+import unittest
+from concurrent.futures import Future
+
+import rdf2g
+
+
+class TinkerGraphStandIn(object):
+    """
+        Stand-in for the script client of a Gremlin server hosting a TinkerGraph
+    """
+
+    def __init__(self):
+        self.indexed_keys = set()
+        self.scripts = []
+
+    def submit(self, script, bindings=None):
+        self.scripts.append(script)
+        if script == "graph.getClass().getSimpleName()":
+            return self._result(["TinkerGraph"])
+        if script == "graph.getIndexedKeys(Vertex.class)":
+            return self._result(list(self.indexed_keys))
+        if script.startswith("graph.createIndex(indexKey, Vertex.class)"):
+            self.indexed_keys.add(bindings["indexKey"])
+            return self._result([bindings["indexKey"]])
+        raise AssertionError("Unexpected script %s" % script)
+
+    @staticmethod
+    def _result(results):
+        future = Future()
+        future.set_result(results)
+        return type("ResultSet", (object,), {"all": lambda self: future})()
+
+
+class StandInConnection(object):
+    def __init__(self, client):
+        self._client = client
+
+
+class StandInGraph(object):
+    def __init__(self, client):
+        self.remote_connection = StandInConnection(client)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = TinkerGraphStandIn()
+        self.g = StandInGraph(self.server)
+
+    def test_detect_backend(self):
+        assert rdf2g.detect_backend(self.g) == rdf2g.TINKERGRAPH, "Expecting a TinkerGraph"
+
+    def test_ensure_indexes(self):
+        created = rdf2g.ensure_indexes(self.g, keys=["skos:prefLabel"])
+        assert created == ["iri", "skos:prefLabel"], "Unexpected indexes %s" % created
+        assert self.server.indexed_keys == {"iri", "skos:prefLabel"}, "The indexes are not created"
+        assert rdf2g.ensure_indexes(self.g, keys=["skos:prefLabel"]) == [], "The indexes should be created once"
+
+    def test_check_iri_index(self):
+        with self.assertLogs(level=logging.WARNING):
+            assert rdf2g.check_iri_index(self.g) is False, "The index should be missing"
+        with self.assertRaises(ValueError):
+            rdf2g.check_iri_index(self.g, on_missing=rdf2g.RAISE)
+        assert rdf2g.check_iri_index(self.g, on_missing=None) is None, "The check should be skipped"
+
+        rdf2g.ensure_indexes(self.g)
+        assert rdf2g.check_iri_index(self.g, on_missing=rdf2g.RAISE) is True, "The index should exist"
+
+    def test_check_skipped_without_scripts(self):
+        assert rdf2g.check_iri_index(object(), on_missing=rdf2g.RAISE) is None, "The check should be skipped"
+
+    def test_janusgraph_scripts(self):
+        script = rdf2g.JanusGraphIndexAdapter.create_index_script("graph")
+        assert "buildCompositeIndex()" in script and "unique()" in script, "Expecting a unique composite index"
+        assert "action.REINDEX" in script and script.index("action.REINDEX") < script.index(
+            "status(status.ENABLED)"), "Expecting the existing values to be reindexed before waiting for ENABLED"
+        script = rdf2g.JanusGraphIndexAdapter.indexed_keys_script("graph")
+        assert "SchemaStatus.ENABLED" in script, "Expecting only the enabled indexes"
+
+
+if __name__ == '__main__':
+    unittest.main()
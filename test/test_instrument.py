@@ -0,0 +1,74 @@
+"""
+test_instrument
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import asyncio
+import unittest
+from concurrent.futures import Future
+
+import rdflib
+from gremlin_python.driver.protocol import GremlinServerError
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+
+import rdf2g
+
+
+class EmptyServerStandIn(RemoteConnection):
+    """
+        Stand-in for a remote connection to an empty graph, failing the traversals starting with E()
+    """
+
+    def __init__(self):
+        RemoteConnection.__init__(self, "standin", "g")
+
+    def submit(self, bytecode):
+        if bytecode.step_instructions[0][0] == "E":
+            raise GremlinServerError({"code": 500, "message": "Timeout", "attributes": {}})
+        return RemoteTraversal(iter([]))
+
+    def submit_async(self, bytecode):
+        future = Future()
+        future.set_result(self.submit(bytecode))
+        return future
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.connection = EmptyServerStandIn()
+        self.g = traversal().withRemote(self.connection)
+
+    def test_stats(self):
+        stats = rdf2g.instrument(self.g)
+        rdf2g.get_node(self.g, "skos:Concept")
+        rdf2g.get_node(self.g, rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Concept"))
+        self.g.V().toList()
+        with self.assertRaises(GremlinServerError):
+            rdf2g.get_edges(self.g, None, None)
+
+        functions = stats.to_dict()
+        assert set(functions) == {"rdf2g.retrieve.get_node", "rdf2g.retrieve.get_edges", "other"}, \
+            "Unexpected functions %s" % functions
+        assert functions["rdf2g.retrieve.get_node"]["count"] == 2, "Expecting one lookup by label and one by iri"
+        assert functions["rdf2g.retrieve.get_edges"]["errors"] == 1, "The failed traversal is not counted"
+
+        rdf2g.uninstrument(self.g)
+        assert self.g.remote_connection is self.connection, "The connection is not restored"
+        rdf2g.get_node(self.g, "skos:Concept")
+        assert stats.to_dict()["rdf2g.retrieve.get_node"]["count"] == 2, "The traversals are still timed"
+
+    def test_callback(self):
+        calls = []
+        assert rdf2g.instrument(self.g, callback=lambda *args: calls.append(args)) is None, "Expecting no stats"
+        asyncio.run(rdf2g.aio.get_node(self.g, rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Concept")))
+        assert [call[0] for call in calls] == ["rdf2g.aio.get_node"], "Unexpected calls %s" % calls
+        assert calls[0][1] >= 0 and calls[0][2] is None, "Unexpected duration or error"
+        with self.assertRaises(ValueError):
+            rdf2g.instrument(self.g)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+test_labels
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import json
+import unittest
+
+import rdflib
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+
+class CountingGraph(rdflib.Graph):
+    def __init__(self):
+        super(CountingGraph, self).__init__()
+        self.qname_calls = 0
+
+    def qname(self, uri):
+        self.qname_calls += 1
+        return super(CountingGraph, self).qname(uri)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = CountingGraph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+
+    def test_same_labels(self):
+        resolver = rdf2g.LabelResolver(self.rdf_graph)
+        for s, p, o in self.rdf_graph:
+            assert resolver.predicate_label(p) == rdf2g.predicate_label(p, self.rdf_graph), "Different labels"
+            assert resolver.node_label(s) == rdf2g.node_label(s, self.rdf_graph), "Different labels"
+        assert resolver.predicate_label("property") == "property", "Plain strings are kept"
+
+    def test_memoization(self):
+        resolver = rdf2g.LabelResolver(self.rdf_graph)
+        for s, p, o in self.rdf_graph:
+            resolver.predicate_label(p)
+        assert self.rdf_graph.qname_calls == len(set(self.rdf_graph.predicates())), \
+            "Expecting a single qname computation per predicate"
+
+    def test_node_labels_memoized_apart(self):
+        resolver = rdf2g.LabelResolver(self.rdf_graph)
+        rdf2g.load_rdf2g_bulk(rdf2g.embedded_graph(), self.rdf_graph, label_resolver=resolver)
+        assert set(resolver.to_dict()) == {str(p) for p in self.rdf_graph.predicates()}, \
+            "Only the predicates should be persisted"
+        for s in self.rdf_graph.subjects():
+            assert rdf2g.node_label(s, resolver) == rdf2g.node_label(s, self.rdf_graph), "Different labels"
+        assert len(resolver.labels) == len(set(self.rdf_graph.predicates())), "The node labels are in the table"
+
+    def test_load_labels_each_term_once(self):
+        nodes = list(rdf2g.distinct_nodes(self.rdf_graph))
+        predicates = set(self.rdf_graph.predicates())
+        rdf2g.load_rdf2g(rdf2g.embedded_graph(), self.rdf_graph, on_missing_index=None)
+        assert self.rdf_graph.qname_calls <= len(nodes) + len(predicates), \
+            "Expecting at most one qname computation per node and predicate, not %s" % self.rdf_graph.qname_calls
+
+    def test_node_labels_bounded(self):
+        resolver = rdf2g.LabelResolver(self.rdf_graph, node_labels_maxsize=2)
+        nodes = [rdflib.URIRef("http://example.com/%s" % i) for i in range(3)]
+        for node in nodes + nodes[-1:]:
+            resolver.node_label(node)
+        assert list(resolver.node_labels) == nodes[1:], "Expecting the least recently used label to be evicted"
+        assert self.rdf_graph.qname_calls == 3, "The memoized label should not be computed again"
+
+    def test_seed_and_persist(self):
+        resolver = rdf2g.LabelResolver(self.rdf_graph)
+        for p in self.rdf_graph.predicates():
+            resolver.predicate_label(p)
+        persisted = json.dumps(resolver.to_dict())
+
+        calls = self.rdf_graph.qname_calls
+        seeded = rdf2g.LabelResolver(self.rdf_graph, labels=json.loads(persisted))
+        for p in self.rdf_graph.predicates():
+            assert seeded.predicate_label(p) == resolver.predicate_label(p), "Different seeded label"
+        assert self.rdf_graph.qname_calls == calls, "The seeded labels should not be computed again"
+
+        seeded.seed({"http://example.com/node": "ex:node"})
+        assert seeded.node_label(rdflib.URIRef("http://example.com/node")) == "ex:node", "Seeded node label ignored"
+
+
+if __name__ == '__main__':
+    unittest.main()
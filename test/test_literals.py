@@ -0,0 +1,89 @@
+"""
+test_literals
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import datetime
+import json
+import pathlib
+import tempfile
+import unittest
+
+import rdflib
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Cardinality
+from gremlin_python.structure.graph import Graph
+from rdflib.namespace import SKOS, XSD
+
+import rdf2g
+
+EX = rdflib.Namespace("http://example.com/")
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.bind("skos", SKOS)
+        self.rdf_graph.bind("ex", EX)
+        self.rdf_graph.add((EX.a, SKOS.prefLabel, rdflib.Literal("Alpha", lang="en")))
+        self.rdf_graph.add((EX.a, SKOS.prefLabel, rdflib.Literal("Alfa", lang="fr")))
+        self.rdf_graph.add((EX.a, EX.rank, rdflib.Literal("3", datatype=XSD.integer)))
+        self.rdf_graph.add((EX.a, EX.created, rdflib.Literal("2018-10-26", datatype=XSD.date)))
+        self.g = traversal().with_(Graph())
+
+    def test_value(self):
+        mapper = rdf2g.LiteralMapper()
+        assert mapper.value(rdflib.Literal("42", datatype=XSD.integer)) == 42, "Expecting an int"
+        assert mapper.value(rdflib.Literal("2.5", datatype=XSD.decimal)) == 2.5, "Expecting a float"
+        assert mapper.value(rdflib.Literal("true", datatype=XSD.boolean)) is True, "Expecting a bool"
+        assert mapper.value(rdflib.Literal("2018-10-26", datatype=XSD.date)) == datetime.datetime(2018, 10, 26), \
+            "Expecting a datetime"
+        assert mapper.value(rdflib.Literal("forty", datatype=XSD.integer)) == "forty", \
+            "The ill formed literals should be kept as strings"
+        assert mapper.value(rdflib.Literal("42", datatype=EX.code)) == "42", \
+            "The literals of the other datatypes should be kept as strings"
+        assert rdf2g.LiteralMapper(typed=False).value(rdflib.Literal("42", datatype=XSD.integer)) == "42", \
+            "Expecting a string when the typing is disabled"
+
+    def test_language_keys(self):
+        literal = rdflib.Literal("Alpha", lang="en")
+        assert rdf2g.literal_property("skos:prefLabel", literal) == ("skos:prefLabel", "Alpha"), \
+            "Without a mapper the key and the string should be unchanged"
+        assert rdf2g.LiteralMapper(language_keys=True).property("skos:prefLabel", literal) == \
+            ("skos:prefLabel@en", "Alpha"), "Expecting the language tag in the key"
+
+    def test_split_statements(self):
+        node_ids = {str(EX.a): 1}
+        properties, _ = rdf2g.split_statements(list(self.rdf_graph), node_ids, self.rdf_graph,
+                                               rdf2g.LiteralMapper(language_keys=True))
+        assert sorted(properties, key=str) == sorted([(1, "skos:prefLabel@en", "Alpha"),
+                                                      (1, "skos:prefLabel@fr", "Alfa"), (1, "ex:rank", 3),
+                                                      (1, "ex:created", datetime.datetime(2018, 10, 26))], key=str), \
+            "Unexpected properties %s" % properties
+
+    def test_cardinality(self):
+        properties = [(1, "skos:prefLabel", "Alpha"), (1, "skos:prefLabel", "Alfa")]
+        cardinality = rdf2g.property_cardinality(rdf2g.LiteralMapper())
+        # every property is written by a branch of the union step
+        steps = rdf2g.add_properties_traversal(self.g, properties, cardinality).bytecode.step_instructions
+        steps = steps[1][1].step_instructions
+        assert steps[1] == ["property", Cardinality.set_, "skos:prefLabel", "Alpha"], "Unexpected step %s" % steps
+        steps = rdf2g.add_properties_traversal(self.g, properties, rdf2g.property_cardinality()).bytecode
+        assert steps.step_instructions[1][1].step_instructions[1] == ["property", "skos:prefLabel", "Alpha"], \
+            "The default cardinality should be kept without a mapper"
+
+    def test_export_graphson(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "graph.json"
+            rdf2g.export_graphson(self.rdf_graph, path, buckets=2, literal_mapper=rdf2g.LiteralMapper())
+            vertex = json.loads(path.read_text())
+        assert [p["value"] for p in vertex["properties"]["ex:rank"]] == [{"@type": "g:Int64", "@value": 3}], \
+            "Expecting a typed value"
+        assert vertex["properties"]["ex:created"][0]["value"]["@type"] == "g:Date", "Expecting a date"
+        assert len(vertex["properties"]["skos:prefLabel"]) == 2, "Expecting both labels"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -85,8 +85,22 @@ class MyTestCase(unittest.TestCase):
         props = rdf2g.get_node_properties(self.g, n)
         assert 'iri' in props, "Expecting 'iri' key among the node properties "
 
+    def test_get_nodes_properties(self):
+        nodes = self.g.V().limit(10).toList()
+        props = rdf2g.get_nodes_properties(self.g, nodes, chunk_size=3)
+        assert [p["@id"] for p in props] == [n.id for n in nodes], "Unexpected order of the nodes"
+        for node, node_props in zip(nodes, props):
+            assert node_props == rdf2g.get_node_properties(self.g, node), "Different node properties"
+
     def test_get_nodes(self):
-        assert len(rdf2g.get_nodes(self.g)) > 0, "No node available"
+        nodes = rdf2g.get_nodes(self.g)
+        assert len(nodes) > 0, "No node available"
+        assert len(nodes) == len(self.g.V().toList()), "Missing nodes"
+        assert all("id" in n and "label" in n and "iri" in n for n in nodes), "Unexpected node structure"
+
+    def test_iter_nodes(self):
+        nodes = list(rdf2g.iter_nodes(self.g, page_size=7))
+        assert sorted(n["id"] for n in nodes) == sorted(n["id"] for n in rdf2g.get_nodes(self.g)), "Missing nodes"
 
     def test_add_property(self):
         known_iri_str = "http://publications.europa.eu/resources/authority/celex/md_OJ_ID"
@@ -161,6 +175,36 @@ class MyTestCase(unittest.TestCase):
         assert exp_tree[0]["@label"] == known_label, "Unexpected tree structure"
         assert exp_tree[0]["rdf:type"]["@label"] == "skos:Concept", "Unexpected tree structure"
 
+    def test_expand_traversal_tree(self):
+        known_label = "lamd:res_h9ci2wPXrcUXBh9JkkHzUY"
+        tree = rdf2g.generate_traversal_tree(self.g, known_label, max_depth=2)
+        expected = rdf2g.expand_tree(self.g, tree)
+
+        exp_tree = rdf2g.expand_traversal_tree(self.g, known_label, max_depth=2)
+        assert exp_tree == expected, "The single traversal expansion differs from expand_tree"
+
+    def test_generate_bounded_tree(self):
+        known_label = "lamd:res_h9ci2wPXrcUXBh9JkkHzUY"
+        tree = rdf2g.generate_traversal_tree(self.g, known_label, max_depth=2, fan_out=2,
+                                             edge_labels=["skos:member"])
+        edges = tree["@value"][0]["value"]["@value"]
+        assert len(edges) == 2, "Expecting two members, got %s" % len(edges)
+        assert all(edge["key"].label == "skos:member" for edge in edges), "Unexpected edge labels"
+
+        tree = rdf2g.generate_traversal_tree(self.g, known_label, max_depth=2, limit=1)
+        assert len(tree["@value"][0]["value"]["@value"]) == 1, "Expecting a single path"
+
+    def test_iter_traversal_paths(self):
+        known_label = "lamd:res_h9ci2wPXrcUXBh9JkkHzUY"
+        root_iri = rdf2g.get_node_properties(self.g, rdf2g.get_node(self.g, known_label).id)["iri"]
+        paths = list(rdf2g.iter_traversal_paths(self.g, known_label, max_depth=2, simple_path=True))
+        assert paths, "Nothing returned"
+        assert all(path[0] == root_iri for path in paths), "The paths should start at the root"
+        assert all(len(path[::2]) == len(set(path[::2])) for path in paths), "The paths should not revisit nodes"
+
+        paths = list(rdf2g.iter_traversal_paths(self.g, known_label, max_depth=2, dedup=True))
+        assert len({path[-1] for path in paths}) == len(paths), "Every node should be visited once"
+
     def test_expand_tree_multi_value(self):
         skos_concept_iri = rdflib.URIRef(
             "http://publications.europa.eu/resources/authority/lam/res_h9ci2wPXrcUXBh9JkkHzUY")
@@ -0,0 +1,90 @@
+"""
+test_serialize
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+import rdflib
+from rdflib.compare import isomorphic
+from rdflib.namespace import SKOS, XSD
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES, STREAM_WITH_BNODES
+
+EX = rdflib.Namespace("http://example.com/")
+
+
+def parse(path, format):
+    rdf_graph = rdflib.Graph()
+    rdf_graph.parse(str(path), format=format)
+    return rdf_graph
+
+
+def plain(triples):
+    """
+        the graph of the triples with the literals as plain strings, as they are stored without a literal mapper
+    """
+    rdf_graph = rdflib.Graph()
+    for s, p, o in triples:
+        rdf_graph.add((s, p, rdflib.Literal(str(o)) if isinstance(o, rdflib.Literal) else o))
+    return rdf_graph
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name)
+        self.g = rdf2g.embedded_graph()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        rdf_graph = parse(OUTPUT_FILE_LAM_PROPERTIES, "ttl")
+        rdf2g.load_rdf2g_bulk(self.g, rdf_graph)
+        for name, format in (("graph.nt", "nt"), ("graph.ttl", "turtle")):
+            report = rdf2g.export_rdf(self.g, self.path / name, namespaces=rdf_graph, page_size=5)
+            assert report["vertices"] == len(self.g.V().toList()), "Every vertex should be exported"
+            assert isomorphic(parse(self.path / name, format), plain(rdf_graph)), "The %s export differs" % name
+
+    def test_inlined_blank_nodes(self):
+        rdf_graph = parse(STREAM_WITH_BNODES, "n3")
+        rdf2g.load_rdf2g_bulk(self.g, rdf_graph, bnode_strategy=rdf2g.INLINE)
+        rdf2g.export_rdf(self.g, self.path / "graph.nt.gz", namespaces=rdf_graph)
+        exported = plain(rdf2g.RDFFileSource(self.path / "graph.nt.gz"))
+        assert isomorphic(exported, plain(rdf_graph)), "The blank nodes should be restored"
+
+    def test_literals(self):
+        rdf_graph = rdflib.Graph()
+        rdf_graph.bind("ex", EX)
+        rdf_graph.bind("skos", SKOS)
+        rdf_graph.add((EX.a, SKOS.prefLabel, rdflib.Literal("Alpha", lang="en")))
+        rdf_graph.add((EX.a, EX.rank, rdflib.Literal("3", datatype=XSD.integer)))
+        rdf_graph.add((EX.a, EX.note, rdflib.Literal('two\nlines "quoted"')))
+        rdf_graph.add((EX.a, EX.other, EX.b))
+        rdf2g.load_rdf2g_bulk(self.g, rdf_graph, literal_mapper=rdf2g.LiteralMapper(language_keys=True))
+        self.g.V().has("iri", str(EX.b)).property("unknown", "x").iterate()
+        report = rdf2g.export_rdf(self.g, self.path / "graph.nt", namespaces={"ex": str(EX), "skos": str(SKOS)})
+        assert report == {"vertices": 2, "properties": 3, "edges": 1}, "Unexpected report %s" % report
+        assert isomorphic(parse(self.path / "graph.nt", "nt"), rdf_graph), "The literals should be restored"
+
+    def test_paging(self):
+        rdf2g.load_rdf2g_bulk(self.g, parse(OUTPUT_FILE_LAM_PROPERTIES, "ttl"))
+        ids = sorted(self.g.V().id_().toList())
+        first = rdf2g.vertex_page_traversal(self.g, None, 3).toList()
+        self.g.V(first[0]["id"]).drop().iterate()
+        second = rdf2g.vertex_page_traversal(self.g, first[-1]["id"], 3).toList()
+        assert [vertex["id"] for vertex in first + second] == ids[:6], "A vertex was skipped or repeated"
+
+    def test_format(self):
+        with self.assertRaises(ValueError):
+            rdf2g.export_rdf(self.g, self.path / "graph.xml", format="xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
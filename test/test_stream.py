@@ -0,0 +1,83 @@
+"""
+test_stream
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import gzip
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import rdflib
+from rdflib.compare import isomorphic
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES, STREAM_WITH_BNODES
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(STREAM_WITH_BNODES), format="n3")
+        self.nt_file = self.tmp_dir / "test_bnodes.nt"
+        self.rdf_graph.serialize(str(self.nt_file), format="nt", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(str(self.tmp_dir))
+
+    def assert_same_triples(self, source):
+        streamed = rdflib.Graph()
+        for triple in source:
+            streamed.add(triple)
+        assert isomorphic(streamed, self.rdf_graph), "The streamed triples differ from the parsed ones"
+
+    def test_ntriples(self):
+        self.assert_same_triples(rdf2g.RDFFileSource(self.nt_file))
+
+    def test_mmap(self):
+        self.assert_same_triples(rdf2g.RDFFileSource(self.nt_file, use_mmap=True))
+
+    def test_gzip(self):
+        gz_file = self.tmp_dir / "test_bnodes.nt.gz"
+        with open(str(self.nt_file), "rb") as f, gzip.open(str(gz_file), "wb") as gz:
+            shutil.copyfileobj(f, gz)
+        self.assert_same_triples(rdf2g.RDFFileSource(gz_file))
+
+    def test_nquads(self):
+        dataset = rdflib.Dataset()
+        named_graph = dataset.graph(rdflib.URIRef("http://example.com/graph"))
+        for triple in self.rdf_graph:
+            named_graph.add(triple)
+        nq_file = self.tmp_dir / "test_bnodes.nq"
+        dataset.serialize(str(nq_file), format="nquads", encoding="utf-8")
+
+        source = rdf2g.RDFFileSource(nq_file)
+        assert source.format == "nquads", "Unexpected format %s" % source.format
+        assert {q[3] for q in source.quads()} == {rdflib.URIRef("http://example.com/graph")}, "Unexpected graphs"
+        self.assert_same_triples(source)
+
+    def test_bnodes_are_stable(self):
+        source = rdf2g.RDFFileSource(self.nt_file)
+        assert list(source) == list(source), "The blank nodes differ between iterations"
+
+    def test_guess_format(self):
+        assert rdf2g.guess_format("dump.nt.gz") == "nt", "Expecting N-Triples"
+        assert rdf2g.guess_format("dump.nq") == "nquads", "Expecting N-Quads"
+        with self.assertRaises(ValueError):
+            rdf2g.guess_format("dump.ttl")
+
+    def test_namespace_graph(self):
+        rdf_graph = rdflib.Graph()
+        rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+        ns_graph = rdf2g.namespace_graph({prefix: str(namespace) for prefix, namespace in rdf_graph.namespaces()})
+        for s, p, o in rdf_graph:
+            assert rdf2g.predicate_label(p, ns_graph) == rdf2g.predicate_label(p, rdf_graph), "Different labels"
+            assert rdf2g.node_label(s, ns_graph) == rdf2g.node_label(s, rdf_graph), "Different labels"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+test_sync
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+import rdflib
+
+import rdf2g
+from test import OUTPUT_FILE_LAM_PROPERTIES
+
+SKOS = rdflib.Namespace("http://www.w3.org/2004/02/skos/core#")
+KNOWN_IRI = rdflib.URIRef("http://publications.europa.eu/resources/authority/celex/md_OJ_ID")
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rdf_graph = rdflib.Graph()
+        self.rdf_graph.parse(str(OUTPUT_FILE_LAM_PROPERTIES), format="ttl")
+
+    def test_subject_digests(self):
+        digests = rdf2g.subject_digests(self.rdf_graph)
+        assert set(digests) == {str(node) for node in rdf2g.distinct_nodes(self.rdf_graph)}, "Missing nodes"
+        assert digests == rdf2g.subject_digests(self.rdf_graph), "The digests are not deterministic"
+
+        new_graph = rdflib.Graph()
+        for triple in self.rdf_graph:
+            new_graph.add(triple)
+        new_graph.add((KNOWN_IRI, SKOS.note, rdflib.Literal("a new note")))
+        new_digests = rdf2g.subject_digests(new_graph)
+        changed = [node for node in new_digests if digests.get(node) != new_digests[node]]
+        assert changed == [str(KNOWN_IRI)], "Only the changed subject should have a new digest"
+
+    def copy(self):
+        new_graph = rdflib.Graph()
+        for prefix, namespace in self.rdf_graph.namespaces():
+            new_graph.bind(prefix, namespace, replace=True)
+        for triple in self.rdf_graph:
+            new_graph.add(triple)
+        return new_graph
+
+    def test_sync_previous_graph(self):
+        g = rdf2g.embedded_graph()
+        rdf2g.load_rdf2g_bulk(g, self.rdf_graph)
+        literal = next(t for t in sorted(self.rdf_graph) if isinstance(t[2], rdflib.Literal) and
+                       len(list(self.rdf_graph.objects(t[0], t[1]))) == 1)
+        link = next(t for t in sorted(self.rdf_graph) if isinstance(t[2], rdflib.URIRef) and t[0] != literal[0])
+        previous_graph = self.copy()
+        previous_graph.add((KNOWN_IRI, SKOS.note, rdflib.Literal("never loaded")))
+        new_graph = self.copy()
+        new_graph.remove(literal)
+        new_graph.remove(link)
+        new_graph.add((KNOWN_IRI, SKOS.note, rdflib.Literal("a new note")))
+        report = rdf2g.sync_rdf2g(g, new_graph, previous_graph=previous_graph)
+        assert report["properties_removed"] == 1 and report["edges_removed"] == 1, \
+            "Only the elements found should be counted, got %s" % report
+        assert report["properties_added"] == 1, "Unexpected report %s" % report
+        assert g.V().has("iri", str(KNOWN_IRI)).values("skos:note").toList() == ["a new note"], "Note not synced"
+        assert len(g.E().toList()) == len([t for t in new_graph if not isinstance(t[2], rdflib.Literal)]), \
+            "Unexpected number of edges"
+
+    def test_sync_digests_keep_partition(self):
+        g = rdf2g.embedded_graph()
+        source = rdf2g.graph_source(g, "first")
+        rdf2g.load_rdf2g_bulk(source, self.rdf_graph)
+        digests = rdf2g.subject_digests(self.rdf_graph)
+        new_graph = self.copy()
+        new_graph.add((KNOWN_IRI, SKOS.note, rdflib.Literal("a new note")))
+        rdf2g.sync_rdf2g(source, new_graph, previous_digests=digests)
+        assert g.V().has("iri", str(KNOWN_IRI)).values("graph").toList() == ["first"], \
+            "The cleared node should stay in its partition"
+        assert source.V().has("iri", str(KNOWN_IRI)).values("skos:note").toList() == ["a new note"], \
+            "The cleared node should be reloaded in its partition"
+
+    def test_sync_needs_previous_version(self):
+        with self.assertRaises(ValueError):
+            rdf2g.sync_rdf2g(None, self.rdf_graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
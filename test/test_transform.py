@@ -0,0 +1,85 @@
+"""
+test_transform
+Date: 18.10.26
+Author: Eugeniu Costetchi
+Email: costezki.eugen@gmail.com
+"""
+
+import unittest
+
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import T, WithOptions
+from gremlin_python.structure.graph import Vertex, Edge
+
+import rdf2g
+
+
+def tree(*items):
+    return {"@type": "g:Tree", "@value": [{"key": key, "value": value} for key, value in items]}
+
+
+class NoTreeConnection(rdf2g.EmbeddedConnection):
+    """
+        rejects the tree step, whose result the GraphBinary serializer cannot return
+    """
+    def submit(self, bytecode):
+        if any(step[0] == "tree" for step in bytecode.step_instructions):
+            raise TypeError("No g:Tree type in GraphBinary")
+        return rdf2g.EmbeddedConnection.submit(self, bytecode)
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_tree_from_paths(self):
+        g = rdf2g.embedded_graph()
+        a, b, c = [g.addV("ex:%s" % name).property("iri", "http://example.com/%s" % name).next() for name in "abc"]
+        for source, label, target in ((a, "ex:p", b), (a, "ex:q", c), (b, "ex:r", c)):
+            g.V(source.id).addE(label).to(__.V(target.id)).iterate()
+        no_tree_g = traversal().withRemote(NoTreeConnection(g.remote_connection.graph))
+
+        tree_dict = rdf2g.generate_traversal_tree(no_tree_g, "http://example.com/a", max_depth=2)
+        assert tree_dict == rdf2g.traversal_hops(g, a.id, max_depth=2).tree().next(), "Unexpected tree %s" % tree_dict
+        result = rdf2g.expand_traversal_tree(no_tree_g, "http://example.com/a", max_depth=2)
+        expected = rdf2g.expand_value_map_tree(rdf2g.traversal_hops(g, a.id, max_depth=2).
+                                               tree().by(__.valueMap().with_(WithOptions.tokens)).next())
+        assert result == expected, "Unexpected expanded tree %s" % result
+        assert result[0]["ex:p"]["ex:r"]["@id"] == result[0]["ex:q"]["@id"] == c.id, "Unexpected paths %s" % result
+
+    def test_expand_value_map_tree(self):
+        concept = {T.id: 2, T.label: "skos:Concept", "iri": ["http://www.w3.org/2004/02/skos/core#Concept"]}
+        scheme = {T.id: 3, T.label: "lamd:DocumentProperty", "skos:prefLabel": ["Document metadata"]}
+        member1 = {T.id: 4, T.label: "ex:a", "iri": ["http://example.com/a"]}
+        member2 = {T.id: 5, T.label: "ex:b", "iri": ["http://example.com/b"]}
+        root = {T.id: 1, T.label: "celexd:md_CODE", "skos:altLabel": ["code", "CODE"]}
+        tree_dict = tree((root, tree(
+            ({T.id: 10, T.label: "rdf:type"}, tree((concept, tree()))),
+            ({T.id: 11, T.label: "skos:inScheme"}, tree((scheme, tree()))),
+            ({T.id: 12, T.label: "skos:member"}, tree((member1, tree()))),
+            ({T.id: 13, T.label: "skos:member"}, tree((member2, tree()))),
+        )))
+
+        result = rdf2g.expand_value_map_tree(tree_dict)
+        assert len(result) == 1, "Expecting a single root"
+        assert result[0]["@label"] == "celexd:md_CODE" and result[0]["@id"] == 1, "Unexpected root"
+        assert result[0]["skos:altLabel"] == ["code", "CODE"], "Multiple values should be kept"
+        assert result[0]["rdf:type"]["@label"] == "skos:Concept", "Unexpected rdf:type"
+        assert result[0]["rdf:type"]["iri"] == "http://www.w3.org/2004/02/skos/core#Concept", "Values not deflated"
+        assert result[0]["skos:inScheme"]["skos:prefLabel"] == "Document metadata", "Unexpected scheme"
+        assert [m["@id"] for m in result[0]["skos:member"]] == [4, 5], "Expecting multiple members"
+
+    def test_tree_vertex_ids(self):
+        v1, v2, v3 = Vertex(1), Vertex(2), Vertex(3)
+        tree_dict = tree((v1, tree(
+            (Edge(10, v1, "rdf:type", v2), tree((v2, tree()))),
+            (Edge(11, v1, "skos:member", v3), tree((v3, tree()))),
+        )))
+        assert sorted(rdf2g.tree_vertex_ids(tree_dict)) == [1, 2, 3], "Unexpected vertex ids"
+
+    def test_unexpected_structure(self):
+        with self.assertRaises(IndexError):
+            rdf2g.expand_value_map_tree({"key": "value"})
+
+
+if __name__ == '__main__':
+    unittest.main()